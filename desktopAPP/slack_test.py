@@ -7,21 +7,24 @@ from slack_sdk.errors import SlackApiError
 from datetime import datetime
 from dotenv import load_dotenv
 
-# .env 파일에서 환경 변수 로드
-load_dotenv()
-
 app = Flask(__name__)
 
-# .env 파일에서 SLACK_BOT_TOKEN을 불러옴
-token = os.getenv("SLACK_BOT_TOKEN")
-print(f"SLACK_BOT_TOKEN: {token}")  # 확인용 출력
-
-# Slack WebClient 설정
-if token:
-    client = WebClient(token)
-    print("Slack client initialized")
-else:
-    print("SLACK_BOT_TOKEN is not set!")
+# Slack WebClient는 처음 사용할 때 만듦 (import 시점에는 .env를 읽거나 클라이언트를 만들지 않음)
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # .env 파일(실행 시 load_dotenv로 읽음)에서 SLACK_BOT_TOKEN을 불러옴
+                token = os.getenv("SLACK_BOT_TOKEN")
+                if not token:
+                    raise RuntimeError("SLACK_BOT_TOKEN is not set!")
+                _client = WebClient(token)
+                print("Slack client initialized")
+    return _client
 
 @app.route('/', methods=['POST'])
 def hello_there():
@@ -46,7 +49,7 @@ def slash_hello():
     if slack_event.get('command') == '/인사':  # 명령어가 '/hello'일 때
         try:
             # chat.postMessage API를 통해 채널에 메시지 보내기 (봇이 보냄)
-            response = client.chat_postMessage(
+            response = get_client().chat_postMessage(
                 channel=channel_id,  # 메시지를 보낼 채널 ID
                 text="Hello, everyone!",  # 메시지 내용
                 username="데굴이",  # 봇의 사용자명을 "데굴이"로 변경
@@ -76,12 +79,12 @@ def get_chatlog(channel_id, target='all'):
         next_cursor = None
         
         # 현재 봇의 user_id를 가져옴
-        auth_response = client.auth_test()
+        auth_response = get_client().auth_test()
         bot_user_id = auth_response['user_id']
         
         while has_more:
             # conversations.history API를 통해 채널 메시지 기록 가져오기
-            result = client.conversations_history(
+            result = get_client().conversations_history(
                 channel=channel_id,
                 cursor=next_cursor  # 페이지네이션을 위한 cursor
             )
@@ -94,7 +97,7 @@ def get_chatlog(channel_id, target='all'):
                 user_id = message.get('user')
                 
                 # 사용자 정보를 가져옴
-                user_info = client.users_info(user=user_id)
+                user_info = get_client().users_info(user=user_id)
                 username = user_info['user']['name']
                 
                 # target에 따라 필터링
@@ -137,7 +140,7 @@ def send_chat_log_to_slack(channel_id, target):
     print(chat_logs)
 
     if chat_logs is None:
-        client.chat_postMessage(
+        get_client().chat_postMessage(
             channel=channel_id,
             text="Error fetching chat log"
         )
@@ -148,7 +151,7 @@ def send_chat_log_to_slack(channel_id, target):
 
     # 메시지가 너무 길 경우 4000자 단위로 나눠서 보냄
     for i in range(0, len(formatted_chat_log), 4000):
-        client.chat_postMessage(
+        get_client().chat_postMessage(
             channel=channel_id,  # 메시지를 보낼 채널 ID
             text=f"Here is the bot chat history:\n{formatted_chat_log[i:i+4000]}"  # 채팅 기록
         )
@@ -172,7 +175,7 @@ def send_speech_analysis_to_slack(channel_id):
     chat_logs = get_chatlog(channel_id, target='user')
 
     if chat_logs is None:
-        client.chat_postMessage(
+        get_client().chat_postMessage(
             channel=channel_id,
             text="Error fetching chat log"
         )
@@ -192,7 +195,7 @@ def send_speech_analysis_to_slack(channel_id):
     most_active_count = user_message_count[most_active_user]
 
     # 결과 메시지를 Slack 채널에 보내기
-    client.chat_postMessage(
+    get_client().chat_postMessage(
         channel=channel_id,
         text=f"User <@{most_active_user}> has spoken the most with {most_active_count} messages."
     )
@@ -217,6 +220,8 @@ def test():
     return "Hello, World!", 200
 
 if __name__ == '__main__':
+    # .env 파일에서 환경 변수 로드
+    load_dotenv()
         # 환경 변수를 사용하여 호스트와 포트를 설정 (기본값은 0.0.0.0과 5000)
     host = os.getenv('FLASK_RUN_HOST', '0.0.0.0')
     port = int(os.getenv('FLASK_RUN_PORT', 5000))
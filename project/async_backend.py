@@ -0,0 +1,323 @@
+import asyncio
+import logging
+import os
+import threading
+
+import aiohttp
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+from slack_scheduler import ScheduledAsyncClient
+from chat_report import most_active_user_message
+from log_render import renderer_for
+from outbound import append_lines_file, pack_messages, to_blocks, write_lines_file
+from bot_identity import BotIdentity
+from message_store import HISTORY_PAGE_LIMIT
+
+logger = logging.getLogger(__name__)
+
+
+# AsyncWebClient 기반 비동기 실행 경로 (SLACK_BACKEND=async 일 때 사용)
+# 워커 프로세스마다 이벤트 루프 하나를 별도 스레드에서 돌리고,
+# 사용자 조회와 메시지 전송은 세마포어로 동시 실행 수를 제한함.
+class AsyncSlackBackend:
+    def __init__(self, token, message_store, user_cache, scheduler, base_url=AsyncWebClient.BASE_URL, max_concurrency=8, speech_counts_from_events=True, message_limit=12000, bot_identity=None, pool_size=8, tz_name='UTC', upload_threshold=50000, batch_size=200):
+        self.token = token
+        self.base_url = base_url
+        self.message_store = message_store
+        self.user_cache = user_cache
+        self.scheduler = scheduler  # 동기 경로와 같은 호출 한도(토큰 버킷)를 공유
+        self.max_concurrency = max_concurrency
+        self.speech_counts_from_events = speech_counts_from_events
+        self.message_limit = message_limit
+        self.upload_threshold = upload_threshold  # 채팅 로그가 이보다 길면 파일로 올림 (동기 경로의 OutboundSender와 같은 기준)
+        self.bot_identity = bot_identity or BotIdentity()
+        self.pool_size = pool_size  # Slack API keep-alive 커넥션 수
+        self.log_renderer = renderer_for(tz_name)  # 채팅 로그 시각을 표시할 시간대
+        self.batch_size = batch_size  # 로컬 저장소에서 한 번에 읽어 username을 붙이는 메시지 수
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._pid = None
+
+        # 아래 객체들은 이벤트 루프 안에서 만들어야 하므로 처음 사용할 때 생성
+        self._session = None
+        self._client = None
+        self._lookup_semaphore = None
+        self._post_semaphore = None
+        self._warm_lock = None
+        self._sync_locks = {}
+        self._inflight = {}  # user_id -> users.info 조회 Task
+
+    # 이벤트 루프를 처음 사용할 때 시작 (gunicorn fork 이후에는 자식 프로세스에서 새로 시작)
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='thegull-async', daemon=True)
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+                self._pid = os.getpid()
+                self._session = None
+                self._client = None
+                self._sync_locks = {}
+                self._inflight = {}
+            return self._loop
+
+    # 코루틴을 워커 프로세스의 이벤트 루프에서 실행하고 결과를 기다림 (동기 코드에서 호출)
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    def _setup(self):
+        if self._client is None:
+            # AsyncWebClient는 session을 주지 않으면 호출마다 aiohttp 세션(연결)을 새로 만들므로
+            # 이벤트 루프마다 세션 하나를 만들어 모든 호출이 keep-alive 커넥션을 재사용하게 함
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size))
+            web_client = AsyncWebClient(token=self.token, base_url=self.base_url, session=self._session)
+            self._client = ScheduledAsyncClient(web_client, self.scheduler)
+            self._lookup_semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._post_semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._warm_lock = asyncio.Lock()
+        return self._client
+
+    # 이벤트 루프에서 만든 aiohttp 세션(keep-alive 커넥션)을 닫음
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._client = None
+
+    # 세션을 닫고 이벤트 루프 스레드를 멈춤 (워커 종료 시 호출, 여러 번 불러도 됨)
+    # 이 프로세스에서 루프를 시작하지 않았으면 아무것도 하지 않음. 다시 사용하면 루프를 새로 시작함
+    def close(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or self._pid != os.getpid():
+                return
+            self._loop = None
+        asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _sync_lock(self, channel_id):
+        lock = self._sync_locks.get(channel_id)
+        if lock is None:
+            lock = self._sync_locks[channel_id] = asyncio.Lock()
+        return lock
+
+    # 로컬 저장소에 마지막으로 본 ts 이후의 메시지만 가져와 저장 (MessageStore.sync_channel과 동일)
+    # 저장소 읽기/쓰기는 이벤트 루프를 막지 않도록 스레드에서 실행
+    async def sync_channel(self, channel_id):
+        client = self._setup()
+        async with self._sync_lock(channel_id):
+            oldest = await asyncio.to_thread(self.message_store.high_water, channel_id)
+            newest = oldest
+            added = 0
+            has_more = True
+            next_cursor = None
+
+            while has_more:
+                result = await client.conversations_history(
+                    channel=channel_id,
+                    oldest=oldest,
+                    limit=HISTORY_PAGE_LIMIT,  # 동기 경로(iter_history_pages)와 같이 페이지를 크게 요청
+                    cursor=next_cursor  # 페이지네이션을 위한 cursor
+                )
+
+                messages = result["messages"]
+                added += await asyncio.to_thread(self.message_store.add_messages, channel_id, messages)
+                for message in messages:
+                    if newest is None or message['ts'] > newest:
+                        newest = message['ts']
+
+                has_more = result.get('has_more', False)
+                next_cursor = result.get('response_metadata', {}).get('next_cursor')
+
+            if newest is not None:
+                await asyncio.to_thread(self.message_store.set_high_water, channel_id, newest)
+            return added
+
+    async def _warm_user_cache(self):
+        client = self._setup()
+        async with self._warm_lock:
+            if not self.user_cache.needs_warm():
+                return
+            # 다른 프로세스가 공유 저장소에 채워 둔(또는 채우는 중인) 디렉터리가 있으면 그대로 사용
+            # (동기 경로의 UserCache.warm과 같은 claim을 잡으므로 users.list는 한 프로세스만 호출)
+            claimed = await asyncio.to_thread(self.user_cache.begin_warm)
+            if claimed is None:
+                return
+            try:
+                next_cursor = None
+                while True:
+                    result = await client.users_list(limit=200, cursor=next_cursor)
+                    await asyncio.to_thread(self.user_cache.put_many, result.get('members', []))
+
+                    next_cursor = result.get('response_metadata', {}).get('next_cursor')
+                    if not next_cursor:
+                        break
+                await asyncio.to_thread(self.user_cache.mark_warmed)
+            finally:
+                await asyncio.to_thread(self.user_cache.end_warm, claimed)
+
+    async def _fetch_user(self, user_id):
+        client = self._setup()
+        try:
+            async with self._lookup_semaphore:
+                user_info = await client.users_info(user=user_id)
+            await asyncio.to_thread(self.user_cache.put_many, [user_info['user']])
+        finally:
+            self._inflight.pop(user_id, None)
+
+    # 같은 사용자를 여러 코루틴이 동시에 찾으면 users.info는 한 번만 호출
+    def _lookup_user(self, user_id):
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = self._inflight[user_id] = asyncio.ensure_future(self._fetch_user(user_id))
+        return task
+
+    # 캐시에 없는 사용자는 users.list로 채우고, 그래도 없으면 users.info를 동시에 조회
+    # 사용자 캐시는 공유 상태 저장소(SQLite 등)를 읽고 쓸 수 있으므로 이벤트 루프를 막지 않도록 스레드에서 호출
+    async def get_usernames(self, user_ids):
+        profiles, missing = await asyncio.to_thread(self.user_cache.peek, user_ids)
+        if missing and self.user_cache.needs_warm():
+            await self._warm_user_cache()
+            found, missing = await asyncio.to_thread(self.user_cache.peek, missing, False)
+            profiles.update(found)
+
+        if missing:
+            await asyncio.gather(*(self._lookup_user(user_id) for user_id in missing))
+            found, _ = await asyncio.to_thread(self.user_cache.peek, missing, False)
+            profiles.update(found)
+
+        return {user_id: profile['name'] for user_id, profile in profiles.items()}
+
+    # iter_chatlog의 비동기 버전: 저장소를 동기화한 뒤 batch_size개씩 읽어 username을 붙인 묶음(리스트)을 내보냄
+    # 채널 전체 기록을 한 번에 메모리에 올리지 않음. Slack API 에러는 그대로 발생시킴
+    async def iter_chatlog(self, channel_id, target='all'):
+        client = self._setup()
+        bot_user_id = await self.bot_identity.auser_id(client)
+
+        await self.sync_channel(channel_id)
+
+        # SQLite 커서는 만든 스레드에서만 쓸 수 있으므로 묶음마다 ts 기준으로 이어서 새로 읽음
+        def read_page(before):
+            return list(self.message_store.iter_messages(channel_id, before=before, limit=self.batch_size))
+
+        before = None
+        while True:
+            rows = await asyncio.to_thread(read_page, before)
+            if not rows:
+                return
+            before = rows[-1]['timestamp']
+            batch = []
+            for row in rows:
+                if target == 'user' and row['user_id'] == bot_user_id:
+                    continue
+                if target == 'bot' and row['user_id'] != bot_user_id:
+                    continue
+                batch.append(row)
+            if not batch:
+                continue
+
+            usernames = await self.get_usernames([log['user_id'] for log in batch])
+            for log in batch:
+                log['username'] = usernames.get(log['user_id'])
+            yield batch
+
+    async def post_message(self, channel_id, text, blocks=None):
+        client = self._setup()
+        async with self._post_semaphore:
+            return await client.chat_postMessage(channel=channel_id, text=text, blocks=blocks)
+
+    # tz_name을 주면 그 시간대로 시각을 표시 (기본: 생성할 때 준 시간대)
+    # upload_threshold자까지만 메모리에 모아 보고, 넘으면 나머지 묶음은 임시 파일에 이어 쓴 뒤 한 번에 올림
+    # (OutboundSender.send_lines와 같은 기준)
+    async def send_chat_log_to_slack_async(self, channel_id, target, tz_name=None):
+        header = "Here is the bot chat history:"
+        renderer = renderer_for(tz_name) if tz_name else self.log_renderer
+        buffered = []
+        size = 0
+        path = None
+        try:
+            async for chat_logs in self.iter_chatlog(channel_id, target):
+                lines = list(renderer.render_lines(chat_logs))
+                if path is not None:
+                    await asyncio.to_thread(append_lines_file, path, lines)
+                    continue
+                buffered.extend(lines)
+                size += sum(len(line) + 1 for line in lines)
+                if self.upload_threshold and size > self.upload_threshold:
+                    path = await asyncio.to_thread(write_lines_file, buffered)
+                    buffered = []
+
+        except SlackApiError as e:
+            logger.warning("Slack API error: %s", e.response['error'])
+            await self._abort_chat_log(channel_id, path)
+            return
+        except Exception as e:
+            logger.exception("Unexpected error: %s", e)
+            await self._abort_chat_log(channel_id, path)
+            return
+
+        if path is not None:
+            await self.upload_file(channel_id, path, header)
+            return
+
+        # 줄 단위로 메시지(블록)를 최대한 채워서, 같은 채널에는 순서를 지키기 위해 차례로 보냄
+        for texts in pack_messages(buffered, self.message_limit):
+            await self.post_message(channel_id, header, blocks=to_blocks(texts))
+
+    # 채팅 로그를 읽다가 실패하면 쓰던 임시 파일을 지우고 채널에 알림
+    async def _abort_chat_log(self, channel_id, path):
+        if path is not None:
+            os.remove(path)
+        await self.post_message(channel_id, "Error fetching chat log")
+
+    # 임시 파일을 files_upload_v2로 올리고 지움
+    async def upload_file(self, channel_id, path, header, filename='chatlog.txt'):
+        client = self._setup()
+        try:
+            await client.files_upload_v2(
+                channel=channel_id,
+                file=path,
+                filename=filename,
+                title=filename,
+                initial_comment=header
+            )
+        finally:
+            os.remove(path)
+
+    # 저장소의 사용자별 메시지 수 카운터로 분석 (동기 경로의 send_speech_analysis_to_slack과 동일)
+    async def send_speech_analysis_to_slack_async(self, channel_id, backfill=False):
+        client = self._setup()
+        try:
+            bot_user_id = await self.bot_identity.auser_id(client)
+
+            high_water = await asyncio.to_thread(self.message_store.high_water, channel_id)
+            if backfill or not self.speech_counts_from_events or high_water is None:
+                await self.sync_channel(channel_id)
+
+            user_message_count = await asyncio.to_thread(self.message_store.speech_counts, channel_id)
+            user_message_count.pop(bot_user_id, None)
+
+        except SlackApiError as e:
+            logger.warning("Slack API error: %s", e.response['error'])
+            await self.post_message(channel_id, "Error fetching chat log")
+            return
+        except Exception as e:
+            logger.exception("Unexpected error: %s", e)
+            await self.post_message(channel_id, "Error fetching chat log")
+            return
+
+        await self.post_message(channel_id, most_active_user_message(user_message_count))
+
+    # 작업 큐(동기 스레드)에서 호출하는 진입점
+    def send_chat_log_to_slack(self, channel_id, target, tz_name=None):
+        return self.run(self.send_chat_log_to_slack_async(channel_id, target, tz_name))
+
+    def send_speech_analysis_to_slack(self, channel_id, backfill=False):
+        return self.run(self.send_speech_analysis_to_slack_async(channel_id, backfill))
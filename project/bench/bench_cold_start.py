@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_slack import add_arguments  # noqa: E402  (bench 디렉토리는 스크립트 경로로 import됨)
+from bench_scale import fake_request, start_fake_slack, wait_for_jobs  # noqa: E402
+
+
+# 재시작 직후(콜드 스타트)의 비용을 재는 벤치마크
+# 매번 새 파이썬 프로세스에서 slack_test를 import하고, 워밍업을 끈/켠 경우 각각
+# import 시간, 워밍업 시간(/ready가 성공할 때까지), 첫 슬래시 명령의 응답 시간과 작업 완료 시간,
+# 그리고 같은 명령을 다시 보냈을 때(웜 상태)의 시간을 출력함. Slack API는 가짜 서버(fake_slack.py)를 사용.
+#
+# 예) python bench/bench_cold_start.py --latency-ms 50 --users 2000 --real-limits
+
+
+# 명령 하나를 보내고 (라우트 응답 시간, 작업 완료까지 걸린 시간, Slack API 호출 수) 리턴
+def timed_command(app_module, test_client, base_url, path, channel_id):
+    fake_request(base_url, '_reset', method='POST')
+    stats = app_module.job_queue.stats()
+    finished_before = stats['completed'] + stats['failed']
+    started = time.perf_counter()
+    test_client.post(path, data={'channel_id': channel_id, 'command': path, 'text': ''})
+    route = time.perf_counter() - started
+    wait_for_jobs(app_module.job_queue, finished_before, 1)
+    return route, time.perf_counter() - started, fake_request(base_url, '_stats')['total_calls']
+
+
+# 새 프로세스 안에서 실행되는 부분 (결과를 JSON 한 줄로 출력)
+def child(base_url, path, channel_id):
+    started = time.perf_counter()
+    import slack_test
+    import_seconds = time.perf_counter() - started
+
+    test_client = slack_test.app.test_client()
+    started = time.perf_counter()
+    while test_client.get('/ready').status_code != 200:
+        time.sleep(0.005)
+    ready_seconds = time.perf_counter() - started
+    warmup_calls = fake_request(base_url, '_stats')['total_calls']
+
+    first = timed_command(slack_test, test_client, base_url, path, channel_id)
+    second = timed_command(slack_test, test_client, base_url, path, channel_id)
+    print(json.dumps({
+        "import": import_seconds,
+        "ready": ready_seconds,
+        "warmup_calls": warmup_calls,
+        "first": first,
+        "second": second,
+    }))
+
+
+def run_child(base_url, store_dir, path, warmup, real_limits):
+    env = dict(
+        os.environ,
+        SLACK_BOT_TOKEN='xoxb-fake',
+        SLACK_API_BASE_URL=base_url + 'api/',
+        MESSAGE_STORE_PATH=os.path.join(store_dir, f"thegull-{os.urandom(3).hex()}.db"),
+        EXPORT_DIR=os.path.join(store_dir, 'exports'),
+        WARMUP='true' if warmup else 'false',
+        LOG_LEVEL=os.getenv('LOG_LEVEL', 'WARNING'),
+    )
+    env.pop('SLACK_SIGNING_SECRET', None)
+    env.pop('REPORT_CHANNELS', None)
+    env.pop('SHARED_STATE', None)
+    if not real_limits:
+        # 봇 코드와 네트워크 왕복 비용만 보기 위해 로컬 호출 한도는 충분히 크게 둠
+        env['SLACK_RATE_LIMITS'] = ','.join(
+            f"{method}=1000000" for method in (
+                'auth.test', 'conversations.history', 'users.list', 'users.info', 'chat.postMessage',
+            )
+        )
+    fake_request(base_url, '_reset', method='POST')
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', '--base-url', base_url, '--path', path],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start and first request latency benchmark against a fake Slack API")
+    add_arguments(parser)
+    parser.add_argument('--path', default='/botchatlog', help="첫 요청으로 보낼 슬래시 명령 라우트")
+    parser.add_argument('--runs', type=int, default=3, help="워밍업 설정마다 반복할 횟수 (중앙값 출력)")
+    parser.add_argument('--real-limits', action='store_true',
+                        help="Slack 티어 호출 한도를 그대로 적용 (users.list 분당 20회 등, 기본: 한도 해제)")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.base_url, args.path, 'C0000000000')
+        return
+
+    process, base_url = start_fake_slack(args)
+    store_dir = tempfile.mkdtemp(prefix='thegull-bench-')
+    try:
+        print(f"messages/channel: {args.messages}, users: {args.users}, latency: {args.latency_ms} ms, "
+              f"first request: {args.path}, limits: {'real' if args.real_limits else 'off'}")
+        print(f"{'warm-up':<8} {'import (s)':>10} {'ready (s)':>10} {'calls':>6} "
+              f"{'1st route ms':>13} {'1st job (s)':>12} {'1st calls':>10} {'2nd job (s)':>12}")
+        for warmup in (False, True):
+            runs = sorted((run_child(base_url, store_dir, args.path, warmup, args.real_limits) for _ in range(args.runs)),
+                          key=lambda run: run['first'][1])
+            run = runs[len(runs) // 2]
+            print(
+                f"{'on' if warmup else 'off':<8} {run['import']:>10.2f} {run['ready']:>10.2f} {run['warmup_calls']:>6} "
+                f"{run['first'][0] * 1000:>13.1f} {run['first'][1]:>12.2f} {run['first'][2]:>10} {run['second'][1]:>12.2f}"
+            )
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
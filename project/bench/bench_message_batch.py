@@ -0,0 +1,88 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from message_store import MessageStore
+from speech_analytics import SpeechAnalytics
+
+
+# 분석 작업에서 메시지를 dict 리스트(get_chatlog 형식)로 들고 있을 때와
+# 열 단위 MessageBatch로 들고 있을 때의 메모리와 분석 시간 비교
+# 예) python bench/bench_message_batch.py --messages 100000
+
+WORDS = ['회의', '회의록', '배포', '일정', '확인했습니다', '부탁드립니다', '점심', 'deploy', 'PR', 'LGTM', '리뷰', '내일']
+
+
+def fill_store(store, channel_id, messages, users, seed=0):
+    rng = random.Random(seed)
+    user_ids = [f"U{i:010d}" for i in range(users)]
+    page = []
+    for i in range(messages):
+        page.append({
+            "ts": f"{1700000000 + i * 30}.{i % 1000000:06d}",
+            "user": rng.choice(user_ids),
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 20))),
+        })
+        if len(page) == 999:
+            store.add_messages(channel_id, page)
+            page = []
+    store.add_messages(channel_id, page)
+
+
+# load()가 돌려준 객체를 들고 있는 동안의 메모리(MB)와 최대 메모리(MB), 걸린 시간(초)
+def measure(load):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = load()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current / 1024 / 1024, peak / 1024 / 1024, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory benchmark: dict chat logs vs columnar MessageBatch")
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=50)
+    args = parser.parse_args()
+
+    store = MessageStore(os.path.join(tempfile.mkdtemp(prefix='thegull-bench-'), 'thegull.db'))
+    channel_id = 'C0000000001'
+    fill_store(store, channel_id, args.messages, args.users)
+
+    # get_chatlog처럼 username까지 붙인 dict 리스트
+    def load_dicts():
+        logs = list(store.iter_messages(channel_id))
+        for log in logs:
+            log['username'] = f"user_{log['user_id'][-4:]}"
+        return logs
+
+    dicts, dict_mb, dict_peak, dict_time = measure(load_dicts)
+    started = time.perf_counter()
+    dict_report = SpeechAnalytics.from_chat_logs(dicts).report("bench")
+    dict_analytics = time.perf_counter() - started
+    del dicts
+
+    batch, batch_mb, batch_peak, batch_time = measure(lambda: store.load_batch(channel_id))
+    started = time.perf_counter()
+    batch_report = SpeechAnalytics.from_batch(batch).report("bench")
+    batch_analytics = time.perf_counter() - started
+    assert batch_report == dict_report
+
+    print(f"messages: {args.messages}, users: {args.users}")
+    print(f"{'':<14} {'held MB':>8} {'peak MB':>8} {'load (s)':>9} {'analytics (s)':>14}")
+    print(f"{'dict list':<14} {dict_mb:>8.1f} {dict_peak:>8.1f} {dict_time:>9.2f} {dict_analytics:>14.2f}")
+    print(f"{'MessageBatch':<14} {batch_mb:>8.1f} {batch_peak:>8.1f} {batch_time:>9.2f} {batch_analytics:>14.2f}")
+    print(f"held memory: {dict_mb / batch_mb:.1f}x smaller")
+
+
+if __name__ == '__main__':
+    main()
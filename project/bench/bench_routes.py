@@ -0,0 +1,86 @@
+import argparse
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+
+# 슬래시 명령 라우트 처리량(requests/sec) 측정 스크립트
+# 실행 중인 서버(flask run 또는 gunicorn)에 동시에 POST 요청을 보내 초당 처리 요청 수와 지연 시간을 출력함.
+#
+# 예) python bench/bench_routes.py --url http://127.0.0.1:5000 --path /speechquantity --requests 5000 --concurrency 32
+
+_local = threading.local()
+
+
+# 스레드마다 keep-alive 커넥션 하나를 재사용
+def _connection(url):
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        parts = urlsplit(url)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        _local.conn = conn
+    return conn
+
+
+def _request(url, path, body):
+    started = time.perf_counter()
+    conn = _connection(url)
+    try:
+        conn.request('POST', path, body=body, headers={'Content-Type': 'application/x-www-form-urlencoded'})
+        response = conn.getresponse()
+        response.read()
+        status = response.status
+    except (http.client.HTTPException, OSError):
+        conn.close()
+        _local.conn = None
+        status = None
+    return status, time.perf_counter() - started
+
+
+def run(url, path, requests, concurrency, channels):
+    # 채널을 여러 개 섞어서 보내면 작업 합치기(coalescing) 효과를 뺀 처리량도 볼 수 있음
+    bodies = [
+        urlencode({'channel_id': f'CBENCH{i}', 'command': path, 'text': ''}).encode()
+        for i in range(channels)
+    ]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda i: _request(url, path, bodies[i % channels]), range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    ok = sum(1 for status, _ in results if status == 200)
+    return {
+        "path": path,
+        "requests": requests,
+        "ok": ok,
+        "errors": requests - ok,
+        "elapsed": elapsed,
+        "rps": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slash command route throughput benchmark")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--path', action='append', help="측정할 라우트 (여러 번 지정 가능, 기본: /speechquantity, /botchatlog)")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--channels', type=int, default=1)
+    args = parser.parse_args()
+
+    for path in args.path or ['/speechquantity', '/botchatlog']:
+        result = run(args.url, path, args.requests, args.concurrency, args.channels)
+        print(
+            f"{result['path']}: {result['rps']:.0f} req/s "
+            f"({result['ok']}/{result['requests']} ok, p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_slack import add_arguments  # noqa: E402  (bench 디렉토리는 스크립트 경로로 import됨)
+
+
+# 가짜 Slack 서버(fake_slack.py)를 상대로 슬래시 명령 라우트를 실행해서
+# 시나리오별 Slack API 호출 수, 걸린 시간, 최대 메모리(tracemalloc)를 출력하는 벤치마크
+# 가짜 서버는 별도 프로세스로 띄우므로 메모리 측정에는 봇 코드만 포함됨.
+#
+# 예) python bench/bench_scale.py --messages 100000 --latency-ms 5
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def fake_request(base_url, path, method='GET'):
+    request = urllib.request.Request(base_url + path, method=method, data=b'' if method == 'POST' else None)
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def start_fake_slack(args):
+    port = free_port()
+    command = [sys.executable, os.path.join(BENCH_DIR, 'fake_slack.py'), '--port', str(port)]
+    for name in ('messages', 'users', 'channels', 'bot_ratio', 'latency_ms', 'rate_limit_every', 'rate_limit_prob', 'retry_after'):
+        command += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    base_url = f"http://127.0.0.1:{port}/"
+    deadline = time.monotonic() + 120
+    while True:
+        try:
+            fake_request(base_url, '_stats')
+            return process, base_url
+        except OSError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                raise RuntimeError("fake Slack server did not start")
+            time.sleep(0.2)
+
+
+# 작업 큐에 넣은 작업이 모두 끝날 때까지 기다림
+def wait_for_jobs(job_queue, finished_before, submitted):
+    while True:
+        stats = job_queue.stats()
+        if stats['completed'] + stats['failed'] - finished_before >= submitted:
+            return stats['failed']
+        time.sleep(0.01)
+
+
+def run_scenario(app_module, base_url, name, path, text, channel_ids):
+    client = app_module.app.test_client()
+    job_queue = app_module.job_queue
+    stats = job_queue.stats()
+    finished_before = stats['completed'] + stats['failed']
+    fake_request(base_url, '_reset', method='POST')
+
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    submitted = 0
+    for channel_id in channel_ids:
+        response = client.post(path, data={'channel_id': channel_id, 'command': path, 'text': text})
+        # 스냅샷 등으로 바로 응답한 경우(JSON)는 작업이 없음
+        if response.status_code == 200 and not response.is_json:
+            submitted += 1
+    failed = wait_for_jobs(job_queue, finished_before, submitted)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+
+    slack_stats = fake_request(base_url, '_stats')
+    return {
+        "name": name,
+        "elapsed": elapsed,
+        "peak_mb": (peak - baseline) / 1024 / 1024,  # 시나리오 시작 시점보다 늘어난 최대 메모리
+        "api_calls": slack_stats['total_calls'],
+        "rate_limited": sum(slack_stats['rate_limited'].values()),
+        "calls": slack_stats['calls'],
+        "failed": failed,
+    }
+
+
+SCENARIOS = [
+    # (이름, 라우트, 명령 인자)
+    ("botchatlog (cold store)", '/botchatlog', ''),
+    ("botchatlog (warm store)", '/botchatlog', ''),
+    ("botchatlog 7d", '/botchatlog', 'since=7d'),
+    ("speechquantity", '/speechquantity', ''),
+    ("speechquantity 30d", '/speechquantity', '30d'),
+    ("speechquantity all", '/speechquantity', 'all'),
+    ("speechquantity channels=all", '/speechquantity', 'channels=all'),
+    ("exportchatlog jsonl gzip", '/exportchatlog', 'jsonl gzip upload'),
+    ("exportchatlog csv path", '/exportchatlog', 'csv none path'),
+    ("searchchatlog", '/searchchatlog', 'word42 word7 from=U0000000003 30d'),
+    ("searchchatlog all time", '/searchchatlog', '"word123 word4"'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slash command scale benchmark against a fake Slack API")
+    add_arguments(parser)
+    parser.add_argument('--scenario', action='append', help="실행할 시나리오 이름 일부 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument('--real-limits', action='store_true', help="Slack 티어 호출 한도를 그대로 적용 (기본: 한도 해제)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    process, base_url = start_fake_slack(args)
+    store_dir = tempfile.mkdtemp(prefix='thegull-bench-')
+    try:
+        os.environ.update({
+            'SLACK_BOT_TOKEN': 'xoxb-fake',
+            'SLACK_API_BASE_URL': base_url + 'api/',
+            'MESSAGE_STORE_PATH': os.path.join(store_dir, 'thegull.db'),
+            'EXPORT_DIR': os.path.join(store_dir, 'exports'),
+            'SLACK_MAX_RETRIES': '10',
+            'LOG_LEVEL': os.getenv('LOG_LEVEL', 'WARNING'),
+        })
+        os.environ.pop('SLACK_SIGNING_SECRET', None)
+        os.environ.pop('REPORT_CHANNELS', None)
+        if not args.real_limits:
+            # 봇 코드 자체의 비용을 보기 위해 로컬 호출 한도는 충분히 크게 둠 (429는 가짜 서버 설정으로 흉내냄)
+            os.environ['SLACK_RATE_LIMITS'] = ','.join(
+                f"{method}=1000000" for method in (
+                    'auth.test', 'conversations.history', 'conversations.replies', 'users.list', 'users.info',
+                    'users.conversations', 'chat.postMessage', 'chat.update', 'files.getUploadURLExternal',
+                    'files.completeUploadExternal',
+                )
+            )
+
+        tracemalloc.start()
+        import slack_test
+        channel_ids = [f"C{i:010d}" for i in range(args.channels)]
+
+        results = []
+        for name, path, text in SCENARIOS:
+            if args.scenario and not any(selected in name for selected in args.scenario):
+                continue
+            # 여러 채널 리포트는 명령 한 번으로 모든 채널을 처리
+            targets = channel_ids[:1] if 'channels=' in text else channel_ids
+            results.append(run_scenario(slack_test, base_url, name, path, text, targets))
+
+        if args.json:
+            print(json.dumps(results, indent=2))
+            return
+
+        print(f"messages/channel: {args.messages}, channels: {args.channels}, latency: {args.latency_ms} ms, "
+              f"429 every: {args.rate_limit_every or '-'}")
+        print(f"{'scenario':<30} {'wall (s)':>9} {'API calls':>10} {'429':>5} {'peak +MB':>9}")
+        for result in results:
+            print(
+                f"{result['name']:<30} {result['elapsed']:>9.2f} {result['api_calls']:>10} "
+                f"{result['rate_limited']:>5} {result['peak_mb']:>9.1f}"
+                + (f"  ({result['failed']} failed)" if result['failed'] else "")
+            )
+        print(f"max RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import hashlib
+import hmac
+import os
+import sys
+import time
+import timeit
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slack_security import RequestVerifier
+
+
+# Slack 요청 서명 검증(RequestVerifier.verify)의 요청당 오버헤드 측정
+# 예) python bench/bench_signature.py --number 100000
+
+SECRET = "8f742231b10e8888abcd99yyyzzz85a5"
+
+
+def sign(body, timestamp):
+    return "v0=" + hmac.new(SECRET.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slack request signature verification microbenchmark")
+    parser.add_argument('--number', type=int, default=100000)
+    args = parser.parse_args()
+
+    # 일반적인 슬래시 명령 form body
+    body = urlencode({
+        'token': 'gIkuvaNzQIHg97ATvDxqgjtO',
+        'team_id': 'T0001',
+        'channel_id': 'C2147483705',
+        'user_id': 'U2147483697',
+        'command': '/speechquantity',
+        'text': '7d',
+        'response_url': 'https://hooks.slack.com/commands/1234/5678',
+    }).encode()
+    timestamp = str(int(time.time()))
+
+    # 서명이 매번 달라야 재전송 캐시에 걸리지 않으므로 body를 조금씩 바꿔 미리 서명해 둠
+    requests = []
+    for i in range(args.number):
+        request_body = body + f"&trigger_id={i}".encode()
+        requests.append((request_body, timestamp, sign(request_body, timestamp)))
+
+    verifier = RequestVerifier(SECRET, replay_cache_size=args.number)
+
+    valid = iter(requests)
+    elapsed = timeit.timeit(lambda: verifier.verify(*next(valid)), number=args.number)
+    print(f"valid requests:    {elapsed / args.number * 1e6:.2f} us/request ({verifier.accepted} accepted)")
+
+    invalid = (body, timestamp, "v0=" + "0" * 64)
+    elapsed = timeit.timeit(lambda: verifier.verify(*invalid), number=args.number)
+    print(f"invalid signature: {elapsed / args.number * 1e6:.2f} us/request")
+
+    replayed = requests[0]
+    elapsed = timeit.timeit(lambda: verifier.verify(*replayed), number=args.number)
+    print(f"replayed request:  {elapsed / args.number * 1e6:.2f} us/request")
+
+
+if __name__ == '__main__':
+    main()
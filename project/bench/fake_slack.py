@@ -0,0 +1,268 @@
+import argparse
+import bisect
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+# 오프라인 벤치마크/테스트용 가짜 Slack Web API 서버
+# 봇이 사용하는 메서드(auth.test, conversations.history/replies, users.info/list/conversations,
+# chat.postMessage/update, files.upload v2)만 구현하고, 응답 지연과 429(rate limited)를 흉내낼 수 있음.
+#
+# 실행: python bench/fake_slack.py --port 8089 --messages 100000 --latency-ms 20 --rate-limit-every 50
+# 봇 설정: SLACK_API_BASE_URL=http://127.0.0.1:8089/api/ SLACK_BOT_TOKEN=xoxb-fake
+# 호출 통계: curl http://127.0.0.1:8089/_stats  (초기화: curl -X POST http://127.0.0.1:8089/_reset)
+
+BOT_USER_ID = 'UBOT0000001'
+BASE_TS = 1700000000
+
+
+class FakeSlack:
+    def __init__(self, messages=10000, users=50, channels=1, bot_ratio=0.1, latency_ms=0.0,
+                 rate_limit_every=0, rate_limit_prob=0.0, retry_after=1, seed=0):
+        rng = random.Random(seed)
+        self.users = [f"U{i:010d}" for i in range(users)]
+        self.channels = [f"C{i:010d}" for i in range(channels)]
+        # 채널마다 같은 메시지 목록을 사용 (최신순, conversations.history와 같은 순서)
+        self.messages = []
+        for i in reversed(range(messages)):
+            user = BOT_USER_ID if rng.random() < bot_ratio else rng.choice(self.users)
+            words = rng.randint(1, 30)
+            self.messages.append({
+                "type": "message",
+                "user": user,
+                "text": " ".join(f"word{rng.randint(0, 500)}" for _ in range(words)),
+                "ts": f"{BASE_TS + i * 30}.{i % 1000000:06d}",
+            })
+        # 범위 조회용: 최신순 메시지의 -ts (오름차순이므로 bisect 사용 가능)
+        self._neg_ts = [-float(message['ts']) for message in self.messages]
+        self.latency = latency_ms / 1000.0
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_prob = rate_limit_prob
+        self.retry_after = retry_after
+        self._rng = rng
+        self._lock = threading.Lock()
+        self.calls = Counter()
+        self.rate_limited = Counter()
+        self.posted_chars = 0
+        self.uploaded_bytes = 0
+
+    # (HTTP 상태, 응답 dict, 추가 헤더) 리턴
+    def handle(self, method, params):
+        with self._lock:
+            self.calls[method] += 1
+            total = sum(self.calls.values())
+            limited = (self.rate_limit_every and total % self.rate_limit_every == 0) or \
+                (self.rate_limit_prob and self._rng.random() < self.rate_limit_prob)
+            if limited:
+                self.rate_limited[method] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if limited:
+            return 429, {"ok": False, "error": "ratelimited"}, {"Retry-After": str(self.retry_after)}
+
+        handler = getattr(self, 'api_' + method.replace('.', '_'), None)
+        if handler is None:
+            return 200, {"ok": False, "error": "unknown_method"}, {}
+        return 200, handler(params), {}
+
+    def api_auth_test(self, params):
+        return {"ok": True, "user_id": BOT_USER_ID, "bot_id": "BFAKE", "team_id": "TFAKE", "user": "the_gull"}
+
+    # items[start:end]를 cursor(start부터의 위치)/limit 기준으로 한 페이지만 잘라 (페이지, 다음 cursor) 리턴
+    def _page(self, items, params, default_limit=100, start=0, end=None):
+        end = len(items) if end is None else end
+        limit = min(int(params.get('limit') or default_limit), 1000)
+        offset = start + int(params.get('cursor') or 0)
+        page = items[offset:min(offset + limit, end)]
+        next_cursor = str(offset + limit - start) if offset + limit < end else ''
+        return page, next_cursor
+
+    def api_conversations_history(self, params):
+        if params.get('channel') not in self.channels:
+            return {"ok": False, "error": "channel_not_found"}
+        # oldest < ts <= latest 범위의 위치를 이진 탐색으로 찾음
+        oldest, latest = params.get('oldest'), params.get('latest')
+        start = bisect.bisect_left(self._neg_ts, -float(latest)) if latest else 0
+        end = bisect.bisect_left(self._neg_ts, -float(oldest)) if oldest else len(self.messages)
+        page, next_cursor = self._page(self.messages, params, start=start, end=end)
+        return {
+            "ok": True,
+            "messages": page,
+            "has_more": bool(next_cursor),
+            "response_metadata": {"next_cursor": next_cursor},
+        }
+
+    def api_conversations_replies(self, params):
+        parent = {"type": "message", "user": self.users[0], "text": "thread parent", "ts": params.get('ts')}
+        replies = [
+            {"type": "message", "user": self.users[i % len(self.users)], "text": f"reply {i}",
+             "ts": f"{float(params.get('ts')) + i + 1:.6f}", "thread_ts": params.get('ts')}
+            for i in range(20)
+        ]
+        page, next_cursor = self._page([parent] + replies, params)
+        return {"ok": True, "messages": page, "has_more": bool(next_cursor),
+                "response_metadata": {"next_cursor": next_cursor}}
+
+    def _user(self, user_id):
+        return {"id": user_id, "name": "the_gull" if user_id == BOT_USER_ID else f"user_{user_id[-4:]}"}
+
+    def api_users_info(self, params):
+        return {"ok": True, "user": self._user(params.get('user'))}
+
+    def api_users_list(self, params):
+        members, next_cursor = self._page([self._user(user_id) for user_id in self.users + [BOT_USER_ID]], params)
+        return {"ok": True, "members": members, "response_metadata": {"next_cursor": next_cursor}}
+
+    def api_users_conversations(self, params):
+        channels, next_cursor = self._page([{"id": channel_id} for channel_id in self.channels], params)
+        return {"ok": True, "channels": channels, "response_metadata": {"next_cursor": next_cursor}}
+
+    def api_chat_postMessage(self, params):
+        with self._lock:
+            self.posted_chars += len(json.dumps(params.get('blocks') or params.get('text') or ''))
+        return {"ok": True, "channel": params.get('channel'), "ts": f"{time.time():.6f}"}
+
+    def api_chat_postEphemeral(self, params):
+        return {"ok": True, "message_ts": f"{time.time():.6f}"}
+
+    def api_chat_update(self, params):
+        return {"ok": True, "channel": params.get('channel'), "ts": params.get('ts')}
+
+    def api_files_getUploadURLExternal(self, params):
+        return {"ok": True, "upload_url": f"{self.base_url}upload/F{self.calls['files.getUploadURLExternal']:08d}",
+                "file_id": f"F{self.calls['files.getUploadURLExternal']:08d}"}
+
+    def api_files_completeUploadExternal(self, params):
+        files = params.get('files')
+        if isinstance(files, str):
+            files = json.loads(files)
+        return {"ok": True, "files": [{"id": f['id']} for f in files or []]}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "rate_limited": dict(self.rate_limited),
+                "total_calls": sum(self.calls.values()),
+                "posted_chars": self.posted_chars,
+                "uploaded_bytes": self.uploaded_bytes,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.rate_limited.clear()
+            self.posted_chars = 0
+            self.uploaded_bytes = 0
+
+
+def make_handler(slack):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, headers=None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _params(self):
+            parts = urlsplit(self.path)
+            params = dict(parse_qsl(parts.query))
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                params.update(json.loads(body or b'{}'))
+            elif body:
+                params.update(parse_qsl(body.decode('utf-8', 'replace')))
+            return parts.path, params, body
+
+        def do_GET(self):
+            if self.path.startswith('/_stats'):
+                return self._send(200, slack.stats())
+            # AsyncWebClient는 conversations.history 등 일부 메서드를 GET(쿼리 문자열)으로 호출함
+            path, params, _ = self._params()
+            if not path.startswith('/api/'):
+                return self._send(404, {"ok": False, "error": "not_found"})
+            status, response, headers = slack.handle(path[len('/api/'):], params)
+            self._send(status, response, headers)
+
+        def do_POST(self):
+            path, params, body = self._params()
+            if path == '/_reset':
+                slack.reset()
+                return self._send(200, {"ok": True})
+            if path.startswith('/upload/'):
+                with slack._lock:
+                    slack.uploaded_bytes += len(body)
+                return self._send(200, {"ok": True})
+            if not path.startswith('/api/'):
+                return self._send(404, {"ok": False, "error": "not_found"})
+            status, response, headers = slack.handle(path[len('/api/'):], params)
+            self._send(status, response, headers)
+
+    return Handler
+
+
+# 가짜 Slack 서버를 백그라운드 스레드에서 시작하고 (server, FakeSlack) 리턴 (port=0이면 빈 포트 사용)
+def start_server(port=0, host='127.0.0.1', **options):
+    slack = FakeSlack(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(slack))
+    server.daemon_threads = True
+    slack.base_url = f"http://{host}:{server.server_port}/"
+    threading.Thread(target=server.serve_forever, name='fake-slack', daemon=True).start()
+    return server, slack
+
+
+def add_arguments(parser):
+    parser.add_argument('--messages', type=int, default=10000, help="채널당 메시지 수")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--channels', type=int, default=1)
+    parser.add_argument('--bot-ratio', type=float, default=0.1, help="봇이 보낸 메시지 비율")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="API 호출마다 더하는 지연 시간")
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="N번째 호출마다 429 응답 (0이면 사용 안 함)")
+    parser.add_argument('--rate-limit-prob', type=float, default=0.0, help="호출마다 429를 응답할 확률")
+    parser.add_argument('--retry-after', type=int, default=1, help="429 응답의 Retry-After(초)")
+
+
+def server_options(args):
+    return {
+        "messages": args.messages,
+        "users": args.users,
+        "channels": args.channels,
+        "bot_ratio": args.bot_ratio,
+        "latency_ms": args.latency_ms,
+        "rate_limit_every": args.rate_limit_every,
+        "rate_limit_prob": args.rate_limit_prob,
+        "retry_after": args.retry_after,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Slack Web API server for offline benchmarks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server, slack = start_server(args.port, args.host, **server_options(args))
+    print(f"Fake Slack API listening on {slack.base_url}api/ (channels: {', '.join(slack.channels)})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
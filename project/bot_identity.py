@@ -0,0 +1,71 @@
+import threading
+
+
+# auth.test로 알아낸 봇 정보(user_id 등)를 토큰별로 기억
+# 봇 user_id는 프로세스가 떠 있는 동안 바뀌지 않으므로 요청마다 auth.test를 부르지 않고,
+# 클라이언트의 토큰이 바뀌었을 때만 다시 조회함.
+class BotIdentity:
+    def __init__(self):
+        self._cached = None  # (토큰, 봇 정보) - 한 번에 바꿔서 토큰과 정보가 어긋나지 않게 함
+        self._lock = threading.Lock()
+
+        self.api_calls = 0
+        self.invalidations = 0
+
+    def _cached_for(self, token):
+        cached = self._cached
+        if cached is not None and cached[0] == token:
+            return cached[1]
+        return None
+
+    def _store(self, token, response):
+        identity = {
+            "user_id": response['user_id'],
+            "bot_id": response.get('bot_id'),
+            "team_id": response.get('team_id'),
+        }
+        self._cached = (token, identity)
+        return identity
+
+    # 캐시된 봇 정보를 리턴하고, 없거나 토큰이 바뀌었으면 auth.test로 조회
+    def resolve(self, client):
+        token = client.token
+        identity = self._cached_for(token)
+        if identity is not None:
+            return identity
+        with self._lock:
+            identity = self._cached_for(token)
+            if identity is not None:
+                return identity
+            self.api_calls += 1
+            return self._store(token, client.auth_test())
+
+    # AsyncWebClient용 resolve (같은 토큰에 대한 동시 조회가 겹쳐도 결과는 같으므로 잠그지 않음)
+    async def aresolve(self, client):
+        token = client.token
+        identity = self._cached_for(token)
+        if identity is not None:
+            return identity
+        self.api_calls += 1
+        return self._store(token, await client.auth_test())
+
+    def user_id(self, client):
+        return self.resolve(client)['user_id']
+
+    async def auser_id(self, client):
+        return (await self.aresolve(client))['user_id']
+
+    # 토큰이 폐기(invalid_auth 등)되었을 때 다음 조회에서 다시 확인하도록 비움
+    # (SlackScheduler.on_auth_error로 등록해서 인증 에러를 받으면 호출됨)
+    def invalidate(self):
+        if self._cached is not None:
+            self.invalidations += 1
+        self._cached = None
+
+    def stats(self):
+        cached = self._cached
+        return {
+            "user_id": cached[1]['user_id'] if cached else None,
+            "api_calls": self.api_calls,
+            "invalidations": self.invalidations,
+        }
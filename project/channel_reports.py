@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from slack_sdk.errors import SlackApiError
+
+
+# 여러 채널에 걸친 리포트를 map/reduce로 만드는 도구
+# 채널마다 부분 집계(map)를 병렬로 만들고 호출한 쪽에서 합침(reduce).
+# 모든 Slack 호출은 같은 SlackScheduler를 거치므로 병렬로 돌려도 전체 호출 한도는 함께 지켜짐.
+
+
+# 봇이 들어가 있는 채널 ID를 차례로 돌려주는 제너레이터 (보관된 채널 제외)
+def iter_member_channels(client, types='public_channel,private_channel'):
+    next_cursor = None
+    while True:
+        result = client.users_conversations(
+            types=types,
+            exclude_archived=True,
+            limit=999,
+            cursor=next_cursor
+        )
+        for channel in result['channels']:
+            yield channel['id']
+
+        next_cursor = result.get('response_metadata', {}).get('next_cursor')
+        if not next_cursor:
+            return
+
+
+# channel_ids마다 map_channel(channel_id)을 최대 max_workers개씩 동시에 실행
+# ({channel_id: 결과}, {channel_id: 에러 메시지}) 리턴. 한 채널이 실패해도 나머지는 계속 진행함
+# on_progress(끝난 채널 수, 전체 채널 수)는 채널 하나가 끝날 때마다 호출됨
+def map_channels(channel_ids, map_channel, max_workers=4, on_progress=None):
+    results = {}
+    errors = {}
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='thegull-report') as executor:
+        futures = {executor.submit(map_channel, channel_id): channel_id for channel_id in channel_ids}
+        for future in as_completed(futures):
+            channel_id = futures[future]
+            try:
+                results[channel_id] = future.result()
+            except SlackApiError as e:
+                errors[channel_id] = e.response['error']
+            except Exception as e:
+                errors[channel_id] = str(e)
+
+            done += 1
+            if on_progress:
+                on_progress(done, len(futures))
+
+    return results, errors
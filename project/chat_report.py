@@ -0,0 +1,12 @@
+# 동기(WebClient) / 비동기(AsyncWebClient) 실행 경로에서 함께 쓰는 발화량 결과 메시지
+# 채팅 로그 줄 포맷은 log_render.LogRenderer를 사용
+
+
+# 가장 많이 발화한 사용자를 찾아 결과 메시지를 만듦
+def most_active_user_message(user_message_count):
+    if not user_message_count:
+        return "There are no messages to analyze."
+
+    most_active_user = max(user_message_count, key=user_message_count.get)
+    most_active_count = user_message_count[most_active_user]
+    return f"User <@{most_active_user}> has spoken the most with {most_active_count} messages."
@@ -0,0 +1,177 @@
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from speech_analytics import parse_window
+
+
+# 슬래시 명령 인자(text)에서 조회 범위(since/until)와 스레드 지정을 읽음
+# 예) '/botchatlog 7d', '/botchatlog since=2024-05-01 until=2024-05-31',
+#     '/botchatlog thread=https://xxx.slack.com/archives/C123/p1712345678123456'
+#     '/speechquantity channels=all 30d', '/speechquantity <#C123|general> <#C456|random>'
+#     '/searchchatlog from=@minsu 회의록 30d'
+
+_DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_TS_PATTERN = re.compile(r'^\d{9,10}(\.\d{1,6})?$')
+# 메시지 링크의 ts 부분 (p + 초 10자리 + 마이크로초 6자리)
+_PERMALINK_TS_PATTERN = re.compile(r'/p(\d{10})(\d{6})')
+# 채널 멘션(<#C123|general>) 또는 채널 ID
+_CHANNEL_MENTION_PATTERN = re.compile(r'^<#([CG][A-Z0-9]+)(\|[^>]*)?>$')
+_CHANNEL_ID_PATTERN = re.compile(r'^[CG](?=[A-Z]*\d)[A-Z0-9]{6,}$')
+# 사용자 멘션(<@U123|minsu>, 이미 <>를 뗀 값) 또는 사용자 ID
+_USER_PATTERN = re.compile(r'^@?([UW](?=[A-Z]*\d)[A-Z0-9]{6,})(\|[^>]*)?$')
+
+
+# 초 단위 시각을 Slack ts 문자열로 변환
+def format_ts(seconds):
+    return f"{seconds:.6f}"
+
+
+# 시각 표기를 Slack ts 문자열로 변환. 변환할 수 없으면 None
+# 7d/12h/2w: 지금부터 그만큼 전, 2024-05-01: 그 날 0시(tz_name 기준), 1712345678.123456: Slack ts 그대로
+# end_of_day=True면 날짜를 다음 날 0시로 바꿔서 until에 준 날짜가 범위에 포함되도록 함
+def parse_time(value, tz_name='UTC', now=None, end_of_day=False):
+    now = time.time() if now is None else now
+
+    seconds = parse_window(value)
+    if seconds:
+        return format_ts(now - seconds)
+
+    if _DATE_PATTERN.match(value):
+        try:
+            day = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=ZoneInfo(tz_name))
+        except ValueError:
+            return None
+        if end_of_day:
+            day += timedelta(days=1)
+        return format_ts(day.timestamp())
+
+    if _TS_PATTERN.match(value):
+        return format_ts(float(value))
+    return None
+
+
+# 시각 표기를 작업 key와 작업 안에서 쓸 형태로 정규화. 변환할 수 없으면 None
+# 상대 기간(7d)은 '7d' 그대로 두어서 작업을 실행할 때 resolve_range로 계산하고 (같은 요청이 key 하나로 합쳐지도록)
+# 날짜는 tz_name 기준 Slack ts로 바꿔 둠 (요청한 사람의 시간대가 작업 key에 필요 없도록)
+def normalize_time(value, tz_name='UTC', end_of_day=False):
+    if parse_window(value):
+        return value.lower()
+    return parse_time(value, tz_name, end_of_day=end_of_day)
+
+
+# 정규화한 since/until을 (oldest, latest) Slack ts 문자열로. 작업이 실행되는 시점(now) 기준으로 계산
+def resolve_range(since=None, until=None, now=None):
+    now = time.time() if now is None else now
+    oldest = parse_time(since, now=now) if since else None
+    latest = parse_time(until, now=now, end_of_day=True) if until else None
+    return oldest, latest
+
+
+# 스레드 지정(부모 메시지 ts 또는 메시지 링크)을 Slack ts 문자열로 변환. 변환할 수 없으면 None
+def parse_thread_ts(value):
+    match = _PERMALINK_TS_PATTERN.search(value)
+    if match:
+        return f"{match.group(1)}.{match.group(2)}"
+    if _TS_PATTERN.match(value):
+        return value
+    return None
+
+
+# 채널 지정(멘션 또는 ID)을 채널 ID로 변환. 변환할 수 없으면 None
+def parse_channel(value):
+    match = _CHANNEL_MENTION_PATTERN.match(value)
+    if match:
+        return match.group(1)
+    if _CHANNEL_ID_PATTERN.match(value):
+        return value
+    return None
+
+
+# 사용자 지정(멘션, ID 또는 @username)을 ('id', user_id) 또는 ('name', username)으로 변환. 비어 있으면 None
+def parse_user(value):
+    match = _USER_PATTERN.match(value)
+    if match:
+        return 'id', match.group(1)
+    name = value.lstrip('@')
+    return ('name', name) if name else None
+
+
+# 명령 인자를 {'words', 'since', 'until', 'oldest', 'latest', 'thread_ts', 'channels', 'user'}로 변환. 값이 잘못된 옵션이 있으면 None
+# 옵션이 아닌 기간 표기(7d 등)는 since로, 채널 멘션은 channels로 취급하고, 나머지 단어는 words에 순서대로 담음
+# channels는 None(지정 안 함), 'all'(봇이 들어가 있는 모든 채널), 채널 ID 리스트 중 하나
+# user(from=)는 None 또는 parse_user 결과
+# since/until은 normalize_time 결과 (작업 key와 작업 인자로 사용), oldest/latest는 지금(now) 기준으로 계산한 Slack ts
+def parse_command_args(text, tz_name='UTC', now=None):
+    now = time.time() if now is None else now
+    args = {'words': [], 'since': None, 'until': None, 'oldest': None, 'latest': None, 'thread_ts': None, 'channels': None, 'user': None}
+
+    for token in (text or '').split():
+        key, sep, value = token.partition('=')
+        key = key.lower()
+
+        channel = parse_channel(token) if not sep else None
+        if channel:
+            if args['channels'] == 'all':
+                continue
+            args['channels'] = (args['channels'] or []) + [channel]
+            continue
+
+        # 'Escape channels, users, and links' 옵션이 켜져 있으면 링크가 <...>로 감싸져 옴
+        value = value.strip('<>') if key != 'channels' else value
+
+        if not sep:
+            if token.lower() != 'all' and parse_window(token):
+                key, value = 'since', token
+            else:
+                args['words'].append(token)
+                continue
+
+        if key == 'since':
+            if value.lower() == 'all':
+                continue
+            args['since'] = normalize_time(value, tz_name)
+            if args['since'] is None:
+                return None
+            args['oldest'], _ = resolve_range(args['since'], now=now)
+        elif key == 'until':
+            args['until'] = normalize_time(value, tz_name, end_of_day=True)
+            if args['until'] is None:
+                return None
+            _, args['latest'] = resolve_range(until=args['until'], now=now)
+        elif key == 'thread':
+            args['thread_ts'] = parse_thread_ts(value)
+            if args['thread_ts'] is None:
+                return None
+        elif key == 'channels':
+            if value.lower() == 'all':
+                args['channels'] = 'all'
+                continue
+            channels = [parse_channel(item) for item in value.split(',') if item]
+            if not channels or None in channels:
+                return None
+            if args['channels'] != 'all':
+                args['channels'] = (args['channels'] or []) + channels
+        elif key == 'from':
+            args['user'] = parse_user(value)
+            if args['user'] is None:
+                return None
+        else:
+            return None
+
+    if args['oldest'] and args['latest'] and float(args['oldest']) >= float(args['latest']):
+        return None
+    return args
+
+
+# 범위를 사람이 읽을 수 있는 설명으로 (리포트 제목 등에 사용)
+def describe_range(args):
+    parts = []
+    if args.get('thread_ts'):
+        parts.append(f"thread {args['thread_ts']}")
+    if args.get('oldest'):
+        parts.append(f"since {datetime.fromtimestamp(float(args['oldest']), timezone.utc):%Y-%m-%d %H:%M} UTC")
+    if args.get('latest'):
+        parts.append(f"until {datetime.fromtimestamp(float(args['latest']), timezone.utc):%Y-%m-%d %H:%M} UTC")
+    return ", ".join(parts) or "all time"
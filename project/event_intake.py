@@ -0,0 +1,87 @@
+import logging
+import os
+import queue
+import threading
+
+from metrics import EVENTS_PROCESSED
+from slack_security import ExpiringSet
+
+logger = logging.getLogger(__name__)
+
+
+# Events API 이벤트 접수 단계
+# HTTP 워커는 event_id 중복 확인 후 내부 큐에 넣고 바로 응답하고(Slack은 3초 안에 응답이 없으면 재전송함),
+# 실제 처리는 별도 스레드 하나가 큐에서 꺼내 순서대로 처리함.
+class EventIntake:
+    def __init__(self, handler, dedup_ttl=3600, dedup_size=10000, queue_size=1000):
+        self.handler = handler  # handler(event) - slack_event['event']를 받아 처리하는 함수
+        self._seen = ExpiringSet(ttl=dedup_ttl, maxsize=dedup_size)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        # 메트릭
+        self.received = 0
+        self.retries = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self.processed = 0
+        self.failed = 0
+
+    # 처리 스레드를 처음 이벤트가 들어올 때 시작 (gunicorn fork 이후에는 자식 프로세스에서 새로 시작)
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._thread = threading.Thread(target=self._work, name='thegull-events', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    # 이벤트 payload를 접수. 'queued', 'duplicate', 'dropped' 중 하나를 리턴
+    # retry_num은 X-Slack-Retry-Num 헤더 값 (재전송일 때만 있음)
+    def accept(self, payload, retry_num=None):
+        self.received += 1
+        if retry_num:
+            self.retries += 1
+
+        # 이미 접수한 event_id면 (재전송 포함) 다시 처리하지 않음
+        event_id = payload.get('event_id')
+        if event_id and not self._seen.add(event_id):
+            self.duplicates += 1
+            return 'duplicate'
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(payload['event'])
+        except queue.Full:
+            # 큐가 가득 차면 접수하지 않은 것으로 되돌려서 Slack이 다시 보내도록 함
+            if event_id:
+                self._seen.discard(event_id)
+            self.dropped += 1
+            return 'dropped'
+        return 'queued'
+
+    def _work(self):
+        while True:
+            event = self._queue.get()
+            try:
+                self.handler(event)
+                self.processed += 1
+                EVENTS_PROCESSED.inc('ok')
+            except Exception as e:
+                logger.error("Event handling failed: %s", e)
+                self.failed += 1
+                EVENTS_PROCESSED.inc('failed')
+            finally:
+                self._queue.task_done()
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "retries": self.retries,
+            "duplicates": self.duplicates,
+            "dropped": self.dropped,
+            "queue_depth": self._queue.qsize(),
+            "processed": self.processed,
+            "failed": self.failed,
+        }
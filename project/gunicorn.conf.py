@@ -0,0 +1,50 @@
+import multiprocessing
+import os
+
+# gunicorn 설정 파일 (운영 환경 실행용)
+# 실행: gunicorn -c gunicorn.conf.py slack_test:app
+
+# 환경 변수를 사용하여 호스트와 포트를 설정 (기본값은 0.0.0.0과 5000, flask run과 동일)
+bind = f"{os.getenv('FLASK_RUN_HOST', '0.0.0.0')}:{os.getenv('FLASK_RUN_PORT', 5000)}"
+
+# 워커/스레드 수는 CPU 수 기준으로 정함.
+# 슬래시 명령 라우트는 작업 큐에 넣고 바로 응답하므로 워커 프로세스보다 스레드를 늘리는 편이 효율적임.
+# 사용자 캐시, 작업 중복 확인, 호출 한도(토큰 버킷)는 SHARED_STATE가 없으면 워커 프로세스마다 따로 있으므로
+# 워커가 여럿이면 같은 작업이 겹치고 워커 수만큼 호출 한도를 넘게 됨. 그래서 SHARED_STATE가 없으면 워커는 1개.
+# SHARED_STATE=sqlite로 설정하면 워커끼리 공유하므로 CPU 수(최대 4)만큼 워커를 띄움.
+cpu_count = multiprocessing.cpu_count()
+workers = int(os.getenv('GUNICORN_WORKERS', min(cpu_count, 4) if os.getenv('SHARED_STATE') else 1))
+threads = int(os.getenv('GUNICORN_THREADS', cpu_count * 2))
+worker_class = 'gthread'
+
+# 앱(Slack 클라이언트, 캐시, 저장소 설정)을 마스터에서 한 번만 만들고 워커는 fork로 공유
+# (DB 커넥션, 작업 스레드, 이벤트 루프는 각 워커에서 처음 사용할 때 만들어짐)
+preload_app = True
+
+# nginx/ingress 뒤에서 커넥션을 재사용하도록 keep-alive 유지
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Slack은 3초 안에 응답을 받아야 하므로 요청 타임아웃은 짧게,
+# 종료 시에는 진행 중인 백그라운드 작업이 끝날 때까지 기다릴 수 있도록 graceful_timeout은 길게
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 120))
+
+accesslog = '-'
+errorlog = '-'
+
+
+# 워커마다 Slack 커넥션, 봇 정보, 사용자 디렉터리를 미리 준비 (끝나기 전까지 /ready는 503)
+# preload_app으로 마스터에서 만든 스레드와 커넥션은 fork한 워커로 넘어가지 않으므로 워커에서 시작함
+def post_worker_init(worker):
+    import slack_test
+    slack_test.warmup.start()
+
+
+# 워커가 종료될 때 작업 큐에 남은 작업(채팅 로그 전송, 발화량 분석)이 끝날 때까지 기다림
+# 비동기 경로(SLACK_BACKEND=async)를 쓰면 작업이 끝난 뒤 이벤트 루프의 aiohttp 세션도 닫음
+def worker_exit(server, worker):
+    import slack_test
+    server.log.info("Waiting for background jobs to finish (pid: %s)", worker.pid)
+    slack_test.job_queue.shutdown(wait=True)
+    if slack_test.async_backend is not None:
+        slack_test.async_backend.close()
@@ -0,0 +1,121 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from metrics import JOB_DURATION
+from shared_state import process_owner
+
+logger = logging.getLogger(__name__)
+
+
+# 슬래시 명령 백그라운드 작업용 작업 큐 (워커 수 제한 + 같은 작업 합치기)
+# 같은 key(예: ('speechquantity', channel_id))의 작업이 이미 대기/실행 중이면
+# 새로 실행하지 않고 기존 작업의 결과를 함께 받음.
+# shared(공유 상태 저장소)를 주면 다른 프로세스(gunicorn 워커)에서 실행 중인 같은 작업도 합침.
+# 이때는 결과를 받을 수 없으므로 바로 끝난 future(결과 None)를 돌려줌.
+class JobQueue:
+    def __init__(self, max_workers=4, max_pending=32, shared=None, claim_ttl=1800):
+        self.max_workers = max_workers
+        self.max_pending = max_pending  # 대기열 최대 길이 (넘으면 거절)
+        self.shared = shared
+        self.claim_ttl = claim_ttl  # 프로세스가 죽어도 이 시간(초)이 지나면 같은 작업을 다시 실행할 수 있음
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='thegull-job')
+        self._lock = threading.Lock()
+        self._jobs = {}  # key -> Future (대기 또는 실행 중인 작업)
+
+        # 메트릭
+        self.pending = 0  # 대기 중인 작업 수 (큐 깊이)
+        self.running = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.coalesced_remote = 0  # 다른 프로세스의 작업과 합친 수
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    # 공유 상태 저장소에서 쓰는 작업 key (튜플 안의 튜플/None도 같은 문자열이 되도록 JSON으로)
+    @staticmethod
+    def _claim_key(key):
+        return 'job:' + json.dumps(key, ensure_ascii=False, default=str)
+
+    # 작업을 큐에 넣음. (future, coalesced) 리턴, 대기열이 가득 차면 (None, False) 리턴
+    def submit(self, key, fn, *args):
+        with self._lock:
+            future = self._jobs.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, True
+
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                return None, False
+
+            if self.shared is not None and not self.shared.claim(self._claim_key(key), process_owner(), self.claim_ttl):
+                self.coalesced += 1
+                self.coalesced_remote += 1
+                future = Future()
+                future.set_result(None)
+                return future, True
+
+            self.pending += 1
+            self.submitted += 1
+            future = self._executor.submit(self._run, key, time.monotonic(), fn, args)
+            self._jobs[key] = future
+            return future, False
+
+    def _run(self, key, enqueued_at, fn, args):
+        waited = time.monotonic() - enqueued_at
+        with self._lock:
+            self.pending -= 1
+            self.running += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+        started = time.monotonic()
+        try:
+            result = fn(*args)
+            JOB_DURATION.observe(time.monotonic() - started, key[0], 'ok')
+            with self._lock:
+                self.completed += 1
+            return result
+        except Exception as e:
+            JOB_DURATION.observe(time.monotonic() - started, key[0], 'failed')
+            logger.error("Job %s failed: %s", key, e)
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+                self._jobs.pop(key, None)
+            if self.shared is not None:
+                try:
+                    self.shared.release(self._claim_key(key), process_owner())
+                except Exception as e:
+                    # 풀지 못한 claim은 claim_ttl이 지나면 만료됨
+                    logger.warning("Could not release job claim %s: %s", key, e)
+
+    # 실행 중인 작업이 끝날 때까지 기다린 뒤 종료 (graceful shutdown)
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def stats(self):
+        with self._lock:
+            started = self.submitted - self.pending
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self.pending,
+                "running": self.running,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "coalesced_remote": self.coalesced_remote,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "wait_time_avg": self.wait_time_total / started if started else 0.0,
+                "wait_time_max": self.wait_time_max,
+            }
@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+
+# 채팅 로그를 'ID: ..., Username: ..., Time: ..., Message: ...' 줄로 빠르게 만드는 렌더러
+# 메시지마다 datetime/strftime을 부르는 대신, Slack ts의 초 부분만 정수로 읽고
+# UTC 오프셋(1시간 단위)과 'YYYY-MM-DD HH:MM' 문자열(1분 단위)은 캐시해서 초(':SS')만 붙임.
+# 같은 사용자의 'ID: ..., Username: ...' 앞부분도 캐시함.
+# 만든 줄은 outbound.pack_blocks가 받는 대로 블록 크기에 맞춰 묶이므로 전체를 한 번에 만들지 않음.
+
+_CACHE_LIMIT = 100000  # 캐시 항목이 이보다 많아지면 비움 (아주 긴 기간의 로그)
+_SECONDS = [f":{second:02d}" for second in range(60)]
+
+
+# Slack ts('1700000000.123456')의 초 부분을 정수로
+def parse_ts_seconds(ts):
+    if isinstance(ts, str):
+        return int(ts.partition('.')[0])
+    return int(ts)
+
+
+class LogRenderer:
+    def __init__(self, tz_name='UTC'):
+        self.tz = ZoneInfo(tz_name)
+        self._offsets = {}  # UTC 기준 시간(초 // 3600) -> UTC 오프셋(초)
+        self._minutes = {}  # 현지 시각(분 단위) -> 'YYYY-MM-DD HH:MM'
+        self._prefixes = {}  # (user_id, username) -> 'ID: ..., Username: ..., Time: '
+
+    def _offset(self, seconds):
+        hour = seconds // 3600
+        offset = self._offsets.get(hour)
+        if offset is None:
+            if len(self._offsets) > _CACHE_LIMIT:
+                self._offsets.clear()
+            offset = int(datetime.fromtimestamp(hour * 3600, self.tz).utcoffset().total_seconds())
+            # 오프셋이 바뀌는 시각이 정시가 아닌 시간대는 캐시하지 않음
+            if offset == int(datetime.fromtimestamp(hour * 3600 + 3599, self.tz).utcoffset().total_seconds()):
+                self._offsets[hour] = offset
+            else:
+                offset = int(datetime.fromtimestamp(seconds, self.tz).utcoffset().total_seconds())
+        return offset
+
+    def _minute_text(self, minute):
+        if len(self._minutes) > _CACHE_LIMIT:
+            self._minutes.clear()
+        text = self._minutes[minute] = datetime.fromtimestamp(minute * 60, timezone.utc).strftime('%Y-%m-%d %H:%M')
+        return text
+
+    def _prefix(self, user_id, username):
+        if len(self._prefixes) > _CACHE_LIMIT:
+            self._prefixes.clear()
+        prefix = self._prefixes[user_id, username] = f"ID: {user_id}, Username: {username}, Time: "
+        return prefix
+
+    # Slack ts를 사용자 시간대의 'YYYY-MM-DD HH:MM:SS'로
+    def format_ts(self, ts):
+        local = parse_ts_seconds(ts)
+        minute, second = divmod(local + self._offset(local), 60)
+        return (self._minutes.get(minute) or self._minute_text(minute)) + _SECONDS[second]
+
+    # chat_log 항목 하나를 'ID: ..., Username: ..., Time: ..., Message: ...' 한 줄로
+    def render_line(self, log):
+        key = (log['user_id'], log['username'])
+        prefix = self._prefixes.get(key) or self._prefix(*key)
+        return f"{prefix}{self.format_ts(log['timestamp'])}, Message: {log['text']}"
+
+    # 여러 줄을 차례로 만드는 제너레이터. render_line과 같은 결과지만 반복문 안에서 메서드 호출을 줄임
+    def render_lines(self, logs):
+        prefixes = self._prefixes
+        minutes = self._minutes
+        offsets = self._offsets
+        for log in logs:
+            ts = log['timestamp']
+            seconds = int(ts.partition('.')[0]) if isinstance(ts, str) else int(ts)
+            offset = offsets.get(seconds // 3600)
+            if offset is None:
+                offset = self._offset(seconds)
+            minute, second = divmod(seconds + offset, 60)
+            user_id, username = log['user_id'], log['username']
+            yield (
+                f"{prefixes.get((user_id, username)) or self._prefix(user_id, username)}"
+                f"{minutes.get(minute) or self._minute_text(minute)}{_SECONDS[second]}, Message: {log['text']}"
+            )
+
+# 시간대별 렌더러를 하나씩만 만들어 재사용 (캐시를 요청마다 다시 채우지 않도록)
+_renderers = {}
+
+
+def renderer_for(tz_name):
+    renderer = _renderers.get(tz_name)
+    if renderer is None:
+        renderer = _renderers.setdefault(tz_name, LogRenderer(tz_name))
+    return renderer
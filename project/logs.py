@@ -0,0 +1,31 @@
+import logging
+import os
+import random
+
+
+# 로그 설정 (LOG_LEVEL: DEBUG, INFO, WARNING, ERROR)
+# print 대신 logging을 사용해서 운영 환경에서는 레벨로 걸러내고, gunicorn 로그와 같은 형식으로 남김
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# 요청/이벤트 내용처럼 자주, 길게 찍히는 디버그 로그를 남기는 비율 (0~1)
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.01))
+# 샘플 로그에 남기는 내용의 최대 길이
+LOG_SAMPLE_MAX_CHARS = 500
+
+
+def setup_logging():
+    logging.basicConfig(
+        level=LOG_LEVEL,
+        format='%(asctime)s [%(process)d] [%(levelname)s] %(name)s: %(message)s'
+    )
+
+
+# 레벨이 켜져 있을 때만, rate 비율로 남기는 로그. 레벨이 꺼져 있으면 내용을 문자열로 만들지도 않음
+def log_sampled(logger, level, message, payload, rate=None):
+    if not logger.isEnabledFor(level):
+        return
+    if random.random() >= (LOG_SAMPLE_RATE if rate is None else rate):
+        return
+    text = str(payload)
+    if len(text) > LOG_SAMPLE_MAX_CHARS:
+        text = f"{text[:LOG_SAMPLE_MAX_CHARS]}... ({len(text)} chars)"
+    logger.log(level, "%s: %s", message, text)
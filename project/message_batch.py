@@ -0,0 +1,144 @@
+import sys
+from array import array
+
+import numpy as np
+
+
+# 분석 작업용 열 단위 메시지 묶음
+# 메시지마다 dict(user_id, text, timestamp, username 문자열)를 만드는 대신
+# 사용자 ID는 한 번씩만 보관하고 메시지에는 int32 코드만, ts는 int64 마이크로초 배열로,
+# 본문은 이어 붙인 문자열과 int64 오프셋 배열로 보관함. (본문이 없는 메시지는 빈 문자열)
+# 본문 문자열은 메시지 CHUNK_SIZE개마다 하나씩 만들어서, 전체를 다시 합치느라 메모리를 두 배로 쓰지 않게 함.
+# 예전 dict 형식이 필요한 곳에서는 iter_dicts()/to_dicts()로 바꿔 씀.
+
+CHUNK_SIZE = 4096  # 본문 문자열 하나에 담는 메시지 수
+# str.split()이 공백으로 보는 문자들 (모두 U+3000 이하)
+_WHITESPACE = np.array([c for c in range(0x3001) if chr(c).isspace()], dtype=np.uint32)
+
+
+# Slack ts 문자열('1700000000.123456')을 정수 마이크로초로 (float를 거치지 않아 정확함)
+def ts_to_micros(ts):
+    seconds, _, fraction = str(ts).partition('.')
+    if len(fraction) == 6:
+        return int(seconds + fraction)  # 대부분의 Slack ts (소수점 아래 6자리)
+    return int(seconds) * 1000000 + int((fraction + '000000')[:6])
+
+
+def micros_to_ts(micros):
+    return f"{micros // 1000000}.{micros % 1000000:06d}"
+
+
+class MessageBatch:
+    def __init__(self, user_ids, user_codes, ts_micros, chunks, offsets):
+        self.user_ids = user_ids  # 코드 -> user_id
+        self.user_codes = user_codes  # int32, 메시지별 사용자 코드
+        self.ts_micros = ts_micros  # int64, 메시지별 Slack ts (마이크로초)
+        self.chunks = chunks  # k번째 문자열은 메시지 k*CHUNK_SIZE ~ (k+1)*CHUNK_SIZE-1의 본문을 이은 것
+        self.offsets = offsets  # int64, 길이 n+1. 전체 본문을 이었을 때 i번째 본문은 offsets[i]:offsets[i+1]
+
+    # (user_id, ts, text) 튜플을 차례로 읽어 만듦. SQLite 결과처럼 dict 없이 바로 넣을 때 사용
+    # 사용자가 없는 메시지(bot_message 등)와 exclude_user_id(봇)의 메시지는 건너뜀
+    # (저장소의 발화량 카운터도 user_id가 없는 메시지는 세지 않음)
+    @classmethod
+    def from_rows(cls, rows, exclude_user_id=None):
+        codes = {}
+        user_codes = array('i')
+        ts_micros = array('q')
+        offsets = array('q', [0])
+        chunks = []
+        pieces = []
+        size = 0
+
+        for user_id, ts, text in rows:
+            if user_id is None or (exclude_user_id is not None and user_id == exclude_user_id):
+                continue
+            code = codes.get(user_id)
+            if code is None:
+                code = codes[user_id] = len(codes)
+            text = text or ''
+            user_codes.append(code)
+            ts_micros.append(ts_to_micros(ts))
+            size += len(text)
+            offsets.append(size)
+            pieces.append(text)
+            if len(pieces) == CHUNK_SIZE:
+                chunks.append(''.join(pieces))
+                pieces = []
+        if pieces:
+            chunks.append(''.join(pieces))
+
+        return cls(
+            list(codes),
+            np.frombuffer(user_codes, dtype=np.int32) if user_codes else np.array([], dtype=np.int32),
+            np.frombuffer(ts_micros, dtype=np.int64) if ts_micros else np.array([], dtype=np.int64),
+            chunks,
+            np.frombuffer(offsets, dtype=np.int64),
+        )
+
+    # get_chatlog/iter_chatlog의 dict 항목들로 만듦 (username은 보관하지 않음)
+    @classmethod
+    def from_chat_logs(cls, chat_logs, exclude_user_id=None):
+        return cls.from_rows(
+            ((log['user_id'], log['timestamp'], log['text']) for log in chat_logs), exclude_user_id
+        )
+
+    def __len__(self):
+        return len(self.ts_micros)
+
+    # Slack ts(초, float64). 분석용이라 마이크로초 단위까지 정확하지 않아도 됨
+    def timestamps(self):
+        return self.ts_micros / 1e6
+
+    def text_at(self, i):
+        chunk = i // CHUNK_SIZE
+        base = self.offsets[chunk * CHUNK_SIZE]
+        return self.chunks[chunk][self.offsets[i] - base:self.offsets[i + 1] - base]
+
+    # 메시지별 글자 수 (int32)
+    def char_counts(self):
+        return np.diff(self.offsets).astype(np.int32)
+
+    # 메시지별 단어 수 (str.split 기준, int32)
+    # 본문 문자열을 하나씩 코드포인트 배열로 바꿔서, 공백이 아닌 글자 중 앞 글자가 공백이거나
+    # 메시지의 첫 글자인 위치(단어 시작)를 세어 메시지별로 합침
+    def word_counts(self):
+        counts = np.zeros(len(self), dtype=np.int32)
+        for k, chunk in enumerate(self.chunks):
+            first = k * CHUNK_SIZE
+            last = min(first + CHUNK_SIZE, len(self))
+            bounds = self.offsets[first:last + 1] - self.offsets[first]
+            chars = np.frombuffer(chunk.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+            space = np.isin(chars, _WHITESPACE)
+            starts = ~space
+            starts[1:] &= space[:-1]
+            heads = bounds[:-1][bounds[:-1] < len(chars)]  # 메시지 첫 글자 위치 (빈 메시지는 다음 메시지와 겹침)
+            starts[heads] = ~space[heads]
+            cumulative = np.concatenate(([0], np.cumsum(starts)))
+            counts[first:last] = cumulative[bounds[1:]] - cumulative[bounds[:-1]]
+        return counts
+
+    # 예전 dict 형식({'user_id', 'text', 'timestamp'})으로 하나씩 돌려줌
+    def iter_dicts(self):
+        user_ids = self.user_ids
+        for k, chunk in enumerate(self.chunks):
+            first = k * CHUNK_SIZE
+            last = min(first + CHUNK_SIZE, len(self))
+            bounds = (self.offsets[first:last + 1] - self.offsets[first]).tolist()
+            codes = self.user_codes[first:last].tolist()
+            micros = self.ts_micros[first:last].tolist()
+            for i in range(last - first):
+                yield {
+                    "user_id": user_ids[codes[i]],
+                    "text": chunk[bounds[i]:bounds[i + 1]],
+                    "timestamp": micros_to_ts(micros[i]),
+                }
+
+    def to_dicts(self):
+        return list(self.iter_dicts())
+
+    # 배열과 본문 문자열이 차지하는 바이트 수 (user_ids 목록 제외)
+    def nbytes(self):
+        return (
+            self.user_codes.nbytes + self.ts_micros.nbytes + self.offsets.nbytes
+            + sum(sys.getsizeof(chunk) for chunk in self.chunks)
+        )
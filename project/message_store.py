@@ -0,0 +1,468 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from message_batch import MessageBatch
+
+logger = logging.getLogger(__name__)
+
+
+# 기본 저장 위치: docker-compose에서 마운트한 /mnt/data 볼륨이 있으면 그곳을 사용
+def default_store_path():
+    if os.path.isdir('/mnt/data'):
+        return '/mnt/data/thegull.db'
+    return 'thegull.db'
+
+
+# 검색어를 FTS5 trigram 인덱스로 찾을 수 있는 최소 길이. 이보다 짧은 검색어(2글자 한국어 단어 등)는 LIKE로 찾음
+SEARCH_MIN_TRIGRAM = 3
+
+
+# 검색어 문자열을 단어 목록으로 (큰따옴표로 묶은 구절은 한 단어로)
+def split_search_terms(query):
+    terms = []
+    for i, part in enumerate(query.split('"')):
+        if i % 2:
+            part = part.strip()
+            if part:
+                terms.append(part)
+        else:
+            terms.extend(part.split())
+    return terms
+
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+# Events API message 이벤트 중 메시지 내용이 있어서 저장소에 넣는 subtype (None은 일반 메시지)
+STORED_MESSAGE_SUBTYPES = {None, 'thread_broadcast', 'bot_message', 'file_share', 'me_message'}
+
+
+# conversations.history/conversations.replies 한 페이지에 요청하는 메시지 수
+# (기본값 100 대신 최대치에 가깝게 요청해서 같은 범위를 더 적은 호출로 가져옴)
+HISTORY_PAGE_LIMIT = 999
+
+
+# conversations.history를 페이지 단위로 가져오는 제너레이터 (한 번에 한 페이지의 메시지 리스트를 돌려줌)
+# oldest/latest(Slack ts)를 주면 그 범위(oldest < ts <= latest)만 가져옴
+def iter_history_pages(client, channel_id, oldest=None, latest=None, limit=HISTORY_PAGE_LIMIT):
+    has_more = True
+    next_cursor = None
+
+    while has_more:
+        result = client.conversations_history(
+            channel=channel_id,
+            oldest=oldest,
+            latest=latest,
+            limit=limit,
+            cursor=next_cursor  # 페이지네이션을 위한 cursor
+        )
+
+        yield result["messages"]
+
+        # 페이지네이션 정보 업데이트
+        has_more = result.get('has_more', False)
+        next_cursor = result.get('response_metadata', {}).get('next_cursor')
+
+
+# 스레드(부모 메시지 + 답글)를 conversations.replies로 가져와 iter_messages와 같은 형식으로 돌려줌
+# 스레드 답글은 저장소에 없으므로 바로 가져오고, 순서는 스레드에 보이는 순서(오래된 것부터)를 따름
+def iter_thread_messages(client, channel_id, thread_ts, oldest=None, latest=None, limit=HISTORY_PAGE_LIMIT):
+    has_more = True
+    next_cursor = None
+
+    while has_more:
+        result = client.conversations_replies(
+            channel=channel_id,
+            ts=thread_ts,
+            oldest=oldest,
+            latest=latest,
+            limit=limit,
+            cursor=next_cursor
+        )
+
+        for message in result["messages"]:
+            yield {
+                "user_id": message.get('user'),
+                "text": message.get('text'),
+                "timestamp": message['ts']
+            }
+
+        has_more = result.get('has_more', False)
+        next_cursor = result.get('response_metadata', {}).get('next_cursor')
+
+
+# 채널 메시지를 로컬 SQLite에 보관하는 저장소 (channel, ts 기준)
+# 채널마다 마지막으로 동기화한 ts(high-water mark)를 기록해두고,
+# 다음 동기화 때는 그 이후의 메시지만 conversations.history로 가져옴.
+# 메시지 본문은 FTS5 trigram 인덱스(messages_fts)에도 트리거로 함께 넣어 두어 검색에 사용함.
+class MessageStore:
+    def __init__(self, path):
+        self.path = path
+        self.search_enabled = None  # FTS5(trigram)를 쓸 수 있는 SQLite인지 (처음 연결할 때 확인)
+        self._local = threading.local()
+        self._sync_locks = {}
+        self._sync_locks_lock = threading.Lock()
+
+    # 스레드마다 커넥션을 따로 사용 (gunicorn fork 이후에도 새로 열리도록 pid 확인)
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._init_schema(conn)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_schema(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS messages (
+                channel_id TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                user_id TEXT,
+                text TEXT,
+                PRIMARY KEY (channel_id, ts)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS sync_state (
+                channel_id TEXT PRIMARY KEY,
+                high_water TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS report_snapshots (
+                channel_id TEXT NOT NULL,
+                report TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (channel_id, report)
+            ) WITHOUT ROWID;
+        """)
+
+        # 채널별/사용자별 메시지 수 (발화량 분석용). messages에 실제로 추가/삭제될 때 트리거로 갱신
+        created = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_message_counts'"
+        ).fetchone() is None
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS user_message_counts (
+                channel_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (channel_id, user_id)
+            ) WITHOUT ROWID;
+            CREATE TRIGGER IF NOT EXISTS messages_count_insert AFTER INSERT ON messages
+            WHEN NEW.user_id IS NOT NULL BEGIN
+                INSERT INTO user_message_counts (channel_id, user_id, count) VALUES (NEW.channel_id, NEW.user_id, 1)
+                ON CONFLICT(channel_id, user_id) DO UPDATE SET count = count + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS messages_count_delete AFTER DELETE ON messages
+            WHEN OLD.user_id IS NOT NULL BEGIN
+                UPDATE user_message_counts SET count = count - 1
+                WHERE channel_id = OLD.channel_id AND user_id = OLD.user_id;
+            END;
+        """)
+
+        # 카운터 테이블이 생기기 전에 저장된 메시지가 있으면 한 번 채워줌
+        if created:
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO user_message_counts (channel_id, user_id, count) "
+                    "SELECT channel_id, user_id, COUNT(*) FROM messages "
+                    "WHERE user_id IS NOT NULL GROUP BY channel_id, user_id"
+                )
+
+        self._init_search_schema(conn)
+
+    # 검색 인덱스: 본문을 trigram으로 나눠 색인하므로 띄어쓰기와 관계없이 한국어 부분 문자열도 찾을 수 있음
+    # messages는 rowid가 없는 테이블이라 FTS5 external content로 쓸 수 없어서 본문을 따로 보관하고,
+    # (channel_id, ts) -> FTS rowid 매핑(message_search_rows)으로 수정/삭제를 반영함 (트리거)
+    # 새 메시지는 트리거 대신 add_messages에서 페이지 단위로 한 번에 색인함
+    # (트리거로 한 줄씩 넣으면 FTS5가 줄마다 색인을 디스크에 내려서 7배쯤 느려짐)
+    def _init_search_schema(self, conn):
+        created = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+        ).fetchone() is None
+        try:
+            conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                    text, channel_id UNINDEXED, ts UNINDEXED, user_id UNINDEXED, tokenize='trigram'
+                );
+            """)
+        except sqlite3.OperationalError as e:
+            # FTS5/trigram(SQLite 3.34+)이 없는 빌드면 검색은 LIKE로만 동작
+            if self.search_enabled is None:
+                logger.warning("SQLite FTS5 trigram is not available, search will scan messages: %s", e)
+            self.search_enabled = False
+            return
+        self.search_enabled = True
+
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS message_search_rows (
+                channel_id TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                fts_rowid INTEGER NOT NULL,
+                PRIMARY KEY (channel_id, ts)
+            ) WITHOUT ROWID;
+            CREATE TRIGGER IF NOT EXISTS messages_search_update AFTER UPDATE OF text ON messages BEGIN
+                UPDATE messages_fts SET text = COALESCE(NEW.text, '')
+                WHERE rowid = (SELECT fts_rowid FROM message_search_rows WHERE channel_id = NEW.channel_id AND ts = NEW.ts);
+            END;
+            CREATE TRIGGER IF NOT EXISTS messages_search_delete AFTER DELETE ON messages BEGIN
+                DELETE FROM messages_fts
+                WHERE rowid = (SELECT fts_rowid FROM message_search_rows WHERE channel_id = OLD.channel_id AND ts = OLD.ts);
+                DELETE FROM message_search_rows WHERE channel_id = OLD.channel_id AND ts = OLD.ts;
+            END;
+        """)
+
+        # 인덱스가 생기기 전에 저장된 메시지가 있으면 한 번 채워줌
+        if created:
+            with conn:
+                self._index_new_messages(conn)
+
+    # 아직 색인하지 않은 메시지(channel_id가 있으면 그 채널의 ts_values만)를 검색 인덱스에 추가
+    # 같은 트랜잭션 안에서 호출해야 함
+    def _index_new_messages(self, conn, channel_id=None, ts_values=None):
+        if not self.search_enabled:
+            return
+        last = conn.execute("SELECT rowid FROM messages_fts ORDER BY rowid DESC LIMIT 1").fetchone()
+        query = (
+            "INSERT INTO messages_fts (text, channel_id, ts, user_id) "
+            "SELECT COALESCE(m.text, ''), m.channel_id, m.ts, m.user_id FROM messages m "
+            "LEFT JOIN message_search_rows r ON r.channel_id = m.channel_id AND r.ts = m.ts "
+            "WHERE r.ts IS NULL"
+        )
+        params = []
+        if channel_id is not None:
+            query += " AND m.channel_id = ? AND m.ts IN (SELECT value FROM json_each(?))"
+            params += [channel_id, json.dumps(ts_values)]
+        conn.execute(query, params)
+        conn.execute(
+            "INSERT OR REPLACE INTO message_search_rows (channel_id, ts, fts_rowid) "
+            "SELECT channel_id, ts, rowid FROM messages_fts WHERE rowid > ?",
+            (last[0] if last else 0,)
+        )
+
+    # 같은 채널을 여러 스레드가 동시에 동기화하지 않도록 채널별 락 사용
+    def _sync_lock(self, channel_id):
+        with self._sync_locks_lock:
+            lock = self._sync_locks.get(channel_id)
+            if lock is None:
+                lock = self._sync_locks[channel_id] = threading.Lock()
+            return lock
+
+    def high_water(self, channel_id):
+        row = self._conn().execute(
+            "SELECT high_water FROM sync_state WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_high_water(self, channel_id, ts):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO sync_state (channel_id, high_water) VALUES (?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET high_water = excluded.high_water "
+                "WHERE excluded.high_water > sync_state.high_water",
+                (channel_id, ts)
+            )
+
+    # Slack 메시지 목록을 저장. 새로 저장된 메시지 수를 리턴 (이미 있는 ts는 무시)
+    # 새로 저장된 메시지는 같은 트랜잭션에서 검색 인덱스에도 추가함
+    def add_messages(self, channel_id, messages):
+        conn = self._conn()
+        with conn:
+            # rowcount는 트리거(발언 수 카운터)가 바꾼 줄은 세지 않음 (total_changes는 셈)
+            added = conn.executemany(
+                "INSERT OR IGNORE INTO messages (channel_id, ts, user_id, text) VALUES (?, ?, ?, ?)",
+                [(channel_id, message['ts'], message.get('user'), message.get('text')) for message in messages]
+            ).rowcount
+            if added:
+                self._index_new_messages(conn, channel_id, [message['ts'] for message in messages])
+            return added
+
+    # Events API의 message 이벤트를 저장소에 반영 (수정/삭제 포함). 카운터는 트리거로 함께 갱신됨
+    # conversations.history에 나오지 않는 스레드 답글과 내용이 없는 알림 이벤트는 저장하지 않음
+    def apply_message_event(self, channel_id, event):
+        subtype = event.get('subtype')
+        conn = self._conn()
+
+        if subtype == 'message_deleted':
+            with conn:
+                conn.execute(
+                    "DELETE FROM messages WHERE channel_id = ? AND ts = ?",
+                    (channel_id, event.get('deleted_ts'))
+                )
+            return
+
+        if subtype == 'message_changed':
+            message = event.get('message', {})
+            with conn:
+                conn.execute(
+                    "UPDATE messages SET text = ? WHERE channel_id = ? AND ts = ?",
+                    (message.get('text'), channel_id, message.get('ts'))
+                )
+            return
+
+        # message_replied처럼 내용 없이 알림만 오는 이벤트(hidden)나 그 밖의 subtype은 메시지로 저장하지 않음
+        if event.get('hidden') or subtype not in STORED_MESSAGE_SUBTYPES:
+            return
+
+        thread_ts = event.get('thread_ts')
+        if thread_ts and thread_ts != event.get('ts') and subtype != 'thread_broadcast':
+            return
+
+        self.add_messages(channel_id, [event])
+
+    # {user_id: 메시지 수} 리턴 (저장소에 있는 메시지 기준)
+    def speech_counts(self, channel_id):
+        return dict(self._conn().execute(
+            "SELECT user_id, count FROM user_message_counts WHERE channel_id = ? AND count > 0",
+            (channel_id,)
+        ))
+
+    # 저장된 메시지를 최신순으로 리턴 (conversations.history와 같은 순서)
+    # oldest/latest를 주면 해당 ts 범위(oldest < ts <= latest)만 가져옴
+    # before/limit을 주면 before보다 이전 메시지 limit개만 읽음 (스레드를 옮겨 가며 묶음 단위로 읽을 때)
+    def iter_messages(self, channel_id, oldest=None, latest=None, before=None, limit=None):
+        query = "SELECT user_id, text, ts FROM messages WHERE channel_id = ?"
+        params = [channel_id]
+        if oldest is not None:
+            query += " AND ts > ?"
+            params.append(oldest)
+        if latest is not None:
+            query += " AND ts <= ?"
+            params.append(latest)
+        if before is not None:
+            query += " AND ts < ?"
+            params.append(before)
+        query += " ORDER BY ts DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        for user_id, text, ts in self._conn().execute(query, params):
+            yield {
+                "user_id": user_id,
+                "text": text,
+                "timestamp": ts
+            }
+
+    # 저장된 메시지를 dict 없이 열 단위 MessageBatch로 읽음 (분석 작업용). exclude_user_id(봇)의 메시지는 제외
+    def load_batch(self, channel_id, oldest=None, latest=None, exclude_user_id=None):
+        query = "SELECT user_id, ts, text FROM messages WHERE channel_id = ? AND user_id IS NOT NULL"
+        params = [channel_id]
+        if oldest is not None:
+            query += " AND ts > ?"
+            params.append(oldest)
+        if latest is not None:
+            query += " AND ts <= ?"
+            params.append(latest)
+        query += " ORDER BY ts DESC"
+        return MessageBatch.from_rows(self._conn().execute(query, params), exclude_user_id)
+
+    # 저장된 메시지에서 검색어(terms)를 모두 포함하는 메시지를 최신순으로 최대 limit개 리턴 (Slack API 호출 없음)
+    # channel_ids(None이면 모든 채널), user_id, oldest/latest(Slack ts 범위)로 좁힐 수 있음
+    # 3글자 이상 검색어는 trigram 인덱스로 후보를 찾고, 더 짧은 검색어는 그 후보(또는 채널 범위)에서 LIKE로 확인
+    def search(self, terms, channel_ids=None, user_id=None, oldest=None, latest=None, limit=20):
+        long_terms = [term for term in terms if len(term) >= SEARCH_MIN_TRIGRAM]
+        short_terms = [term for term in terms if len(term) < SEARCH_MIN_TRIGRAM]
+        conn = self._conn()
+
+        if long_terms and self.search_enabled:
+            # 구절 검색("...")으로 감싸서 검색어 안의 연산자/특수문자를 그대로 찾음
+            query = "SELECT channel_id, ts, user_id, text FROM messages_fts WHERE messages_fts MATCH ?"
+            params = [" ".join('"' + term.replace('"', '""') + '"' for term in long_terms)]
+        else:
+            query = "SELECT channel_id, ts, user_id, text FROM messages WHERE 1"
+            params = []
+            short_terms = terms
+
+        for term in short_terms:
+            query += " AND text LIKE ? ESCAPE '\\'"
+            params.append(f"%{_escape_like(term)}%")
+        if channel_ids is not None:
+            query += f" AND channel_id IN ({','.join('?' * len(channel_ids))})"
+            params.extend(channel_ids)
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        if oldest is not None:
+            query += " AND ts > ?"
+            params.append(oldest)
+        if latest is not None:
+            query += " AND ts <= ?"
+            params.append(latest)
+        query += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+
+        return [
+            {"channel_id": channel_id, "ts": ts, "user_id": user_id, "text": text, "timestamp": ts}
+            for channel_id, ts, user_id, text in conn.execute(query, params)
+        ]
+
+    # 미리 만들어 둔 채널의 리포트 전체(reports: {'speechquantity': 텍스트, '7d': 텍스트, ...})를 한 트랜잭션으로 저장
+    # 같은 리포트는 최신 것 하나만 남기고, reports에 없는 리포트(설정에서 빠진 기간 등)는 지움
+    def save_snapshots(self, channel_id, reports, created_at):
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO report_snapshots (channel_id, report, created_at, text) VALUES (?, ?, ?, ?)",
+                [(channel_id, report, created_at, text) for report, text in reports.items()]
+            )
+            conn.execute(
+                "DELETE FROM report_snapshots WHERE channel_id = ? AND report NOT IN (SELECT value FROM json_each(?))",
+                (channel_id, json.dumps(list(reports)))
+            )
+
+    # (리포트 텍스트, 만든 시각) 리턴. 없으면 None
+    def snapshot(self, channel_id, report):
+        return self._conn().execute(
+            "SELECT text, created_at FROM report_snapshots WHERE channel_id = ? AND report = ?",
+            (channel_id, report)
+        ).fetchone()
+
+    # 채널의 리포트를 마지막으로 만든 시각 (없으면 None). save_snapshots가 한 번에 저장하므로 모든 리포트의 시각이 같음
+    def snapshot_time(self, channel_id):
+        row = self._conn().execute(
+            "SELECT MIN(created_at) FROM report_snapshots WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    # 마지막으로 본 ts 이후의 메시지만 가져와서 저장 (처음이면 전체 기록을 가져옴)
+    # 페이지 단위로 저장하므로 메모리에는 한 페이지만 올라감. 새로 저장된 메시지 수를 리턴
+    def sync_channel(self, client, channel_id):
+        with self._sync_lock(channel_id):
+            oldest = self.high_water(channel_id)
+            newest = oldest
+            added = 0
+
+            for messages in iter_history_pages(client, channel_id, oldest=oldest):
+                added += self.add_messages(channel_id, messages)
+                for message in messages:
+                    if newest is None or message['ts'] > newest:
+                        newest = message['ts']
+
+            # 끝까지 가져온 경우에만 high-water mark를 올림 (중간에 실패하면 다음에 다시 가져옴)
+            if newest is not None:
+                self.set_high_water(channel_id, newest)
+            return added
+
+    # oldest~latest 범위의 메시지가 저장소에 있도록 함. 새로 저장된 메시지 수를 리턴
+    # 이미 동기화한 채널이면 새 메시지만 가져오고 (범위가 high-water mark 이전이면 호출하지 않음),
+    # 처음 보는 채널이면 전체 기록 대신 요청한 범위만 가져옴. 이때는 그 이전 기록이 없으므로 high-water mark는 두지 않음
+    def sync_range(self, client, channel_id, oldest=None, latest=None):
+        high_water = self.high_water(channel_id)
+        if high_water is not None:
+            if latest is not None and latest <= high_water:
+                return 0
+            return self.sync_channel(client, channel_id)
+        if oldest is None:
+            return self.sync_channel(client, channel_id)
+
+        with self._sync_lock(channel_id):
+            added = 0
+            for messages in iter_history_pages(client, channel_id, oldest=oldest, latest=latest):
+                added += self.add_messages(channel_id, messages)
+            return added
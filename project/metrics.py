@@ -0,0 +1,169 @@
+import threading
+
+
+# Prometheus 텍스트 형식(/metrics)으로 내보내는 간단한 메트릭 (Counter, Histogram, Gauge)
+# 값은 프로세스 메모리에 있으므로 gunicorn 워커마다 따로 집계됨 (/stats와 같음).
+# https://prometheus.io/docs/instrumenting/exposition_formats/
+
+# 지연 시간 히스토그램 기본 구간(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.family = f"{name}_total"  # HELP/TYPE에 쓰는 이름 (샘플 이름과 같아야 함)
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # 라벨 값 튜플 -> 누적 값
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            yield f"{self.family}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # 라벨 값 튜플 -> [구간별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, *labelvalues):
+        state = self._values.get(labelvalues)
+        return state[-1] if state else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(labelvalues, list(state)) for labelvalues, state in self._values.items()]
+        for labelvalues, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-2] + [state[-1] - sum(state[:-2])]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labelvalues)} {_format_value(state[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labelvalues)} {state[-1]}"
+
+
+# 내보낼 때 함수를 호출해서 현재 값을 읽는 게이지 (큐 깊이 등 다른 객체가 이미 들고 있는 값)
+class Gauge:
+    type = 'gauge'
+
+    def __init__(self, name, help, function):
+        self.name = name
+        self.help = help
+        self.function = function
+
+    def samples(self):
+        yield f"{self.name} {_format_value(self.function())}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, function):
+        return self.register(Gauge(name, help, function))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            family = getattr(metric, 'family', metric.name)
+            lines.append(f"# HELP {family} {metric.help}")
+            lines.append(f"# TYPE {family} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# 슬래시 명령/이벤트 라우트 처리 시간
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'thegull_http_request_duration_seconds', 'HTTP request latency by route', ('route', 'method', 'status')
+)
+# 작업 큐에서 실행한 백그라운드 작업 처리 시간
+JOB_DURATION = REGISTRY.histogram(
+    'thegull_job_duration_seconds', 'Background job duration by job type', ('job', 'outcome')
+)
+# Slack Web API 호출 (호출 한도 대기 시간 제외, 재시도는 한 번씩 따로 기록)
+SLACK_API_DURATION = REGISTRY.histogram(
+    'thegull_slack_api_duration_seconds', 'Slack Web API call latency by method', ('method', 'outcome')
+)
+SLACK_API_RATE_LIMITED = REGISTRY.counter(
+    'thegull_slack_api_rate_limited', 'Slack Web API 429 responses by method', ('method',)
+)
+SLACK_API_WAIT = REGISTRY.counter(
+    'thegull_slack_api_wait_seconds', 'Time spent waiting for the local rate limiter by method', ('method',)
+)
+# conversations.history/replies, users.list 등 페이지 단위로 가져온 횟수와 메시지 수
+SLACK_PAGES = REGISTRY.counter(
+    'thegull_slack_pages', 'Paginated Slack API pages fetched by method', ('method',)
+)
+MESSAGES_FETCHED = REGISTRY.counter(
+    'thegull_messages_fetched', 'Messages fetched from Slack by method', ('method',)
+)
+EVENTS_PROCESSED = REGISTRY.counter(
+    'thegull_events_processed', 'Events API events handled by outcome', ('outcome',)
+)
@@ -0,0 +1,140 @@
+import itertools
+import os
+import tempfile
+
+
+# 긴 채팅 로그를 Slack에 보내는 발신기
+# 줄 단위로 끊어서 section 블록(plain_text, 블록당 3000자)에 채우고, 메시지 하나에 블록을 최대한 담아
+# 보내는 메시지 수를 줄임. 전체 내용이 upload_threshold자를 넘으면 메시지 대신 파일 하나로 올림.
+# 채널당 초당 1건 제한은 클라이언트를 감싼 SlackScheduler의 채널별 chat.postMessage 버킷이 맞춰줌.
+
+SECTION_TEXT_LIMIT = 3000  # section 블록 text 최대 길이
+MAX_BLOCKS = 50  # 메시지 하나에 넣을 수 있는 최대 블록 수
+
+
+# limit자보다 긴 줄은 limit자 단위로 자름
+def split_long_line(line, limit):
+    if len(line) <= limit:
+        yield line
+        return
+    for i in range(0, len(line), limit):
+        yield line[i:i+limit]
+
+
+# 줄들을 줄바꿈으로 이어 block_limit자 이하의 블록 텍스트로 묶음 (줄 중간에서 자르지 않음)
+def pack_blocks(lines, block_limit=SECTION_TEXT_LIMIT):
+    buffer = []
+    size = 0
+    for line in lines:
+        for piece in split_long_line(line, block_limit):
+            added = len(piece) + (1 if buffer else 0)
+            if buffer and size + added > block_limit:
+                yield "\n".join(buffer)
+                buffer = []
+                size = 0
+                added = len(piece)
+            buffer.append(piece)
+            size += added
+    if buffer:
+        yield "\n".join(buffer)
+
+
+# 블록 텍스트들을 메시지 단위(블록 max_blocks개, 전체 message_limit자 이하)로 묶음
+def pack_messages(lines, message_limit, block_limit=SECTION_TEXT_LIMIT, max_blocks=MAX_BLOCKS):
+    message = []
+    size = 0
+    for block in pack_blocks(lines, min(block_limit, message_limit)):
+        if message and (len(message) >= max_blocks or size + len(block) > message_limit):
+            yield message
+            message = []
+            size = 0
+        message.append(block)
+        size += len(block)
+    if message:
+        yield message
+
+
+# lines를 threshold자를 넘을 때까지만 메모리에 모아 봄
+# (모은 줄, 넘었으면 아직 읽지 않은 나머지 줄 이터레이터 / 다 읽었으면 None) 리턴
+def buffer_until(lines, threshold):
+    lines = iter(lines)
+    buffered = []
+    size = 0
+    for line in lines:
+        buffered.append(line)
+        size += len(line) + 1
+        if size > threshold:
+            return buffered, lines
+    return buffered, None
+
+
+# 모은 줄과 나머지 줄을 임시 텍스트 파일에 쓰고 경로를 리턴 (올린 뒤 지우는 건 호출한 쪽에서)
+def write_lines_file(buffered, rest=()):
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt', delete=False) as f:
+        for line in itertools.chain(buffered, rest):
+            f.write(line)
+            f.write("\n")
+        return f.name
+
+
+# write_lines_file로 만든 파일 뒤에 줄을 이어 씀 (묶음 단위로 받은 줄을 차례로 쓸 때)
+def append_lines_file(path, lines):
+    with open(path, 'a', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line)
+            f.write("\n")
+
+
+def to_blocks(texts):
+    return [{"type": "section", "text": {"type": "plain_text", "text": text, "emoji": False}} for text in texts]
+
+
+class OutboundSender:
+    def __init__(self, client, message_limit=12000, upload_threshold=50000):
+        self.client = client
+        self.message_limit = message_limit  # 메시지 하나에 담는 최대 글자 수
+        self.upload_threshold = upload_threshold  # 전체 내용이 이보다 길면 파일로 올림 (0이면 항상 메시지로 보냄)
+
+        self.messages_posted = 0
+        self.files_uploaded = 0
+
+    # lines(줄 단위 문자열 이터러블)를 channel_id에 보냄. ('messages' 또는 'file', 보낸 횟수) 리턴
+    # upload_threshold까지만 메모리에 모아보고, 넘으면 나머지는 임시 파일에 이어 쓴 뒤 한 번에 올림
+    def send_lines(self, channel_id, lines, header, filename='chatlog.txt'):
+        buffered = lines
+        if self.upload_threshold:
+            buffered, rest = buffer_until(lines, self.upload_threshold)
+            if rest is not None:
+                self._upload(channel_id, buffered, rest, header, filename)
+                return 'file', 1
+
+        posts = 0
+        for texts in pack_messages(buffered, self.message_limit):
+            self.client.chat_postMessage(
+                channel=channel_id,
+                text=header,  # 알림/미리보기에 표시되는 텍스트
+                blocks=to_blocks(texts)
+            )
+            posts += 1
+        self.messages_posted += posts
+        return 'messages', posts
+
+    def _upload(self, channel_id, buffered, rest, header, filename):
+        path = write_lines_file(buffered, rest)
+        try:
+            self.client.files_upload_v2(
+                channel=channel_id,
+                file=path,
+                filename=filename,
+                title=filename,
+                initial_comment=header
+            )
+            self.files_uploaded += 1
+        finally:
+            os.remove(path)
+
+    def stats(self):
+        return {
+            "messages_posted": self.messages_posted,
+            "files_uploaded": self.files_uploaded,
+        }
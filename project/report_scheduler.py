@@ -0,0 +1,128 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+
+# 'HH-HH' 형식의 한가한 시간대(예: '22-7')를 (시작 시, 끝 시)로 변환. 비어 있으면 None
+def parse_offpeak_hours(value):
+    if not value:
+        return None
+    start, _, end = value.partition('-')
+    return int(start) % 24, int(end) % 24
+
+
+# 경과 시간(초)을 '3d 4h', '2h 5m', '7m' 형식으로
+def format_age(seconds):
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+# 등록된 채널의 리포트를 주기적으로 미리 만들어 두는 스케줄러
+# 채널마다 마지막으로 만든 뒤 interval초가 지나면 다시 만드는데, 한가한 시간대(offpeak_hours)를 지정하면
+# 그 시간대가 올 때까지 미루고, 미룬 시간이 max_delay초를 넘으면 시간대와 관계없이 만듦.
+# 마지막으로 만든 시각은 저장소에서 읽으므로 프로세스가 다시 시작돼도 이미 만든 리포트를 바로 다시 만들지 않음.
+class ReportScheduler:
+    def __init__(self, refresh_channel, list_channels, last_refreshed, interval=3600,
+                 offpeak_hours=None, max_delay=12 * 3600, tz_name='UTC', tick=60):
+        self.refresh_channel = refresh_channel  # refresh_channel(channel_id) - 저장소 동기화 후 리포트를 만들어 저장
+        self.list_channels = list_channels  # list_channels() - 리포트를 만들 채널 ID 목록
+        self.last_refreshed = last_refreshed  # last_refreshed(channel_id) - 마지막으로 만든 시각(time.time 기준) 또는 None
+        self.interval = interval
+        self.offpeak_hours = offpeak_hours  # (시작 시, 끝 시), tz_name 기준. None이면 시간대 구분 없음
+        self.max_delay = max_delay
+        self.tz = ZoneInfo(tz_name)
+        self.tick = tick  # 확인 주기(초)
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        # 메트릭
+        self.runs = 0
+        self.refreshed = 0
+        self.deferred = 0
+        self.failed = 0
+        self.last_run_at = None
+
+    def is_offpeak(self, now=None):
+        if self.offpeak_hours is None:
+            return True
+        hour = datetime.fromtimestamp(now or time.time(), self.tz).hour
+        start, end = self.offpeak_hours
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end  # 자정을 넘기는 시간대 (예: 22-7)
+
+    # 채널의 리포트를 지금 다시 만들어야 하는지 확인
+    def is_due(self, channel_id, now=None):
+        now = now or time.time()
+        last = self.last_refreshed(channel_id)
+        age = now - last if last is not None else float('inf')
+        if age < self.interval:
+            return False
+        if self.is_offpeak(now) or age >= self.interval + self.max_delay:
+            return True
+        self.deferred += 1
+        return False
+
+    # 다시 만들 때가 된 채널의 리포트를 만듦. 만든 채널 수를 리턴
+    def run_once(self):
+        self.runs += 1
+        self.last_run_at = time.time()
+        refreshed = 0
+        for channel_id in self.list_channels():
+            if self._stop.is_set():
+                break
+            if not self.is_due(channel_id):
+                continue
+            try:
+                self.refresh_channel(channel_id)
+                refreshed += 1
+            except Exception as e:
+                logger.error("Report refresh failed for %s: %s", channel_id, e)
+                self.failed += 1
+        self.refreshed += refreshed
+        return refreshed
+
+    # stop()이 호출될 때까지 tick초마다 run_once 실행 (별도 워커 프로세스에서 사용)
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                # 채널 목록 조회 실패 등은 다음 확인 때 다시 시도
+                logger.error("Report scheduler error: %s", e)
+            self._stop.wait(self.tick)
+
+    # 같은 프로세스의 백그라운드 스레드에서 실행 (REPORT_SCHEDULER=inprocess)
+    def start(self):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._thread = threading.Thread(target=self.run_forever, name='thegull-reports', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            "runs": self.runs,
+            "refreshed": self.refreshed,
+            "deferred": self.deferred,
+            "failed": self.failed,
+            "last_run_at": self.last_run_at,
+            "offpeak_now": self.is_offpeak(),
+        }
@@ -0,0 +1,256 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+
+# 여러 워커 프로세스(gunicorn)나 레플리카가 함께 쓰는 상태 저장소
+# 사용자 캐시, 작업 중복 방지(claim), 호출 한도 토큰 버킷을 프로세스 밖에 두어서
+# 같은 채널 기록을 여러 워커가 동시에 가져오거나, 워커마다 호출 한도를 따로 쓰는 일을 막음.
+#
+# 백엔드가 구현해야 하는 연산 (Redis로 옮길 때의 대응):
+#   get_many(namespace, keys)               -> {key: value}     MGET
+#   set_many(namespace, values, ttl)                            SET key value EX ttl (pipeline)
+#   claim(key, owner, ttl)                  -> True/False       SET key owner NX EX ttl
+#   release(key, owner)                                         owner가 같을 때만 DEL (Lua)
+#   take_token(key, rate, capacity, needed) -> 기다릴 시간(초)  토큰 버킷 갱신 (Lua)
+#   block_bucket(key, seconds)                                  토큰 버킷 정지 (Lua)
+# 값은 JSON으로 바꿀 수 있어야 하고, 시각은 프로세스 사이에서 비교할 수 있도록 time.time()을 사용함.
+
+
+# 이 프로세스를 나타내는 이름 (claim 소유자). fork 이후에도 맞도록 호출할 때마다 만듦
+def process_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# 토큰 버킷 상태(tokens, updated_at, blocked_until)를 now 기준으로 갱신해서 토큰 하나를 가져감
+# (새 상태, 기다릴 시간) 리턴. 두 백엔드가 같은 계산을 씀
+def _take(state, now, rate, capacity, needed):
+    tokens, updated_at, blocked_until = state or (float(capacity), now, 0.0)
+    if now < blocked_until:
+        return (tokens, updated_at, blocked_until), blocked_until - now
+    tokens = min(capacity, tokens + (now - updated_at) * rate)
+    if tokens >= needed:
+        return (tokens - 1, now, blocked_until), 0.0
+    return (tokens, now, blocked_until), (needed - tokens) / rate
+
+
+# 한 프로세스 안에서만 공유되는 백엔드 (기본값과 같은 동작, 테스트/단일 프로세스용)
+class MemoryState:
+    backend = 'memory'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}  # (namespace, key) -> (만료 시각, 값)
+        self._claims = {}  # key -> (owner, 만료 시각)
+        self._buckets = {}  # key -> (tokens, updated_at, blocked_until)
+
+    def get_many(self, namespace, keys):
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._values.get((namespace, key))
+                if entry is not None and entry[0] > now:
+                    found[key] = entry[1]
+        return found
+
+    def set_many(self, namespace, values, ttl):
+        expires_at = time.time() + ttl
+        with self._lock:
+            for key, value in values.items():
+                self._values[(namespace, key)] = (expires_at, value)
+
+    def claim(self, key, owner, ttl):
+        now = time.time()
+        with self._lock:
+            current = self._claims.get(key)
+            if current is not None and current[1] > now and current[0] != owner:
+                return False
+            self._claims[key] = (owner, now + ttl)
+            return True
+
+    def release(self, key, owner):
+        with self._lock:
+            current = self._claims.get(key)
+            if current is not None and current[0] == owner:
+                del self._claims[key]
+
+    def take_token(self, key, rate, capacity, needed):
+        with self._lock:
+            state, wait = _take(self._buckets.get(key), time.time(), rate, capacity, needed)
+            self._buckets[key] = state
+            return wait
+
+    def block_bucket(self, key, seconds):
+        with self._lock:
+            blocked_until = time.time() + seconds
+            _, _, current = self._buckets.get(key) or (0.0, 0.0, 0.0)
+            blocked_until = max(blocked_until, current)
+            self._buckets[key] = (0.0, blocked_until, blocked_until)
+
+    def stats(self):
+        with self._lock:
+            return {"backend": self.backend, "values": len(self._values), "claims": len(self._claims),
+                    "buckets": len(self._buckets)}
+
+
+# SQLite 파일 하나를 같은 노드의 여러 프로세스가 함께 쓰는 백엔드
+# 값을 바꾸는 연산은 BEGIN IMMEDIATE(쓰기 락)로 감싸서 프로세스 사이에서도 원자적으로 처리함.
+# 네트워크 파일 시스템에서는 SQLite 락을 믿을 수 없으므로 노드(볼륨)를 넘어서는 공유에는 쓰지 않음.
+class SQLiteState:
+    backend = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            # isolation_level=None: 트랜잭션은 직접 BEGIN/COMMIT으로 관리
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS shared_values (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS shared_values_expires ON shared_values (expires_at);
+                CREATE TABLE IF NOT EXISTS shared_claims (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS shared_buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    blocked_until REAL NOT NULL
+                ) WITHOUT ROWID;
+            """)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # 쓰기 락을 잡은 트랜잭션 안에서 fn(conn) 실행
+    def _write(self, fn):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def get_many(self, namespace, keys):
+        keys = list(keys)
+        conn = self._conn()
+        now = time.time()
+        found = {}
+        # SQLite 바인딩 변수 수 제한을 넘지 않도록 나눠서 조회
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                "SELECT key, value FROM shared_values WHERE namespace = ? AND expires_at > ? "
+                f"AND key IN ({','.join('?' * len(chunk))})",
+                [namespace, now] + chunk
+            )
+            found.update((key, json.loads(value)) for key, value in rows)
+        return found
+
+    def set_many(self, namespace, values, ttl):
+        if not values:
+            return
+        now = time.time()
+        self._writes += 1
+
+        def write(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO shared_values (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                [(namespace, key, json.dumps(value), now + ttl) for key, value in values.items()]
+            )
+            # 가끔 만료된 값을 정리
+            if self._writes % 100 == 1:
+                conn.execute("DELETE FROM shared_values WHERE expires_at <= ?", (now,))
+        self._write(write)
+
+    def claim(self, key, owner, ttl):
+        now = time.time()
+
+        def write(conn):
+            conn.execute("DELETE FROM shared_claims WHERE key = ? AND expires_at <= ?", (key, now))
+            row = conn.execute("SELECT owner FROM shared_claims WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] != owner:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_claims (key, owner, expires_at) VALUES (?, ?, ?)", (key, owner, now + ttl)
+            )
+            return True
+        return self._write(write)
+
+    def release(self, key, owner):
+        self._write(lambda conn: conn.execute("DELETE FROM shared_claims WHERE key = ? AND owner = ?", (key, owner)))
+
+    def take_token(self, key, rate, capacity, needed):
+        def write(conn):
+            row = conn.execute(
+                "SELECT tokens, updated_at, blocked_until FROM shared_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            state, wait = _take(row, time.time(), rate, capacity, needed)
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_buckets (key, tokens, updated_at, blocked_until) VALUES (?, ?, ?, ?)",
+                (key,) + state
+            )
+            return wait
+        return self._write(write)
+
+    def block_bucket(self, key, seconds):
+        def write(conn):
+            blocked_until = time.time() + seconds
+            conn.execute(
+                "INSERT INTO shared_buckets (key, tokens, updated_at, blocked_until) VALUES (?, 0, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = 0, "
+                "blocked_until = MAX(blocked_until, excluded.blocked_until), updated_at = MAX(blocked_until, excluded.blocked_until)",
+                (key, blocked_until, blocked_until)
+            )
+        self._write(write)
+
+    def stats(self):
+        conn = self._conn()
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "values": conn.execute("SELECT COUNT(*) FROM shared_values").fetchone()[0],
+            "claims": conn.execute("SELECT COUNT(*) FROM shared_claims").fetchone()[0],
+            "buckets": conn.execute("SELECT COUNT(*) FROM shared_buckets").fetchone()[0],
+        }
+
+
+def default_state_path():
+    if os.path.isdir('/mnt/data'):
+        return '/mnt/data/thegull-state.db'
+    return 'thegull-state.db'
+
+
+# SHARED_STATE 설정으로 백엔드를 만듦. 비어 있으면 None (공유하지 않고 프로세스마다 따로 둠)
+# 'memory', 'sqlite'(기본 경로), 'sqlite:///path/to/state.db'
+def open_shared_state(url):
+    if not url:
+        return None
+    if url == 'memory':
+        return MemoryState()
+    if url == 'sqlite':
+        return SQLiteState(default_state_path())
+    if url.startswith('sqlite:///'):
+        return SQLiteState(url[len('sqlite:///'):])
+    raise ValueError(f"Unsupported SHARED_STATE backend: {url}")
@@ -0,0 +1,169 @@
+import http.client
+import os
+import threading
+from urllib.parse import urlsplit
+
+from slack_sdk import WebClient
+
+
+# 호스트별 keep-alive HTTP(S) 커넥션 풀
+# 요청이 끝난 커넥션을 돌려받아 다음 요청에 재사용하므로 호출마다 TCP/TLS 연결을 새로 맺지 않음.
+# 모든 워커 스레드가 풀 하나를 같이 쓰고, 커넥션 하나는 한 번에 한 스레드만 사용함.
+class ConnectionPool:
+    def __init__(self, maxsize=8, timeout=30, ssl_context=None):
+        self.maxsize = maxsize  # 호스트별로 보관하는 유휴 커넥션 최대 수
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._idle = {}  # (scheme, host, port) -> 유휴 커넥션 리스트 (마지막에 돌려받은 것부터 사용)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+        # 메트릭
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    # 유휴 커넥션을 쓰지 않고 새 커넥션을 만듦
+    def connect(self, key):
+        scheme, host, port = key
+        self.created += 1
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    # (커넥션, 재사용 여부) 리턴
+    def acquire(self, key):
+        with self._lock:
+            # gunicorn fork 이후 부모 프로세스의 소켓은 공유하지 않고 버림
+            if self._pid != os.getpid():
+                self._idle = {}
+                self._pid = os.getpid()
+            idle = self._idle.get(key)
+            if idle:
+                self.reused += 1
+                return idle.pop(), True
+        return self.connect(key), False
+
+    # 새 커넥션 count개를 미리 연결(TCP/TLS)해서 유휴 목록에 넣어 둠 (워밍업용)
+    def prime(self, key, count):
+        conns = []
+        try:
+            for _ in range(count):
+                conn = self.connect(key)
+                conn.connect()
+                conns.append(conn)
+        finally:
+            for conn in conns:
+                self.release(key, conn)
+        return len(conns)
+
+    def release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        self.discarded += 1
+        conn.close()
+
+    def stats(self):
+        with self._lock:
+            idle = sum(len(conns) for conns in self._idle.values())
+        return {
+            "idle": idle,
+            "created": self.created,
+            "reused": self.reused,
+            "discarded": self.discarded,
+        }
+
+
+# urlopen(요청마다 새 연결) 대신 ConnectionPool로 요청을 보내는 WebClient
+# 재시도, 에러 처리, 응답 파싱은 WebClient의 기존 동작을 그대로 사용하고 실제 전송 부분만 바꿈.
+class PooledWebClient(WebClient):
+    def __init__(self, *args, pool_size=8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = ConnectionPool(maxsize=pool_size, timeout=self.timeout, ssl_context=self.ssl)
+
+    @staticmethod
+    def _pool_key(parts):
+        return parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80)
+
+    # Slack API 호스트로 커넥션을 미리 맺어 둠. 첫 요청이 TCP/TLS 연결 시간을 기다리지 않도록 함
+    def prime_connections(self, count):
+        parts = urlsplit(self.base_url)
+        if self.proxy is not None or parts.scheme not in ('http', 'https'):
+            return 0
+        return self.pool.prime(self._pool_key(parts), min(count, self.pool.maxsize))
+
+    def _perform_urllib_http_request_internal(self, url, req):
+        parts = urlsplit(url)
+        # 프록시를 쓰거나 http(s)가 아닌 URL은 기존 방식으로 처리
+        if self.proxy is not None or parts.scheme not in ('http', 'https'):
+            return super()._perform_urllib_http_request_internal(url, req)
+
+        key = self._pool_key(parts)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        headers = dict(req.header_items())
+
+        conn, reused = self.pool.acquire(key)
+        try:
+            response = self._send(conn, req.get_method(), path, req.data, headers)
+        except (http.client.HTTPException, ConnectionError):
+            conn.close()
+            if not reused:
+                raise
+            # 서버가 먼저 끊은 유휴 커넥션이었으면 새 커넥션으로 한 번만 다시 보냄
+            conn = self.pool.connect(key)
+            try:
+                response = self._send(conn, req.get_method(), path, req.data, headers)
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+        status, response_headers, body, will_close = response
+        if will_close:
+            conn.close()
+        else:
+            self.pool.release(key, conn)
+
+        if response_headers.get_content_type() == "application/gzip":
+            # admin.analytics.getFile
+            return {"status": status, "headers": response_headers, "body": body}
+        charset = response_headers.get_content_charset() or "utf-8"
+        return {"status": status, "headers": response_headers, "body": body.decode(charset)}
+
+    # 응답 본문까지 모두 읽어야 커넥션을 다음 요청에 재사용할 수 있음
+    @staticmethod
+    def _send(conn, method, path, data, headers):
+        conn.request(method, path, body=data, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        return response.status, response.headers, body, response.will_close
+
+
+# 처음 사용할 때 factory()로 클라이언트를 만드는 프록시
+# import(그리고 gunicorn preload) 시점에는 WebClient, SSL 컨텍스트, 커넥션 풀을 만들지 않음.
+class LazyClient:
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+                client = self._client
+        return client
+
+    @property
+    def created(self):
+        return self._client is not None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
@@ -0,0 +1,329 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from slack_sdk.errors import SlackApiError
+
+from metrics import SLACK_API_DURATION, SLACK_API_RATE_LIMITED, SLACK_API_WAIT, SLACK_PAGES, MESSAGES_FETCHED
+
+
+# 호출 우선순위: 사용자에게 바로 보이는 응답(INTERACTIVE)이 기록 수집(BACKGROUND)보다 먼저 토큰을 가져감
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# 현재 스레드(또는 asyncio Task)에서 지정한 우선순위
+_current_priority = ContextVar('slack_call_priority', default=None)
+
+# Slack Web API 티어별 분당 호출 한도 (https://api.slack.com/apis/rate-limits)
+TIER_LIMITS = {1: 1, 2: 20, 3: 50, 4: 100}
+
+# 메서드별 티어 (없는 메서드는 DEFAULT_TIER)
+METHOD_TIERS = {
+    'auth.test': 4,
+    'conversations.history': 3,
+    'conversations.replies': 3,
+    'conversations.list': 2,
+    'conversations.info': 3,
+    'users.conversations': 3,
+    'users.list': 2,
+    'users.info': 4,
+    'chat.update': 3,
+    'chat.postEphemeral': 4,
+    'files.upload.v2': 4,
+    'files.getUploadURLExternal': 4,
+    'files.completeUploadExternal': 4,
+}
+DEFAULT_TIER = 3
+
+# chat.postMessage는 티어가 아니라 채널당 초당 1건 제한이므로 채널마다 버킷을 따로 둠
+PER_CHANNEL_METHODS = {'chat.postMessage': 60}
+
+# 우선순위를 따로 지정하지 않았을 때 백그라운드로 취급하는 (기록 수집용) 메서드
+BACKGROUND_METHODS = {
+    'conversations.history',
+    'conversations.replies',
+    'conversations.list',
+    'users.conversations',
+    'users.list',
+}
+
+
+# 토큰이 폐기되었거나 잘못되었을 때 Slack이 돌려주는 에러 (받으면 on_auth_error로 등록한 함수를 호출)
+AUTH_ERRORS = {'invalid_auth', 'token_revoked', 'account_inactive', 'not_authed'}
+
+
+# python 메서드 이름을 Slack API 메서드 이름으로 변환 (conversations_history -> conversations.history)
+def api_method_name(name):
+    return name.replace('_', '.')
+
+
+def _retry_after(e):
+    headers = e.response.headers or {}
+    value = headers.get('Retry-After') or headers.get('retry-after') or 1
+    return float(value)
+
+
+# 분당 호출 한도를 맞추는 토큰 버킷
+class TokenBucket:
+    blocking = False  # try_acquire/block이 I/O를 하는지 (True면 비동기 경로에서 스레드로 호출)
+
+    def __init__(self, per_minute, burst=None):
+        self.rate = per_minute / 60.0  # 초당 채워지는 토큰 수
+        self.capacity = burst or max(1, per_minute // 10)
+        # 백그라운드 호출은 이만큼의 토큰을 인터랙티브 호출 몫으로 남겨둠
+        self.reserve = self.capacity // 5
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    # 토큰을 하나 가져감. 바로 가져가면 0, 아니면 기다려야 하는 시간(초)을 리턴
+    def try_acquire(self, priority):
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            needed = 1 + (self.reserve if priority == BACKGROUND else 0)
+            if self.tokens >= needed:
+                self.tokens -= 1
+                return 0.0
+            return (needed - self.tokens) / self.rate
+
+    # 429를 받으면 Retry-After 동안 이 버킷의 모든 호출을 멈춤
+    def block(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.updated_at = self.blocked_until
+
+
+# 여러 프로세스가 공유 상태 저장소(shared_state)에 있는 버킷 하나를 함께 쓰는 토큰 버킷
+# gunicorn 워커가 여러 개여도 워크스페이스 전체의 호출 속도가 한도를 넘지 않음
+class SharedTokenBucket(TokenBucket):
+    blocking = True
+
+    def __init__(self, state, key, per_minute, burst=None):
+        super().__init__(per_minute, burst)
+        self.state = state
+        self.key = key
+
+    def try_acquire(self, priority):
+        needed = 1 + (self.reserve if priority == BACKGROUND else 0)
+        return self.state.take_token(self.key, self.rate, self.capacity, needed)
+
+    def block(self, seconds):
+        self.state.block_bucket(self.key, seconds)
+
+
+# slack_test.py의 모든 Slack API 호출이 거쳐가는 스케줄러
+# 메서드(티어)별 토큰 버킷으로 호출 속도를 맞추고, 429를 받으면 Retry-After만큼 기다렸다 재시도함.
+class SlackScheduler:
+    def __init__(self, limits=None, max_retries=3, shared=None):
+        self.limits = limits or {}  # {메서드: 분당 한도} (기본 티어 한도 덮어쓰기)
+        self.max_retries = max_retries
+        self.shared = shared  # 공유 상태 저장소 (있으면 버킷을 다른 프로세스와 함께 씀)
+        self._auth_error_callbacks = []
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+        # 메트릭 (메서드별)
+        self.calls = {}
+        self.rate_limited = {}
+        self.wait_time = {}
+
+    # "conversations.history=50,users.info=100" 형식의 설정 문자열을 읽음
+    @staticmethod
+    def parse_limits(value):
+        limits = {}
+        for item in (value or '').split(','):
+            if '=' in item:
+                method, per_minute = item.split('=', 1)
+                limits[method.strip()] = int(per_minute)
+        return limits
+
+    def _per_minute(self, method):
+        if method in self.limits:
+            return self.limits[method]
+        if method in PER_CHANNEL_METHODS:
+            return PER_CHANNEL_METHODS[method]
+        return TIER_LIMITS[METHOD_TIERS.get(method, DEFAULT_TIER)]
+
+    def _bucket(self, method, kwargs):
+        key = method
+        if method in PER_CHANNEL_METHODS:
+            key = (method, kwargs.get('channel'))
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                per_minute = self._per_minute(method)
+                burst = 1 if method in PER_CHANNEL_METHODS else None
+                if self.shared is None:
+                    bucket = TokenBucket(per_minute, burst)
+                else:
+                    shared_key = 'slack:' + (method if key == method else f"{method}:{key[1]}")
+                    bucket = SharedTokenBucket(self.shared, shared_key, per_minute, burst)
+                self._buckets[key] = bucket
+            return bucket
+
+    # 현재 스레드(또는 asyncio Task)에서 실행하는 호출들의 우선순위를 지정
+    @contextmanager
+    def priority(self, priority):
+        token = _current_priority.set(priority)
+        try:
+            yield
+        finally:
+            _current_priority.reset(token)
+
+    def _priority(self, method):
+        priority = _current_priority.get()
+        if priority is not None:
+            return priority
+        return BACKGROUND if method in BACKGROUND_METHODS else INTERACTIVE
+
+    # 인증 에러(AUTH_ERRORS)를 받았을 때 호출할 함수를 등록 (토큰별로 캐시한 봇 정보 비우기 등)
+    def on_auth_error(self, callback):
+        self._auth_error_callbacks.append(callback)
+
+    def _record(self, method, waited):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            self.wait_time[method] = self.wait_time.get(method, 0.0) + waited
+        if waited:
+            SLACK_API_WAIT.inc(method, amount=waited)
+
+    # 호출 한 번의 지연 시간(호출 한도 대기 제외)과 결과를 메트릭으로 기록
+    # 기록 수집용 메서드는 모두 페이지 단위 조회이므로 가져온 페이지/메시지 수도 함께 기록
+    def _observe(self, method, started, result=None, error=None):
+        elapsed = time.perf_counter() - started
+        if error is not None:
+            if error.response.get('error') in AUTH_ERRORS:
+                for callback in self._auth_error_callbacks:
+                    callback()
+            rate_limited = error.response.status_code == 429
+            SLACK_API_DURATION.observe(elapsed, method, 'rate_limited' if rate_limited else 'error')
+            if rate_limited:
+                SLACK_API_RATE_LIMITED.inc(method)
+            return
+
+        SLACK_API_DURATION.observe(elapsed, method, 'ok')
+        if method in BACKGROUND_METHODS:
+            SLACK_PAGES.inc(method)
+            messages = result.get('messages')
+            if messages:
+                MESSAGES_FETCHED.inc(method, amount=len(messages))
+
+    def _on_rate_limited(self, bucket, method, e, attempt):
+        if e.response.status_code != 429 or attempt >= self.max_retries:
+            return False
+        # 여러 스레드가 동시에 재시도하지 않도록 약간의 지터를 더함
+        bucket.block(_retry_after(e) + random.uniform(0, 0.5))
+        with self._lock:
+            self.rate_limited[method] = self.rate_limited.get(method, 0) + 1
+        return True
+
+    def call(self, method, fn, *args, **kwargs):
+        bucket = self._bucket(method, kwargs)
+        priority = self._priority(method)
+        attempt = 0
+        while True:
+            waited = 0.0
+            wait = bucket.try_acquire(priority)
+            while wait > 0:
+                time.sleep(wait)
+                waited += wait
+                wait = bucket.try_acquire(priority)
+            self._record(method, waited)
+
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except SlackApiError as e:
+                self._observe(method, started, error=e)
+                if not self._on_rate_limited(bucket, method, e, attempt):
+                    raise
+                attempt += 1
+                continue
+            self._observe(method, started, result=result)
+            return result
+
+    # call의 비동기 버전 (AsyncWebClient용)
+    # 공유 버킷(SharedTokenBucket)은 저장소를 읽고 쓰므로 이벤트 루프를 막지 않도록 스레드에서 호출
+    async def acall(self, method, fn, *args, **kwargs):
+        bucket = self._bucket(method, kwargs)
+        priority = self._priority(method)
+
+        async def run(function, *function_args):
+            if bucket.blocking:
+                return await asyncio.to_thread(function, *function_args)
+            return function(*function_args)
+
+        attempt = 0
+        while True:
+            waited = 0.0
+            wait = await run(bucket.try_acquire, priority)
+            while wait > 0:
+                await asyncio.sleep(wait)
+                waited += wait
+                wait = await run(bucket.try_acquire, priority)
+            self._record(method, waited)
+
+            started = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except SlackApiError as e:
+                self._observe(method, started, error=e)
+                if not await run(self._on_rate_limited, bucket, method, e, attempt):
+                    raise
+                attempt += 1
+                continue
+            self._observe(method, started, result=result)
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                method: {
+                    "calls": count,
+                    "rate_limited": self.rate_limited.get(method, 0),
+                    "wait_time": round(self.wait_time.get(method, 0.0), 3),
+                }
+                for method, count in self.calls.items()
+            }
+
+
+# WebClient를 감싸서 모든 API 메서드 호출이 스케줄러를 거치도록 함
+# (client.conversations_history(...) 등 기존 호출 코드는 그대로 사용)
+class ScheduledClient:
+    def __init__(self, client, scheduler):
+        self._client = client
+        self._scheduler = scheduler
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+        method = api_method_name(name)
+
+        def scheduled(*args, **kwargs):
+            return self._scheduler.call(method, attr, *args, **kwargs)
+        return scheduled
+
+
+# AsyncWebClient용 ScheduledClient
+class ScheduledAsyncClient(ScheduledClient):
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+        method = api_method_name(name)
+
+        async def scheduled(*args, **kwargs):
+            return await self._scheduler.acall(method, attr, *args, **kwargs)
+        return scheduled
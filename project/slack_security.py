@@ -0,0 +1,92 @@
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+
+# 일정 시간 동안만 기억하는 크기 제한 집합 (재전송 방지, 중복 이벤트 확인 등에 사용)
+class ExpiringSet:
+    def __init__(self, ttl, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items = OrderedDict()  # key -> 만료 시각 (추가한 순서 = 만료 순서)
+        self._lock = threading.Lock()
+
+    # 처음 보는 key면 추가하고 True, 이미 있으면 False 리턴
+    def add(self, key):
+        now = time.monotonic()
+        with self._lock:
+            # 앞쪽(가장 오래된)부터 만료된 항목 정리
+            while self._items:
+                oldest_key, expires_at = next(iter(self._items.items()))
+                if expires_at > now:
+                    break
+                del self._items[oldest_key]
+
+            if key in self._items:
+                return False
+
+            self._items[key] = now + self.ttl
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+            return True
+
+    def discard(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def __len__(self):
+        return len(self._items)
+
+
+# Slack 요청 서명(X-Slack-Signature) 검증
+# https://api.slack.com/authentication/verifying-requests-from-slack
+class RequestVerifier:
+    def __init__(self, signing_secret, max_age=300, replay_cache_size=10000):
+        self._key = signing_secret.encode()
+        self.max_age = max_age  # 허용하는 타임스탬프 오차(초)
+        # 같은 서명이 다시 오면 재전송(replay)으로 보고 거절. 타임스탬프 허용 범위만큼만 기억하면 충분함
+        self._seen = ExpiringSet(ttl=max_age * 2, maxsize=replay_cache_size)
+
+        self.accepted = 0
+        self.rejected = 0
+
+    # (통과 여부, 거절 사유) 리턴
+    def verify(self, body, timestamp, signature):
+        ok, reason = self._verify(body, timestamp, signature)
+        if ok:
+            self.accepted += 1
+        else:
+            self.rejected += 1
+        return ok, reason
+
+    def _verify(self, body, timestamp, signature):
+        if not timestamp or not signature:
+            return False, "missing signature headers"
+
+        try:
+            request_time = int(timestamp)
+        except ValueError:
+            return False, "invalid timestamp"
+        if abs(time.time() - request_time) > self.max_age:
+            return False, "stale timestamp"
+
+        expected = "v0=" + hmac.new(
+            self._key, b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256
+        ).hexdigest()
+        # 일정 시간 비교 (타이밍 공격 방지)
+        if not hmac.compare_digest(expected, signature):
+            return False, "invalid signature"
+
+        if not self._seen.add(signature):
+            return False, "replayed request"
+
+        return True, None
+
+    def stats(self):
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "replay_cache_size": len(self._seen),
+        }
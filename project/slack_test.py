@@ -1,25 +1,218 @@
-import threading
+import atexit
+import itertools
 import json
+import logging
 import os
-from flask import Flask, request, make_response
+import time
+from flask import Blueprint, Flask, request, make_response, jsonify, g
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
-from datetime import datetime
+from chat_report import most_active_user_message
+from log_render import renderer_for
+from user_cache import UserCache
+from message_batch import MessageBatch
+from message_store import MessageStore, default_store_path, iter_thread_messages, split_search_terms
+from job_queue import JobQueue
+from shared_state import open_shared_state
+from slack_security import RequestVerifier
+from event_intake import EventIntake
+from outbound import OutboundSender
+from exporter import ChatLogExporter, COMPRESSIONS, COMPRESSION_ALIASES, FORMATS, compression_available, default_export_dir, format_size
+from speech_analytics import SpeechAnalytics, parse_window
+from command_args import parse_command_args, describe_range, resolve_range
+from channel_reports import iter_member_channels, map_channels
+from report_scheduler import ReportScheduler, parse_offpeak_hours, format_age
+from metrics import REGISTRY, HTTP_REQUEST_DURATION
+from logs import setup_logging, log_sampled
+from slack_scheduler import SlackScheduler, ScheduledClient
+from slack_http import LazyClient, PooledWebClient
+from bot_identity import BotIdentity
+from warmup import Warmup
 
-app = Flask(__name__)
+setup_logging()
+logger = logging.getLogger('thegull')
+
+# 라우트는 블루프린트에 등록하고 create_app()에서 Flask 앱을 만들 때 붙임
+bp = Blueprint('thegull', __name__)
+
+# 라우트별 처리 시간 측정 (서명 검증보다 먼저 등록해서 거절된 요청도 측정)
+@bp.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@bp.after_app_request
+def observe_request(response):
+    started = g.get('request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, route, request.method, str(response.status_code))
+    return response
 
 # Docker에서 설정된 환경 변수에서 SLACK_BOT_TOKEN을 불러옴
 token = os.getenv("SLACK_BOT_TOKEN")
-print(f"SLACK_BOT_TOKEN: {token}")  # 확인용 출력
 
-# Slack WebClient 설정
+# 워커 프로세스끼리 공유하는 상태 저장소 (사용자 캐시, 작업 중복 방지, 호출 한도 토큰)
+# 비워 두면 프로세스마다 따로 둠. 'sqlite' 또는 'sqlite:///경로'면 같은 노드의 프로세스끼리 공유
+shared_state = open_shared_state(os.getenv('SHARED_STATE', ''))
+
+# Slack API 호출 스케줄러 (메서드별 티어 한도에 맞춰 호출 속도 조절, 429는 Retry-After 후 재시도)
+scheduler = SlackScheduler(
+    limits=SlackScheduler.parse_limits(os.getenv('SLACK_RATE_LIMITS')),
+    max_retries=int(os.getenv('SLACK_MAX_RETRIES', 3)),
+    shared=shared_state
+)
+
+# Slack API 주소 (벤치마크/테스트용 가짜 Slack 서버를 가리킬 때만 변경)
+SLACK_API_BASE_URL = os.getenv('SLACK_API_BASE_URL', WebClient.BASE_URL)
+
+# Slack WebClient 설정 (모든 호출이 스케줄러를 거치도록 감쌈)
+# 모든 워커 스레드가 keep-alive 커넥션 풀을 함께 쓰므로 호출마다 TLS 연결을 새로 맺지 않음
+# 클라이언트는 처음 API를 호출할 때(보통 워밍업에서) 만들어지므로 import 시점에는 네트워크를 쓰지 않음
+def build_web_client():
+    return PooledWebClient(
+        token,
+        base_url=SLACK_API_BASE_URL,
+        pool_size=int(os.getenv('SLACK_HTTP_POOL_SIZE', 8))
+    )
+
+if token:
+    web_client = LazyClient(build_web_client)
+    client = ScheduledClient(web_client, scheduler)
+    logger.info("Slack client configured")
+else:
+    # 토큰이 없어도 /stats, /ready 등은 동작하도록 None으로 둠
+    web_client = client = None
+    logger.error("SLACK_BOT_TOKEN is not set!")
+
+# 봇 user_id는 한 번만 조회하고 (토큰이 바뀌면 다시 조회) 요청마다 auth.test를 부르지 않음
+# 조회는 워밍업에서 하고, 워밍업을 끄거나 실패하면 처음 필요할 때 조회함
+bot_identity = BotIdentity()
+# 토큰이 폐기되거나(token_revoked) 잘못되면(invalid_auth) 캐시한 봇 정보를 비워서 다음 호출에서 다시 확인
+scheduler.on_auth_error(bot_identity.invalidate)
+
+# 사용자 정보 캐시 (모든 스레드에서 공유, 메시지마다 users.info를 호출하지 않도록 함)
+user_cache = UserCache(
+    ttl=int(os.getenv('USER_CACHE_TTL', 3600)),
+    maxsize=int(os.getenv('USER_CACHE_SIZE', 10000)),
+    shared=shared_state
+)
+
+# 긴 채팅 로그 발신기 (줄 단위로 메시지를 최대한 채워 보내고, 아주 길면 파일 하나로 업로드)
+outbound_sender = None
 if token:
-    client = WebClient(token)
-    print("Slack client initialized")
+    outbound_sender = OutboundSender(
+        client,
+        message_limit=int(os.getenv('OUTBOUND_MESSAGE_CHARS', 12000)),
+        upload_threshold=int(os.getenv('OUTBOUND_UPLOAD_THRESHOLD', 50000))
+    )
+
+# '/searchchatlog' 결과로 보여주는 최대 메시지 수와 메시지당 최대 글자 수
+SEARCH_RESULT_LIMIT = int(os.getenv('SEARCH_RESULT_LIMIT', 20))
+SEARCH_TEXT_CHARS = 300
+
+# 채팅 로그 내보내기 (JSONL/CSV 파일을 /mnt/data/exports에 쓰고 파일 하나로 올리거나 경로만 알려줌)
+exporter = ChatLogExporter(
+    os.getenv('EXPORT_DIR', default_export_dir()),
+    retention=int(os.getenv('EXPORT_RETENTION', 7 * 86400))
+)
+EXPORT_DEFAULT_FORMAT = os.getenv('EXPORT_FORMAT', 'jsonl')
+EXPORT_DEFAULT_COMPRESSION = os.getenv('EXPORT_COMPRESSION', 'gzip')
+EXPORT_DELIVERY = os.getenv('EXPORT_DELIVERY', 'upload')  # upload: Slack에 파일로 올림, path: 저장한 경로만 알려줌
+
+# 채널 메시지 로컬 저장소 (명령마다 전체 기록을 다시 가져오지 않고 새 메시지만 동기화)
+message_store = MessageStore(os.getenv('MESSAGE_STORE_PATH', default_store_path()))
+
+# 백그라운드 작업 큐 (동시에 실행되는 작업 수 제한, 같은 채널의 같은 명령은 하나로 합침)
+job_queue = JobQueue(
+    max_workers=int(os.getenv('JOB_WORKERS', 4)),
+    max_pending=int(os.getenv('JOB_QUEUE_SIZE', 32)),
+    shared=shared_state,
+    claim_ttl=int(os.getenv('JOB_CLAIM_TTL', 1800))
+)
+
+# Events API(message 이벤트)로 발화량 카운터를 갱신하는지 여부
+# true면 한 번 기록을 가져온 채널은 /speechquantity에서 conversations.history를 호출하지 않음
+SPEECH_COUNTS_FROM_EVENTS = os.getenv('SPEECH_COUNTS_FROM_EVENTS', 'true').lower() == 'true'
+
+# 발화량 상세 분석에서 시간대/요일을 계산할 때 사용하는 시간대
+ANALYTICS_TZ = os.getenv('ANALYTICS_TZ', 'UTC')
+
+# 로컬 저장소에서 한 번에 읽어 username을 붙이는 메시지 수
+CHATLOG_BATCH_SIZE = int(os.getenv('CHATLOG_BATCH_SIZE', 200))
+
+# Slack API 실행 방식 선택 (sync: WebClient + 작업 스레드, async: 워커 프로세스당 이벤트 루프 하나 + AsyncWebClient)
+async_backend = None
+if os.getenv('SLACK_BACKEND', 'sync') == 'async' and token:
+    from async_backend import AsyncSlackBackend
+    async_backend = AsyncSlackBackend(
+        token,
+        message_store,
+        user_cache,
+        scheduler,
+        base_url=SLACK_API_BASE_URL,
+        max_concurrency=int(os.getenv('SLACK_ASYNC_CONCURRENCY', 8)),
+        speech_counts_from_events=SPEECH_COUNTS_FROM_EVENTS,
+        message_limit=int(os.getenv('OUTBOUND_MESSAGE_CHARS', 12000)),
+        bot_identity=bot_identity,
+        pool_size=int(os.getenv('SLACK_HTTP_POOL_SIZE', 8)),
+        tz_name=ANALYTICS_TZ,
+        upload_threshold=int(os.getenv('OUTBOUND_UPLOAD_THRESHOLD', 50000)),
+        batch_size=CHATLOG_BATCH_SIZE
+    )
+    # gunicorn 밖(개발 서버, 벤치마크)에서도 종료할 때 세션을 닫음 (worker_exit에서 이미 닫았으면 아무것도 하지 않음)
+    atexit.register(async_backend.close)
+
+# 범위 인자가 잘못되었을 때 슬래시 명령에 돌려줄 안내
+USAGE_RANGE = (
+    "Usage: [7d|since=<7d|YYYY-MM-DD|ts>] [until=<1d|YYYY-MM-DD|ts>] [thread=<message link|ts>]"
+    "\n/speechquantity also accepts [channels=<all|#channel,...>] or 'backfill'"
+)
+
+# 여러 채널 리포트에서 동시에 기록을 가져오는 채널 수와 진행 상황 메시지 갱신 간격(초)
+REPORT_CHANNEL_WORKERS = int(os.getenv('REPORT_CHANNEL_WORKERS', 4))
+REPORT_PROGRESS_INTERVAL = float(os.getenv('REPORT_PROGRESS_INTERVAL', 2))
+
+# 미리 만들어 둘 리포트 설정 (REPORT_CHANNELS: 채널 ID 목록 또는 all, 비어 있으면 미리 만들지 않음)
+REPORT_CHANNELS = os.getenv('REPORT_CHANNELS', '')
+REPORT_WINDOWS = [window for window in os.getenv('REPORT_WINDOWS', '7d,30d,all').split(',') if parse_window(window) is not None]
+REPORT_INTERVAL = int(os.getenv('REPORT_INTERVAL', 6 * 3600))
+REPORT_MAX_DELAY = int(os.getenv('REPORT_MAX_DELAY', 12 * 3600))
+# 이보다 오래된 스냅샷은 쓰지 않고 평소처럼 새로 분석 (0이면 스냅샷을 쓰지 않음)
+REPORT_SNAPSHOT_MAX_AGE = int(os.getenv('REPORT_SNAPSHOT_MAX_AGE', REPORT_INTERVAL + REPORT_MAX_DELAY))
+
+# 대기열이 가득 찼을 때 슬래시 명령에 돌려줄 응답
+def busy_response():
+    return make_response("Too many requests are being processed. Please try again later.", 200)
+
+# Slack 요청 서명 검증 (SLACK_SIGNING_SECRET이 없으면 검증하지 않음)
+signing_secret = os.getenv("SLACK_SIGNING_SECRET")
+if signing_secret:
+    request_verifier = RequestVerifier(
+        signing_secret,
+        max_age=int(os.getenv('SLACK_REQUEST_MAX_AGE', 300)),
+        replay_cache_size=int(os.getenv('SLACK_REPLAY_CACHE_SIZE', 10000))
+    )
 else:
-    print("SLACK_BOT_TOKEN is not set!")
+    request_verifier = None
+    logger.warning("SLACK_SIGNING_SECRET is not set! Slack request signatures will not be verified")
 
-@app.route('/', methods=['POST'])
+# Slack에서 오는 요청(POST)은 라우트 처리 전에 서명을 확인하고, 잘못된 요청은 작업 큐에 넣기 전에 거절
+@bp.before_app_request
+def verify_slack_request():
+    if request_verifier is None or request.method != 'POST':
+        return None
+    
+    ok, reason = request_verifier.verify(
+        request.get_data(),  # 원본 body (request.form은 이 데이터로 다시 파싱됨)
+        request.headers.get('X-Slack-Request-Timestamp'),
+        request.headers.get('X-Slack-Signature')
+    )
+    if not ok:
+        logger.warning("Rejected Slack request to %s: %s", request.path, reason)
+        return make_response("Invalid request signature", 401)
+    return None
+
+@bp.route('/', methods=['POST'])
 def hello_there():
     slack_event = json.loads(request.data)
     
@@ -27,16 +220,47 @@ def hello_there():
     if "challenge" in slack_event:
         return make_response(slack_event["challenge"], 200, {"Content-Type": "application/json"})
     
+    # Events API 이벤트는 event_id 중복 확인 후 내부 큐에 넣고 바로 응답 (처리는 별도 스레드에서)
+    # 이미 접수한 이벤트의 재전송(X-Slack-Retry-Num)은 다시 처리하지 않고 200으로 응답
+    if slack_event.get('type') == 'event_callback' and 'event' in slack_event:
+        status = event_intake.accept(slack_event, retry_num=request.headers.get('X-Slack-Retry-Num'))
+        if status == 'dropped':
+            # 큐가 가득 찬 경우에는 Slack이 나중에 다시 보내도록 에러로 응답
+            return make_response("Event queue is full", 503)
+        return make_response("", 200)
+    
     return make_response("There are no slack request events", 404, {"X-Slack-No-Retry": 1})
 
+# Events API 이벤트를 처리
+def handle_event(event):
+    event_type = event.get('type')
+    channel_id = event.get('channel')
+    
+    # 채널 메시지(작성/수정/삭제)를 저장소에 반영하면 사용자별 메시지 수도 함께 갱신됨
+    if event_type == 'message' and channel_id:
+        message_store.apply_message_event(channel_id, event)
+    
+    # 봇이 새 채널에 들어오면 그 전까지의 기록으로 카운터를 채움 (백필)
+    elif event_type == 'member_joined_channel' and channel_id:
+        if event.get('user') == bot_identity.user_id(client):
+            job_queue.submit(('backfill', channel_id), message_store.sync_channel, client, channel_id)
+
+# Events API 이벤트 접수 큐 (event_id 기준 중복 제거, 처리 스레드 하나가 순서대로 handle_event 실행)
+event_intake = EventIntake(
+    handle_event,
+    dedup_ttl=int(os.getenv('EVENT_DEDUP_TTL', 3600)),
+    dedup_size=int(os.getenv('EVENT_DEDUP_SIZE', 10000)),
+    queue_size=int(os.getenv('EVENT_QUEUE_SIZE', 1000))
+)
+
 # '/hello' Slash Command 처리 라우트
-@app.route('/hello', methods=['POST'])
+@bp.route('/hello', methods=['POST'])
 def slash_hello():
     slack_event = request.form  # Slash command는 form data로 전달됨
-    print(f"Received event: {slack_event}")  # 이벤트 데이터를 출력하여 확인
+    log_sampled(logger, logging.DEBUG, "Received event", slack_event.to_dict())  # 이벤트 데이터 확인 (일부만 샘플링)
     
     channel_id = slack_event.get('channel_id')  # 명령어가 발생한 채널 ID
-    print(f"Channel ID: {channel_id}")  # 채널 ID 출력
+    logger.debug("Channel ID: %s", channel_id)
 
     # Slash Command '/hello' 처리
     if slack_event.get('command') == '/인사':  # 명령어가 '/hello'일 때
@@ -51,7 +275,7 @@ def slash_hello():
             return make_response("Message sent to the channel", 200)
         
         except SlackApiError as e:
-            print(f"Slack API error: {e.response['error']}")  # 에러 메시지 출력
+            logger.warning("Slack API error: %s", e.response['error'])
             error_message = f"Error sending message: {e.response['error']}"
             return make_response(error_message, 500)
     
@@ -192,154 +416,515 @@ def slash_hello():
 #        print(f"Unexpected error: {str(e)}")
 #        return None
 
-# 타임스탬프를 사람이 읽을 수 있는 형식으로 변환하는 함수
-def convert_timestamp_to_readable(ts):
-    return datetime.utcfromtimestamp(float(ts)).strftime('%Y-%m-%d %H:%M:%S')
+# 채팅 로그를 가져오지 못했을 때 채널에 알림
+def post_fetch_error(channel_id):
+    client.chat_postMessage(
+        channel=channel_id,
+        text="Error fetching chat log"
+    )
+
+# target에 맞는 메시지인지 확인 (user: 봇 메시지 제외, bot: 봇 메시지만, all: 전체)
+def is_target_message(user_id, bot_user_id, target):
+    if target == 'user':
+        return user_id != bot_user_id
+    if target == 'bot':
+        return user_id == bot_user_id
+    return True
+
+# 채널 채팅 로그를 차례로 돌려주는 제너레이터 (전체, 사용자, 봇 메시지 필터링)
+# 로컬 저장소를 동기화한 뒤 CHATLOG_BATCH_SIZE개씩 읽어서 username을 붙여 내보내므로
+# 채널 전체 기록을 한 번에 메모리에 올리지 않음. Slack API 에러는 그대로 발생시킴.
+# oldest/latest(Slack ts 문자열)를 주면 그 범위의 메시지만 돌려주고, 처음 보는 채널이어도 그 범위만 가져옴.
+# thread_ts를 주면 채널 대신 해당 스레드의 메시지를 conversations.replies로 가져옴.
+def iter_chatlog(channel_id, target='all', with_usernames=True, oldest=None, latest=None, thread_ts=None):
+    # 현재 봇의 user_id (캐시된 값)
+    bot_user_id = bot_identity.user_id(client)
+    
+    if thread_ts:
+        messages = iter_thread_messages(client, channel_id, thread_ts, oldest=oldest, latest=latest)
+    else:
+        # 로컬 저장소에 없는 메시지(마지막으로 본 ts 이후, 또는 요청한 범위)만 conversations.history로 가져와 저장
+        message_store.sync_range(client, channel_id, oldest=oldest, latest=latest)
+        messages = message_store.iter_messages(channel_id, oldest=oldest, latest=latest)
+    while True:
+        # 로컬 저장소에서 메시지를 한 묶음씩 읽어 target에 따라 필터링
+        rows = list(itertools.islice(messages, CHATLOG_BATCH_SIZE))
+        if not rows:
+            return
+        batch = [row for row in rows if is_target_message(row['user_id'], bot_user_id, target)]
+        if not with_usernames:
+            yield from batch
+            continue
+        
+        # 묶음에 등장한 사용자 정보를 캐시에서 한 번에 가져와 username 추가
+        usernames = user_cache.get_usernames(client, [log['user_id'] for log in batch])
+        for log in batch:
+            log['username'] = usernames.get(log['user_id'])
+            yield log
+
+# 분석 작업용: 사용자 메시지(봇 메시지 제외)를 dict 대신 열 단위 MessageBatch로 읽음
+# 채널은 저장소를 동기화한 뒤 SQLite에서 바로 읽고, 스레드는 conversations.replies 결과로 만듦
+def load_user_batch(channel_id, oldest=None, latest=None, thread_ts=None):
+    if thread_ts:
+        return MessageBatch.from_chat_logs(
+            iter_chatlog(channel_id, target='user', with_usernames=False, oldest=oldest, latest=latest, thread_ts=thread_ts)
+        )
+    message_store.sync_range(client, channel_id, oldest=oldest, latest=latest)
+    return message_store.load_batch(channel_id, oldest, latest, exclude_user_id=bot_identity.user_id(client))
 
 # 채널 채팅 로그를 가져오는 통합 함수 (전체, 사용자, 봇 메시지 필터링) 
 # target을 user나 bot으로 지정하면 해당 타겟에 맞는 내역만 가져옴.(EX:user = user채팅내역만 가져옴.)
 # 인수를 넣지 않으면 모든 채팅내역을 가져옴.
+# 전체 리스트가 필요한 곳에서만 사용하고, 가능하면 iter_chatlog를 사용
 def get_chatlog(channel_id, target='all'):
     try:
-        chat_logs = []
-        has_more = True
-        next_cursor = None
-        
-        # 현재 봇의 user_id를 가져옴
-        auth_response = client.auth_test()
-        bot_user_id = auth_response['user_id']
-        
-        while has_more:
-            # conversations.history API를 통해 채널 메시지 기록 가져오기
-            result = client.conversations_history(
-                channel=channel_id,
-                cursor=next_cursor  # 페이지네이션을 위한 cursor
-            )
-            
-            # 메시지 리스트를 가져옴
-            messages = result["messages"]
-            
-            # 각 메시지 필터링
-            for message in messages:
-                user_id = message.get('user')
-                
-                # 사용자 정보를 가져옴
-                user_info = client.users_info(user=user_id)
-                username = user_info['user']['name']
-                
-                # target에 따라 필터링
-                if target == 'user':
-                    # 봇 메시지는 제외
-                    if user_id == bot_user_id:
-                        continue
-                elif target == 'bot':
-                    # 봇 메시지만 포함
-                    if user_id != bot_user_id:
-                        continue
-                
-                # 메시지를 chat_logs에 추가 (username 포함)
-                chat_logs.append({
-                    "user_id": user_id,
-                    "username": username,
-                    "text": message.get('text'),
-                    "timestamp": message.get('ts')
-                })
-            
-            # 페이지네이션 정보 업데이트
-            has_more = result.get('has_more', False)
-            next_cursor = result.get('response_metadata', {}).get('next_cursor')
-        
-        return chat_logs  # 필터링된 메시지 로그 리턴
+        return list(iter_chatlog(channel_id, target))  # 필터링된 메시지 로그 리턴
     
     except SlackApiError as e:
-        print(f"Slack API error: {e.response['error']}")
+        logger.warning("Slack API error: %s", e.response['error'])
         return None
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.exception("Unexpected error: %s", e)
         return None
 
 
-# 채팅 로그 가져오기 및 메시지 전송 작업 (비동기 실행)
-def send_chat_log_to_slack(channel_id, target):
-    # bot의 메시지 내역만 가져오기
-    chat_logs = get_chatlog(channel_id, target)
-
-    print(chat_logs)
-
-    if chat_logs is None:
-        client.chat_postMessage(
-            channel=channel_id,
-            text="Error fetching chat log"
-        )
-        return
+# 명령을 보낸 사용자의 시간대 (Slack 프로필의 tz). 캐시에 없거나 알 수 없으면 ANALYTICS_TZ
+# 라우트에서 바로 응답해야 하므로 API 호출 없이 캐시(워밍업한 사용자 디렉터리)만 봄.
+# 정한 시간대를 작업 key에 넣으므로, 시간대가 같은 사용자들의 같은 요청은 하나로 합쳐짐
+def requester_tz(user_id):
+    if user_id:
+        try:
+            profiles, _ = user_cache.peek([user_id], count=False)
+            tz_name = profiles.get(user_id, {}).get('tz')
+            if tz_name:
+                renderer_for(tz_name)  # 알 수 없는 시간대 이름이면 여기서 예외
+                return tz_name
+        except Exception as e:
+            logger.warning("Could not resolve timezone for %s: %s", user_id, e)
+    return ANALYTICS_TZ
 
-    # chat_log의 각 항목에서 ID, text, timestamp, username을 포함하여 메시지를 포맷
-    formatted_chat_log = "\n".join([f"ID: {log['user_id']}, Username: {log['username']}, Time: {convert_timestamp_to_readable(log['timestamp'])}, Message: {log['text']}" for log in chat_logs])
 
-    # 메시지가 너무 길 경우 4000자 단위로 나눠서 보냄
-    for i in range(0, len(formatted_chat_log), 4000):
-        client.chat_postMessage(
-            channel=channel_id,  # 메시지를 보낼 채널 ID
-            text=f"Here is the bot chat history:\n{formatted_chat_log[i:i+4000]}"  # 채팅 기록
-        )
+# 채팅 로그 가져오기 및 메시지 전송 작업 (비동기 실행)
+# 채팅 로그를 읽으면서 줄 단위로 메시지(블록)에 채워 보내고, 너무 길면 파일 하나로 올림
+# 메모리에는 한 묶음 + 파일 업로드 기준 크기만큼만 올라감
+# 시각은 tz_name(명령을 보낸 사용자의 시간대) 기준으로 표시함
+# since/until은 parse_command_args가 정규화한 값이고, 상대 기간(7d)은 작업이 실행될 때 계산함
+def send_chat_log_to_slack(channel_id, target, since=None, until=None, thread_ts=None, tz_name=None):
+    try:
+        oldest, latest = resolve_range(since, until)
+        chat_logs = iter_chatlog(channel_id, target, oldest=oldest, latest=latest, thread_ts=thread_ts)
+        lines = renderer_for(tz_name or ANALYTICS_TZ).render_lines(chat_logs)
+        outbound_sender.send_lines(channel_id, lines, header="Here is the bot chat history:")
+    
+    except SlackApiError as e:
+        logger.warning("Slack API error: %s", e.response['error'])
+        post_fetch_error(channel_id)
+    except Exception as e:
+        logger.exception("Unexpected error: %s", e)
+        post_fetch_error(channel_id)
 
 # botchatlog 라우트 처리
-@app.route('/botchatlog', methods=['POST'])
+@bp.route('/botchatlog', methods=['POST'])
 def bot_chatlog():
     slack_event = request.form  # Slash command는 form data로 전달됨
     channel_id = slack_event.get('channel_id')  # 명령어가 발생한 채널 ID 가져오기
+    tz_name = requester_tz(slack_event.get('user_id'))  # 로그 시각을 명령을 보낸 사용자의 시간대로 표시
 
-    # 먼저 200 응답을 반환하여 타임아웃을 방지
-    response = make_response("Processing chat log...", 200)
-    
-    # 비동기 작업으로 채팅 로그 가져오기 및 메시지 전송 실행
-    threading.Thread(target=send_chat_log_to_slack, args=(channel_id, 'bot')).start()
+    # '/botchatlog 7d', '/botchatlog since=2024-05-01 until=2024-05-31', '/botchatlog thread=<메시지 링크>'
+    args = parse_command_args(slack_event.get('text', ''), tz_name=ANALYTICS_TZ)
+    if args is None or args['user'] or args['words'] or args['channels']:
+        return make_response(USAGE_RANGE, 200)
+    since, until, thread_ts = args['since'], args['until'], args['thread_ts']
 
-    return response
+    # 작업 큐에 넣고 먼저 200 응답을 반환하여 타임아웃을 방지
+    # (같은 채널에서 같은 범위, 같은 시간대로 이미 진행 중이면 그 결과를 함께 받음)
+    # 범위나 스레드를 지정한 요청은 동기 경로(WebClient)에서 처리
+    if async_backend and not (since or until or thread_ts):
+        future, coalesced = job_queue.submit(
+            ('botchatlog', channel_id, 'bot', None, None, None, tz_name),
+            async_backend.send_chat_log_to_slack, channel_id, 'bot', tz_name
+        )
+    else:
+        future, coalesced = job_queue.submit(
+            ('botchatlog', channel_id, 'bot', since, until, thread_ts, tz_name),
+            send_chat_log_to_slack, channel_id, 'bot', since, until, thread_ts, tz_name
+        )
+    if future is None:
+        return busy_response()
+    if coalesced:
+        return make_response("Chat log is already being processed for this channel...", 200)
 
-# 발화량 분석 및 메시지 전송 작업 (비동기 실행)
-def send_speech_analysis_to_slack(channel_id):
-    chat_logs = get_chatlog(channel_id, target='user')
+    return make_response("Processing chat log...", 200)
 
-    if chat_logs is None:
-        client.chat_postMessage(
-            channel=channel_id,
-            text="Error fetching chat log"
-        )
-        return
-    
-    print(chat_logs)
+# 채팅 로그를 파일로 내보낸 뒤 Slack에 파일 하나로 올리거나(delivery='upload') 저장한 경로를 알려줌(delivery='path')
+# 메시지로 나눠 보내지 않으므로 큰 채널도 전달에 드는 Slack API 호출이 몇 번으로 끝남
+def send_chat_log_export(channel_id, target, fmt, compression, delivery, since=None, until=None, thread_ts=None, tz_name=None):
+    try:
+        tz_name = tz_name or ANALYTICS_TZ
+        oldest, latest = resolve_range(since, until)
+        chat_logs = iter_chatlog(channel_id, target, oldest=oldest, latest=latest, thread_ts=thread_ts)
+        result = exporter.export(chat_logs, f"{channel_id}-{target}", fmt, compression, tz_name=tz_name)
+        logger.info("Exported %d messages from %s to %s in %.2fs", result['rows'], channel_id, result['path'], result['seconds'])
+
+        filename = os.path.basename(result['path'])
+        comment = f"Chat log export: {result['rows']} messages, {format_size(result['bytes'])} ({fmt}, {compression}, times in {tz_name})"
+        if delivery == 'upload':
+            client.files_upload_v2(
+                channel=channel_id,
+                file=result['path'],
+                filename=filename,
+                title=filename,
+                initial_comment=comment
+            )
+        else:
+            client.chat_postMessage(channel=channel_id, text=f"{comment}\nSaved to `{result['path']}`")
+
+    except SlackApiError as e:
+        logger.warning("Slack API error: %s", e.response['error'])
+        post_fetch_error(channel_id)
+    except Exception as e:
+        logger.exception("Unexpected error: %s", e)
+        post_fetch_error(channel_id)
+
+# 내보내기 명령 인자 안내
+USAGE_EXPORT = (
+    f"Usage: /exportchatlog [{'|'.join(FORMATS)}] [{'|'.join(COMPRESSIONS)}] [all|user|bot] [upload|path] "
+    "[7d|since=...] [until=...] [thread=...]"
+)
+
+# exportchatlog 라우트 처리
+# '/exportchatlog csv gzip 30d', '/exportchatlog jsonl zstd user path'
+@bp.route('/exportchatlog', methods=['POST'])
+def export_chatlog():
+    slack_event = request.form
+    channel_id = slack_event.get('channel_id')
+    tz_name = requester_tz(slack_event.get('user_id'))  # time 필드를 명령을 보낸 사용자의 시간대로
+
+    args = parse_command_args(slack_event.get('text', ''), tz_name=ANALYTICS_TZ)
+    if args is None or args['channels'] or args['user']:
+        return make_response(USAGE_EXPORT, 200)
+
+    fmt, compression, target, delivery = EXPORT_DEFAULT_FORMAT, EXPORT_DEFAULT_COMPRESSION, 'all', EXPORT_DELIVERY
+    for word in args['words']:
+        word = word.lower()
+        if word in FORMATS:
+            fmt = word
+        elif word in COMPRESSIONS or word in COMPRESSION_ALIASES:
+            compression = COMPRESSION_ALIASES.get(word, word)
+        elif word in ('all', 'user', 'bot'):
+            target = word
+        elif word in ('upload', 'path'):
+            delivery = word
+        else:
+            return make_response(USAGE_EXPORT, 200)
+    if not compression_available(compression):
+        return make_response(f"Compression '{compression}' is not available on this server.", 200)
+
+    since, until, thread_ts = args['since'], args['until'], args['thread_ts']
+    future, coalesced = job_queue.submit(
+        ('exportchatlog', channel_id, target, fmt, compression, delivery, since, until, thread_ts, tz_name),
+        send_chat_log_export, channel_id, target, fmt, compression, delivery, since, until, thread_ts, tz_name
+    )
+    if future is None:
+        return busy_response()
+    if coalesced:
+        return make_response("This export is already being processed for this channel...", 200)
+
+    return make_response(f"Exporting chat log ({fmt}, {compression})...", 200)
+
+# 검색 명령 인자 안내
+USAGE_SEARCH = (
+    "Usage: /searchchatlog <words or \"phrase\"> [from=@user] [7d|since=...] [until=...] [channels=<all|#channel,...>]"
+)
+
+# searchchatlog 라우트 처리
+# 로컬 저장소의 검색 인덱스만 사용하므로 Slack API를 호출하지 않고 바로 응답함 (요청한 사용자에게만 보임)
+# '/searchchatlog 회의록 from=@minsu 30d', '/searchchatlog "배포 일정" channels=all'
+@bp.route('/searchchatlog', methods=['POST'])
+def search_chatlog():
+    slack_event = request.form
+    channel_id = slack_event.get('channel_id')
+    user_id = slack_event.get('user_id')
+
+    args = parse_command_args(slack_event.get('text', ''), tz_name=ANALYTICS_TZ)
+    terms = split_search_terms(" ".join(args['words'])) if args else []
+    if args is None or args['thread_ts'] or not (terms or args['user']):
+        return make_response(USAGE_SEARCH, 200)
+
+    # channels=all이면 저장소의 모든 채널, 지정하지 않으면 명령을 보낸 채널
+    channel_ids = None if args['channels'] == 'all' else (args['channels'] or [channel_id])
+    if args['channels'] is None and message_store.high_water(channel_id) is None:
+        # 아직 저장소에 없는 채널이면 백그라운드에서 기록을 가져와 색인함
+        job_queue.submit(('storesync', channel_id), message_store.sync_channel, client, channel_id)
+        return make_response("This channel's history is not indexed yet. Indexing now, please try again shortly.", 200)
+
+    # from=: 멘션/ID는 그대로, @username은 사용자 캐시에서만 찾음 (라우트에서는 Slack API를 호출하지 않음)
+    author = None
+    if args['user']:
+        kind, value = args['user']
+        author = value if kind == 'id' else user_cache.peek_user_id(value)
+        if author is None and user_cache.needs_warm():
+            # 사용자 디렉터리가 아직 없으면 작업 큐에서 users.list로 찾은 뒤 결과를 요청한 사용자에게만 보냄
+            future, _ = job_queue.submit(
+                ('searchchatlog', channel_id, user_id, slack_event.get('text', '')),
+                send_search_results, channel_id, user_id, args, terms, channel_ids, value
+            )
+            if future is None:
+                return busy_response()
+            return make_response(f"Looking up {value}...", 200)
+        if author is None:
+            return make_response(f"Unknown user: {value}", 200)
+
+    return jsonify(search_response(args, terms, channel_ids, author, user_id))
+
+# 저장소에서 검색해 Slack 응답({'response_type', 'text'})을 만듦 (요청한 사용자에게만 보임)
+def search_response(args, terms, channel_ids, author, user_id):
+    started = time.perf_counter()
+    results = message_store.search(
+        terms, channel_ids=channel_ids, user_id=author, oldest=args['oldest'], latest=args['latest'],
+        limit=SEARCH_RESULT_LIMIT + 1
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
 
-    # 발화량 분석: 사용자별 메시지 수를 계산
-    user_message_count = {}
+    more = len(results) > SEARCH_RESULT_LIMIT
+    results = results[:SEARCH_RESULT_LIMIT]
+    renderer = renderer_for(requester_tz(user_id))
+    profiles, _ = user_cache.peek([result['user_id'] for result in results], count=False)
+    lines = []
+    for result in results:
+        text = result['text'] or ''
+        if len(text) > SEARCH_TEXT_CHARS:
+            text = text[:SEARCH_TEXT_CHARS] + "..."
+        author_name = profiles.get(result['user_id'], {}).get('name') or result['user_id']
+        channel = f" <#{result['channel_id']}>" if channel_ids is None or len(channel_ids) > 1 else ""
+        lines.append(f"{renderer.format_ts(result['ts'])}{channel} {author_name}: {text}")
+
+    summary = f"{len(results)}{'+' if more else ''} messages found ({describe_range(args)}, {elapsed_ms:.0f} ms)"
+    return {
+        "response_type": "ephemeral",
+        "text": "\n".join([summary] + lines) if lines else "No messages found."
+    }
+
+# from=@username을 캐시에서 찾지 못했을 때의 검색 작업 (비동기 실행)
+# 사용자 디렉터리를 users.list로 채워 이름을 찾은 뒤 검색 결과를 요청한 사용자에게만 보이게 보냄
+def send_search_results(channel_id, user_id, args, terms, channel_ids, name):
+    try:
+        author = user_cache.find_user_id(client, name)
+        text = search_response(args, terms, channel_ids, author, user_id)['text'] if author else f"Unknown user: {name}"
+    except SlackApiError as e:
+        logger.warning("Slack API error: %s", e.response['error'])
+        text = "Error looking up users"
+    client.chat_postEphemeral(channel=channel_id, user=user_id, text=text)
+
+# 발화량 분석 및 메시지 전송 작업 (비동기 실행)
+# Events API로 카운터를 갱신 중인 채널은 conversations.history를 호출하지 않고 저장된 카운터만 읽음 (O(사용자 수))
+# backfill=True거나 아직 기록을 가져온 적 없는 채널이면 먼저 기록을 동기화해서 카운터를 채움
+def send_speech_analysis_to_slack(channel_id, backfill=False):
+    try:
+        # 현재 봇의 user_id를 가져옴 (봇 메시지는 제외)
+        bot_user_id = bot_identity.user_id(client)
+        
+        if backfill or not SPEECH_COUNTS_FROM_EVENTS or message_store.high_water(channel_id) is None:
+            message_store.sync_channel(client, channel_id)
+        
+        # 발화량 분석: 사용자별 메시지 수
+        user_message_count = message_store.speech_counts(channel_id)
+        user_message_count.pop(bot_user_id, None)
     
-    for log in chat_logs:
-        user_id = log['user_id']
-        user_message_count[user_id] = user_message_count.get(user_id, 0) + 1
+    except SlackApiError as e:
+        logger.warning("Slack API error: %s", e.response['error'])
+        post_fetch_error(channel_id)
+        return
+    except Exception as e:
+        logger.exception("Unexpected error: %s", e)
+        post_fetch_error(channel_id)
+        return
 
-    # 가장 많이 발화한 사용자 찾기
-    most_active_user = max(user_message_count, key=user_message_count.get)
-    most_active_count = user_message_count[most_active_user]
+    # 가장 많이 발화한 사용자를 찾아 결과 메시지를 Slack 채널에 보내기
+    client.chat_postMessage(
+        channel=channel_id,
+        text=most_active_user_message(user_message_count)
+    )
+
+# 기간별 발화량 상세 분석 작업 (사용자별 메시지/글자/단어 수, 점유율, 시간대/요일별 활동)
+# since/until은 parse_command_args가 정규화한 값 (둘 다 None이면 전체 기간, 상대 기간은 작업이 실행될 때 계산)
+def send_speech_report_to_slack(channel_id, title, since=None, until=None, thread_ts=None):
+    try:
+        oldest, latest = resolve_range(since, until)
+        analytics = SpeechAnalytics.from_batch(load_user_batch(channel_id, oldest, latest, thread_ts))
+    
+    except SlackApiError as e:
+        logger.warning("Slack API error: %s", e.response['error'])
+        post_fetch_error(channel_id)
+        return
+    except Exception as e:
+        logger.exception("Unexpected error: %s", e)
+        post_fetch_error(channel_id)
+        return
 
-    # 결과 메시지를 Slack 채널에 보내기
     client.chat_postMessage(
         channel=channel_id,
-        text=f"User <@{most_active_user}> has spoken the most with {most_active_count} messages."
+        text=analytics.report(title, tz_name=ANALYTICS_TZ)
     )
 
+# 여러 채널(channels='all'이면 봇이 들어가 있는 모든 채널)의 발화량/활동 리포트 작업 (비동기 실행)
+# map: 채널마다 iter_chatlog로 부분 집계(SpeechAnalytics)를 병렬로 만듦 (호출 한도는 스케줄러가 공유)
+# reduce: 부분 집계를 합쳐 하나의 리포트로 만듦. 진행 상황은 처음 보낸 메시지를 chat.update로 갱신해서 보여줌
+def send_channel_report_to_slack(channel_id, channels, title, since=None, until=None):
+    oldest, latest = resolve_range(since, until)
+    try:
+        if channels == 'all':
+            channels = list(iter_member_channels(client))
+    except SlackApiError as e:
+        logger.warning("Slack API error: %s", e.response['error'])
+        post_fetch_error(channel_id)
+        return
+
+    progress = client.chat_postMessage(channel=channel_id, text=f"{title}: collecting 0/{len(channels)} channels...")
+    last_update = time.monotonic()
+
+    def map_channel(report_channel_id):
+        return SpeechAnalytics.from_batch(load_user_batch(report_channel_id, oldest, latest))
+
+    def on_progress(done, total):
+        nonlocal last_update
+        if done == total or time.monotonic() - last_update < REPORT_PROGRESS_INTERVAL:
+            return
+        last_update = time.monotonic()
+        try:
+            client.chat_update(channel=channel_id, ts=progress['ts'], text=f"{title}: collecting {done}/{total} channels...")
+        except SlackApiError as e:
+            logger.warning("Slack API error: %s", e.response['error'])
+
+    partials, errors = map_channels(channels, map_channel, max_workers=REPORT_CHANNEL_WORKERS, on_progress=on_progress)
+    analytics = SpeechAnalytics.merge(partials.values())
+
+    text = analytics.report(f"{title} across {len(partials)} channels", tz_name=ANALYTICS_TZ)
+    busiest = sorted(((ch, part) for ch, part in partials.items() if len(part)), key=lambda item: len(item[1]), reverse=True)[:10]
+    if busiest:
+        text += "\nBusiest channels: " + ", ".join(f"<#{ch}> ({len(part)})" for ch, part in busiest)
+    if errors:
+        text += f"\nSkipped {len(errors)} channels: " + ", ".join(f"<#{ch}> ({error})" for ch, error in errors.items())
+
+    client.chat_update(channel=channel_id, ts=progress['ts'], text=text)
+
+# 리포트를 미리 만들 채널 목록
+def list_report_channels():
+    if REPORT_CHANNELS.strip().lower() == 'all':
+        return list(iter_member_channels(client))
+    return [channel.strip() for channel in REPORT_CHANNELS.split(',') if channel.strip()]
+
+# 채널 기록을 동기화한 뒤 발화량/기간별 리포트를 만들어 저장소에 스냅샷으로 저장 (ReportScheduler가 호출)
+def refresh_report_snapshots(channel_id):
+    message_store.sync_channel(client, channel_id)
+    bot_user_id = bot_identity.user_id(client)
+    now = time.time()
+
+    user_message_count = message_store.speech_counts(channel_id)
+    user_message_count.pop(bot_user_id, None)
+    reports = {'speechquantity': most_active_user_message(user_message_count)}
+
+    analytics = SpeechAnalytics.from_batch(message_store.load_batch(channel_id, exclude_user_id=bot_user_id))
+    for window in REPORT_WINDOWS:
+        window_seconds = parse_window(window)
+        title = f"Speech analysis for the last {window}" if window_seconds else "Speech analysis for all time"
+        reports[window] = analytics.last(window_seconds, now).report(title, tz_name=ANALYTICS_TZ)
+    # REPORT_WINDOWS에서 빠진 기간의 예전 리포트는 함께 지워짐 (남아 있으면 snapshot_time이 계속 예전 시각이 됨)
+    message_store.save_snapshots(channel_id, reports, now)
+
+# 리포트 스케줄러 (REPORT_SCHEDULER=inprocess면 이 프로세스에서, worker면 worker.py 프로세스에서 실행)
+report_scheduler = ReportScheduler(
+    refresh_report_snapshots,
+    list_report_channels,
+    message_store.snapshot_time,
+    interval=REPORT_INTERVAL,
+    offpeak_hours=parse_offpeak_hours(os.getenv('REPORT_OFFPEAK_HOURS')),
+    max_delay=REPORT_MAX_DELAY,
+    tz_name=ANALYTICS_TZ
+)
+# gunicorn은 워커 프로세스마다 따로 돌게 되므로 개발 서버처럼 프로세스가 하나일 때만 inprocess 사용
+if token and REPORT_CHANNELS and os.getenv('REPORT_SCHEDULER', 'worker') == 'inprocess':
+    report_scheduler.start()
+
+# 미리 만들어 둔 리포트가 있으면 바로 응답 (만든 지 얼마나 되었는지 함께 표시). 없거나 너무 오래되었으면 None
+def snapshot_response(channel_id, report):
+    if not REPORT_SNAPSHOT_MAX_AGE:
+        return None
+    row = message_store.snapshot(channel_id, report)
+    if row is None:
+        return None
+    text, created_at = row
+    age = time.time() - created_at
+    if age > REPORT_SNAPSHOT_MAX_AGE:
+        return None
+    return jsonify({
+        "response_type": "in_channel",
+        "text": f"{text}\n_(precomputed {format_age(age)} ago)_"
+    })
+
 # speechquantity 라우트 처리
-@app.route('/speechquantity', methods=['POST'])
+@bp.route('/speechquantity', methods=['POST'])
 def speechquantity():
     slack_event = request.form  # Slash command는 form data로 전달됨
     channel_id = slack_event.get('channel_id')  # 명령어가 발생한 채널 ID 가져오기
 
-    # 먼저 200 응답을 반환하여 타임아웃을 방지
-    response = make_response("Processing speech analysis...", 200)
+    # 작업 큐에 넣고 먼저 200 응답을 반환하여 타임아웃을 방지
+    # (같은 채널에서 이미 진행 중이면 그 결과를 함께 받음)
+    text = slack_event.get('text', '').strip()
+    window_seconds = parse_window(text)
+    args = parse_command_args(text, tz_name=ANALYTICS_TZ) if window_seconds is None else None
+    words = [word.lower() for word in args['words']] if args else []
+    
+    # 미리 만들어 둔 기간별 리포트가 있으면 Slack API를 호출하지 않고 바로 응답
+    # (Events API로 카운터를 갱신 중이면 기본 분석은 저장소 카운터만 읽으므로 스냅샷 없이도 빠름)
+    if window_seconds is not None:
+        snapshot = snapshot_response(channel_id, text.lower())
+    elif not text and not SPEECH_COUNTS_FROM_EVENTS:
+        snapshot = snapshot_response(channel_id, 'speechquantity')
+    else:
+        snapshot = None
+    if snapshot is not None:
+        return snapshot
     
-    # 비동기 작업으로 발화량 분석 실행
-    threading.Thread(target=send_speech_analysis_to_slack, args=(channel_id,)).start()
+    if window_seconds is not None:
+        # '/speechquantity 7d', '/speechquantity 30d', '/speechquantity all': 기간별 상세 분석
+        since = text.lower() if window_seconds else None
+        title = f"Speech analysis for the last {text.lower()}" if window_seconds else "Speech analysis for all time"
+        future, coalesced = job_queue.submit(
+            ('speechreport', channel_id, since, None, None), send_speech_report_to_slack, channel_id, title, since
+        )
+    elif args is None or args['user'] or words not in ([], ['backfill']):
+        # 알 수 없는 단어가 있으면 무시하지 않고 사용법 안내
+        return make_response(USAGE_RANGE, 200)
+    elif words and (args['channels'] or args['since'] or args['until'] or args['thread_ts']):
+        # backfill은 채널 전체를 다시 동기화하므로 범위/채널 옵션과 함께 쓸 수 없음
+        return make_response(USAGE_RANGE, 200)
+    elif args['channels']:
+        # '/speechquantity channels=all 30d', '/speechquantity <#C123|general> <#C456|random>': 여러 채널 합산 분석
+        channels = args['channels'] if args['channels'] == 'all' else tuple(args['channels'])
+        future, coalesced = job_queue.submit(
+            ('channelreport', channel_id, channels, args['since'], args['until']),
+            send_channel_report_to_slack, channel_id, channels, f"Speech analysis ({describe_range(args)})",
+            args['since'], args['until']
+        )
+    elif args['since'] or args['until'] or args['thread_ts']:
+        # '/speechquantity since=2024-05-01 until=2024-05-31', '/speechquantity thread=<메시지 링크>': 범위 지정 분석
+        future, coalesced = job_queue.submit(
+            ('speechreport', channel_id, args['since'], args['until'], args['thread_ts']),
+            send_speech_report_to_slack, channel_id, f"Speech analysis ({describe_range(args)})",
+            args['since'], args['until'], args['thread_ts']
+        )
+    else:
+        # '/speechquantity backfill'이면 채널 기록을 다시 동기화해서 카운터를 채운 뒤 분석
+        backfill = words == ['backfill']
+        job = async_backend.send_speech_analysis_to_slack if async_backend else send_speech_analysis_to_slack
+        future, coalesced = job_queue.submit(('speechquantity', channel_id, backfill), job, channel_id, backfill)
+    if future is None:
+        return busy_response()
+    if coalesced:
+        return make_response("Speech analysis is already being processed for this channel...", 200)
 
-    return response
+    return make_response("Processing speech analysis...", 200)
 
 # # '/chatlog' Slash Command 처리 라우트
 # @app.route('/chatlog', methods=['POST'])
@@ -377,13 +962,82 @@ def speechquantity():
 #     return make_response("Command not recognized", 404)
 
 
+# 워커가 트래픽을 받기 전에 미리 해 두는 준비 작업
+# Slack API 커넥션(TCP/TLS) 연결, 봇 정보(auth.test), 사용자 디렉터리(users.list)를 채워서
+# 재시작 직후 첫 슬래시 명령이 이 비용을 모두 기다리지 않게 함 (WARMUP=false면 건너뜀)
+WARMUP_CONNECTIONS = int(os.getenv('WARMUP_CONNECTIONS', 2))
+
+def warm_connections():
+    web_client.get().prime_connections(WARMUP_CONNECTIONS)
+
+warmup = Warmup(
+    [
+        ('connections', warm_connections),
+        ('bot_identity', lambda: bot_identity.resolve(client)),
+        ('user_directory', lambda: user_cache.warm(client, force=False)),
+    ] if token else [],
+    enabled=os.getenv('WARMUP', 'true').lower() == 'true'
+)
+
+# readinessProbe용 라우트. 워밍업이 끝나기 전에는 503으로 응답해서 아직 트래픽을 받지 않음
+# gunicorn은 워커를 띄울 때(post_worker_init) 워밍업을 시작하고, 그 밖의 실행 방식에서는 첫 확인 요청 때 시작함
+@bp.route('/ready', methods=['GET'])
+def ready():
+    warmup.start()
+    status = 200 if warmup.ready() else 503
+    return jsonify({"ready": status == 200, "warmup": warmup.stats()}), status
+
 # 테스트용 라우트 추가
-@app.route('/network', methods=['GET'])
+@bp.route('/network', methods=['GET'])
 def test():
     return "Hello, World!", 200
 
+# Prometheus 형식 메트릭 (라우트/작업/Slack API 지연 시간, 429, 가져온 페이지/메시지 수)
+REGISTRY.gauge('thegull_job_queue_depth', 'Background jobs waiting to run', lambda: job_queue.stats()['queue_depth'])
+REGISTRY.gauge('thegull_jobs_running', 'Background jobs currently running', lambda: job_queue.stats()['running'])
+REGISTRY.gauge('thegull_event_queue_depth', 'Events API events waiting to be handled', lambda: event_intake.stats()['queue_depth'])
+REGISTRY.gauge('thegull_user_cache_size', 'Cached user profiles', lambda: user_cache.stats()['size'])
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    response = make_response(REGISTRY.render(), 200)
+    response.mimetype = 'text/plain; version=0.0.4'
+    return response
+
+# 캐시 등 내부 상태 확인용 라우트
+@bp.route('/stats', methods=['GET'])
+def stats():
+    return jsonify({
+        "user_cache": user_cache.stats(),
+        "job_queue": job_queue.stats(),
+        "shared_state": shared_state.stats() if shared_state is not None else None,
+        "slack_api": scheduler.stats(),
+        "request_verifier": request_verifier.stats() if request_verifier else None,
+        "event_intake": event_intake.stats(),
+        "outbound": outbound_sender.stats() if outbound_sender is not None else None,
+        "exporter": exporter.stats(),
+        "slack_http": web_client.pool.stats() if web_client is not None and web_client.created else None,
+        "bot_identity": bot_identity.stats(),
+        "report_scheduler": report_scheduler.stats(),
+        "warmup": warmup.stats()
+    }), 200
+
+# Flask 앱을 만들어 라우트를 붙임
+# start_warmup=True면 바로 워밍업을 시작함. gunicorn(preload_app)은 마스터에서 앱을 만들고 워커를 fork하므로
+# 워밍업은 여기서 하지 않고 워커마다 post_worker_init(gunicorn.conf.py)에서 시작함
+def create_app(start_warmup=False):
+    flask_app = Flask(__name__)
+    flask_app.register_blueprint(bp)
+    if start_warmup:
+        warmup.start()
+    return flask_app
+
+# gunicorn slack_test:app, flask run에서 사용하는 앱
+app = create_app()
+
 if __name__ == '__main__':
         # 환경 변수를 사용하여 호스트와 포트를 설정 (기본값은 0.0.0.0과 5000)
     host = os.getenv('FLASK_RUN_HOST', '0.0.0.0')
     port = int(os.getenv('FLASK_RUN_PORT', 5000))
+    warmup.start()
     app.run(host=host, port=port)
\ No newline at end of file
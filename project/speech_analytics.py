@@ -0,0 +1,207 @@
+import re
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+
+# 발화량 분석 엔진 (NumPy 배열 기반 열 단위 집계)
+# MessageBatch(열 단위 메시지 묶음) 또는 get_chatlog/iter_chatlog의 메시지(dict)에서
+# 타임스탬프, 사용자 코드, 글자 수, 단어 수 배열을 만든 뒤
+# 기간 필터와 사용자별/시간대별/요일별 집계를 모두 배열 연산으로 처리함.
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# '7d', '24h', '2w' 같은 기간 표기
+_WINDOW_PATTERN = re.compile(r'^(\d+)([hdw])$')
+_WINDOW_UNITS = {'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+# 기간 표기를 초 단위로 변환. 'all'이면 0(전체 기간), 기간 표기가 아니면 None
+def parse_window(text):
+    text = (text or '').strip().lower()
+    if text == 'all':
+        return 0
+    match = _WINDOW_PATTERN.match(text)
+    if match is None:
+        return None
+    return int(match.group(1)) * _WINDOW_UNITS[match.group(2)]
+
+
+def _utc_offset(tz, seconds):
+    return int(datetime.fromtimestamp(seconds, tz).utcoffset().total_seconds())
+
+
+# 메시지 시각(Slack ts, 초)을 tz_name 시간대의 현지 시각(초)으로 바꿈
+# 일광 절약 시간처럼 시기마다 UTC 오프셋이 다른 시간대도 각 메시지 시각의 오프셋을 씀.
+# 오프셋은 메시지가 있는 UTC 1시간 구간마다 한 번만 계산하고 (구간 안에서는 보통 같음),
+# 구간 안에서 오프셋이 바뀌는 드문 경우에만 그 구간의 메시지마다 계산함 (LogRenderer와 같은 방식)
+def local_seconds(timestamps, tz_name='UTC'):
+    if tz_name == 'UTC' or not len(timestamps):
+        return timestamps
+    tz = ZoneInfo(tz_name)
+    seconds = np.floor(timestamps).astype(np.int64)
+    hours, inverse = np.unique(seconds // 3600, return_inverse=True)
+    starts = np.array([_utc_offset(tz, hour * 3600) for hour in hours.tolist()], dtype=np.int64)
+    ends = np.array([_utc_offset(tz, hour * 3600 + 3599) for hour in hours.tolist()], dtype=np.int64)
+    offsets = starts[inverse]
+    for i in np.flatnonzero((starts != ends)[inverse]).tolist():
+        offsets[i] = _utc_offset(tz, int(seconds[i]))
+    return timestamps + offsets
+
+
+class SpeechAnalytics:
+    def __init__(self, user_ids, user_codes, timestamps, chars, words):
+        self.user_ids = user_ids  # 코드 -> user_id
+        self.user_codes = user_codes  # int32, 메시지별 사용자 코드
+        self.timestamps = timestamps  # float64, 메시지별 Slack ts (초)
+        self.chars = chars  # int32, 메시지별 글자 수
+        self.words = words  # int32, 메시지별 단어 수
+
+    @classmethod
+    def from_chat_logs(cls, chat_logs):
+        codes = {}
+        user_codes = []
+        timestamps = []
+        chars = []
+        words = []
+
+        for log in chat_logs:
+            user_id = log['user_id']
+            if user_id is None:
+                continue  # 사용자가 없는 메시지(bot_message 등)는 MessageBatch와 같이 세지 않음
+            code = codes.get(user_id)
+            if code is None:
+                code = codes[user_id] = len(codes)
+            text = log['text'] or ''
+            user_codes.append(code)
+            timestamps.append(float(log['timestamp']))
+            chars.append(len(text))
+            words.append(len(text.split()))
+
+        return cls(
+            list(codes),
+            np.array(user_codes, dtype=np.int32),
+            np.array(timestamps, dtype=np.float64),
+            np.array(chars, dtype=np.int32),
+            np.array(words, dtype=np.int32),
+        )
+
+    # MessageBatch의 배열을 그대로 사용 (사용자 코드를 다시 매기지 않음)
+    @classmethod
+    def from_batch(cls, batch):
+        return cls(
+            batch.user_ids,
+            batch.user_codes,
+            batch.timestamps(),
+            batch.char_counts(),
+            batch.word_counts(),
+        )
+
+    # 여러 SpeechAnalytics(채널별 부분 집계)를 하나로 합침. 사용자 코드는 합친 결과 기준으로 다시 매김
+    @classmethod
+    def merge(cls, parts):
+        codes = {}
+        user_codes = [np.array([], dtype=np.int32)]
+        timestamps = [np.array([], dtype=np.float64)]
+        chars = [np.array([], dtype=np.int32)]
+        words = [np.array([], dtype=np.int32)]
+
+        for part in parts:
+            remap = np.array([codes.setdefault(user_id, len(codes)) for user_id in part.user_ids], dtype=np.int32)
+            if len(part):
+                user_codes.append(remap[part.user_codes])
+                timestamps.append(part.timestamps)
+                chars.append(part.chars)
+                words.append(part.words)
+
+        return cls(
+            list(codes),
+            np.concatenate(user_codes),
+            np.concatenate(timestamps),
+            np.concatenate(chars),
+            np.concatenate(words),
+        )
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    # since <= ts < until 인 메시지만 남긴 새 SpeechAnalytics 리턴 (사용자 코드는 그대로 공유)
+    def window(self, since=None, until=None):
+        mask = np.ones(len(self.timestamps), dtype=bool)
+        if since is not None:
+            mask &= self.timestamps >= since
+        if until is not None:
+            mask &= self.timestamps < until
+        return SpeechAnalytics(
+            self.user_ids,
+            self.user_codes[mask],
+            self.timestamps[mask],
+            self.chars[mask],
+            self.words[mask],
+        )
+
+    # 최근 seconds초 동안의 메시지만 남김 (0 또는 None이면 전체)
+    def last(self, seconds, now=None):
+        if not seconds:
+            return self
+        return self.window(since=(now or time.time()) - seconds)
+
+    # 사용자별 메시지 수, 글자 수, 단어 수, 대화 점유율을 메시지 수 내림차순으로 리턴
+    def per_user(self):
+        n_users = len(self.user_ids)
+        counts = np.bincount(self.user_codes, minlength=n_users)
+        chars = np.bincount(self.user_codes, weights=self.chars, minlength=n_users)
+        words = np.bincount(self.user_codes, weights=self.words, minlength=n_users)
+        total = counts.sum()
+
+        stats = []
+        for code in np.argsort(-counts, kind='stable'):
+            if counts[code] == 0:
+                break
+            stats.append({
+                "user_id": self.user_ids[code],
+                "messages": int(counts[code]),
+                "chars": int(chars[code]),
+                "words": int(words[code]),
+                "share": float(counts[code] / total),
+            })
+        return stats
+
+    # 시간대별(0~23시) 메시지 수. tz_name 시간대의 현지 시각 기준
+    def activity_by_hour(self, tz_name='UTC', local=None):
+        local = local_seconds(self.timestamps, tz_name) if local is None else local
+        hours = (local // 3600 % 24).astype(np.int64)
+        return np.bincount(hours, minlength=24)
+
+    # 요일별(월~일) 메시지 수. 1970-01-01은 목요일이므로 +3 하면 월요일이 0
+    def activity_by_weekday(self, tz_name='UTC', local=None):
+        local = local_seconds(self.timestamps, tz_name) if local is None else local
+        days = (local // 86400 + 3) % 7
+        return np.bincount(days.astype(np.int64), minlength=7)
+
+    # Slack에 보낼 분석 결과 메시지 (시간대/요일은 tz_name 시간대 기준)
+    def report(self, title, tz_name='UTC', top=10):
+        users = self.per_user()
+        if not users:
+            return f"{title}\nThere are no messages to analyze."
+
+        lines = [f"{title} ({len(self)} messages, {len(users)} users)"]
+        for rank, user in enumerate(users[:top], start=1):
+            lines.append(
+                f"{rank}. <@{user['user_id']}>: {user['messages']} messages ({user['share']:.1%}), "
+                f"{user['chars']} chars, {user['words']} words"
+            )
+
+        local = local_seconds(self.timestamps, tz_name)
+        hours = self.activity_by_hour(local=local)
+        busiest = [hour for hour in np.argsort(-hours, kind='stable')[:3] if hours[hour] > 0]
+        lines.append(
+            f"Busiest hours ({tz_name}): "
+            + ", ".join(f"{hour:02d}:00 ({hours[hour]})" for hour in busiest)
+        )
+
+        weekdays = self.activity_by_weekday(local=local)
+        lines.append("Activity by day: " + " | ".join(f"{WEEKDAYS[day]} {weekdays[day]}" for day in range(7)))
+        return "\n".join(lines)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# project/ 디렉토리의 모듈(command_args, message_store 등)을 스크립트와 같은 방식으로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
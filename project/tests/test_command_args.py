@@ -0,0 +1,119 @@
+import pytest
+
+from command_args import (
+    describe_range, normalize_time, parse_channel, parse_command_args, parse_thread_ts, parse_time, parse_user,
+    resolve_range,
+)
+
+NOW = 1717200000.0  # 2024-06-01 00:00:00 UTC
+
+
+def test_parse_time_relative_window():
+    assert parse_time('7d', now=NOW) == f"{NOW - 7 * 86400:.6f}"
+    assert parse_time('12h', now=NOW) == f"{NOW - 12 * 3600:.6f}"
+
+
+def test_parse_time_date_uses_timezone_and_end_of_day():
+    assert parse_time('2024-05-01', 'UTC') == '1714521600.000000'
+    assert parse_time('2024-05-01', 'Asia/Seoul') == '1714489200.000000'
+    assert parse_time('2024-05-01', 'UTC', end_of_day=True) == '1714608000.000000'
+
+
+def test_parse_time_ts_and_invalid():
+    assert parse_time('1712345678.1234') == '1712345678.123400'
+    assert parse_time('2024-13-01') is None
+    assert parse_time('yesterday') is None
+
+
+def test_normalize_time_keeps_relative_windows_as_text():
+    assert normalize_time('7D') == '7d'
+    assert normalize_time('2024-05-01', 'Asia/Seoul') == '1714489200.000000'
+    assert normalize_time('nope') is None
+
+
+def test_resolve_range_is_relative_to_now():
+    assert resolve_range('7d', '1d', now=NOW) == (f"{NOW - 7 * 86400:.6f}", f"{NOW - 86400:.6f}")
+    assert resolve_range('1714521600.000000', None, now=NOW) == ('1714521600.000000', None)
+    assert resolve_range(now=NOW) == (None, None)
+
+
+def test_parse_thread_ts_from_permalink_or_ts():
+    assert parse_thread_ts('https://x.slack.com/archives/C123/p1712345678123456') == '1712345678.123456'
+    assert parse_thread_ts('1712345678.123456') == '1712345678.123456'
+    assert parse_thread_ts('not-a-thread') is None
+
+
+def test_parse_channel_and_user():
+    assert parse_channel('<#C0123ABC|general>') == 'C0123ABC'
+    assert parse_channel('C0123ABC') == 'C0123ABC'
+    assert parse_channel('general') is None
+    assert parse_user('U0123ABC') == ('id', 'U0123ABC')
+    assert parse_user('@U0123ABC|minsu') == ('id', 'U0123ABC')
+    assert parse_user('@minsu') == ('name', 'minsu')
+    assert parse_user('@') is None
+
+
+def test_parse_command_args_defaults():
+    args = parse_command_args('', now=NOW)
+    assert args == {
+        'words': [], 'since': None, 'until': None, 'oldest': None, 'latest': None,
+        'thread_ts': None, 'channels': None, 'user': None,
+    }
+
+
+def test_parse_command_args_bare_window_is_since():
+    args = parse_command_args('7d', now=NOW)
+    assert args['since'] == '7d'
+    assert args['oldest'] == f"{NOW - 7 * 86400:.6f}"
+    assert args['words'] == []
+
+
+def test_parse_command_args_same_text_gives_same_key_at_different_times():
+    # 작업 key는 since/until(정규화한 텍스트)을 쓰므로 요청 시각이 달라도 같음
+    first = parse_command_args('since=30d until=7d', now=NOW)
+    second = parse_command_args('since=30d until=7d', now=NOW + 59)
+    assert (first['since'], first['until']) == (second['since'], second['until']) == ('30d', '7d')
+    assert first['oldest'] != second['oldest']
+
+
+def test_parse_command_args_dates_and_thread():
+    args = parse_command_args(
+        'since=2024-05-01 until=<2024-05-31> thread=<https://x.slack.com/archives/C1/p1712345678123456>',
+        tz_name='UTC', now=NOW
+    )
+    assert args['since'] == args['oldest'] == '1714521600.000000'
+    assert args['until'] == args['latest'] == '1717200000.000000'
+    assert args['thread_ts'] == '1712345678.123456'
+
+
+def test_parse_command_args_channels_and_user():
+    args = parse_command_args('<#C0123ABC|general> channels=C0456DEF,<#C0789GHI> from=<@U0123ABC> 회의록', now=NOW)
+    assert args['channels'] == ['C0123ABC', 'C0456DEF', 'C0789GHI']
+    assert args['user'] == ('id', 'U0123ABC')
+    assert args['words'] == ['회의록']
+
+    assert parse_command_args('channels=all <#C0123ABC>', now=NOW)['channels'] == 'all'
+
+
+@pytest.mark.parametrize('text', [
+    'since=yesterday',
+    'until=2024-02-30',
+    'thread=nope',
+    'channels=general',
+    'from=@',
+    'color=blue',
+    'since=2024-05-31 until=2024-05-01',
+])
+def test_parse_command_args_rejects_invalid_options(text):
+    assert parse_command_args(text, now=NOW) is None
+
+
+def test_parse_command_args_since_all_means_no_lower_bound():
+    args = parse_command_args('since=all', now=NOW)
+    assert args['since'] is None and args['oldest'] is None
+
+
+def test_describe_range():
+    assert describe_range({}) == "all time"
+    args = parse_command_args('since=2024-05-01 until=2024-05-31', now=NOW)
+    assert describe_range(args) == "since 2024-05-01 00:00 UTC, until 2024-06-01 00:00 UTC"
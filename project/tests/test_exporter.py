@@ -0,0 +1,113 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from exporter import ChatLogExporter, compression_available, export_name_pattern, format_size
+
+CHAT_LOGS = [
+    {"timestamp": '1700000000.000100', "user_id": 'U1', "username": 'alice', "text": '안녕하세요'},
+    {"timestamp": '1700000060.000200', "user_id": 'U2', "username": None, "text": 'comma, "quote"\nnewline'},
+]
+
+
+def read_text(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def read_rows(path):
+    text = read_text(path)
+    if '.jsonl' in path:
+        return [json.loads(line) for line in text.splitlines()]
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+@pytest.mark.parametrize('fmt', ['jsonl', 'csv'])
+@pytest.mark.parametrize('compression', ['none', 'gzip'])
+def test_export_writes_rows(tmp_path, fmt, compression):
+    exporter = ChatLogExporter(str(tmp_path))
+    result = exporter.export(iter(CHAT_LOGS), 'C1', fmt=fmt, compression=compression, tz_name='Asia/Seoul')
+
+    assert result['rows'] == 2
+    assert result['bytes'] == os.path.getsize(result['path'])
+    assert export_name_pattern().match(os.path.basename(result['path']))
+    assert result['path'].endswith(f".{fmt}.gz" if compression == 'gzip' else f".{fmt}")
+    assert os.listdir(tmp_path) == [os.path.basename(result['path'])]  # .part 파일이 남지 않음
+
+    rows = read_rows(result['path'])
+    assert [row['ts'] for row in rows] == ['1700000000.000100', '1700000060.000200']
+    assert rows[0]['time'] == '2023-11-15 07:13:20'  # KST (UTC+9)
+    assert rows[0]['text'] == '안녕하세요'
+    assert rows[1]['text'] == 'comma, "quote"\nnewline'
+    assert rows[1]['username'] in (None, '')  # CSV에는 빈 칸으로 들어감
+    assert exporter.stats()['rows_written'] == 2
+
+
+def test_export_removes_partial_file_on_error(tmp_path):
+    def broken_logs():
+        yield CHAT_LOGS[0]
+        raise RuntimeError('Slack went away')
+
+    exporter = ChatLogExporter(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        exporter.export(broken_logs(), 'C1')
+    assert os.listdir(tmp_path) == []
+    assert exporter.stats()['exports'] == 0
+
+
+def test_prune_removes_only_old_export_files(tmp_path):
+    names = {
+        'old': 'C1-20240101-120000-a1b2c3.jsonl.gz',
+        'old_part': 'C1-20240101-120000-d4e5f6.csv.part',
+        'new': 'C1-20240108-120000-0a0b0c.csv',
+        'unrelated': 'notes.txt',
+        'unrelated_like': 'backup-20240101-120000.jsonl',
+    }
+    now = 1_800_000_000
+    for key, name in names.items():
+        path = tmp_path / name
+        path.write_text('x')
+        mtime = now - 60 if key == 'new' else now - 30 * 86400
+        os.utime(path, (mtime, mtime))
+
+    exporter = ChatLogExporter(str(tmp_path), retention=7 * 86400)
+    assert exporter.prune(now=now) == 2
+    assert sorted(os.listdir(tmp_path)) == sorted([names['new'], names['unrelated'], names['unrelated_like']])
+    assert exporter.stats()['pruned'] == 2
+
+
+def test_prune_disabled_or_missing_directory(tmp_path):
+    path = tmp_path / 'C1-20240101-120000-a1b2c3.jsonl'
+    path.write_text('x')
+    os.utime(path, (0, 0))
+
+    assert ChatLogExporter(str(tmp_path), retention=0).prune() == 0
+    assert path.exists()
+    assert ChatLogExporter(str(tmp_path / 'missing')).prune() == 0
+
+
+@pytest.mark.parametrize('name, matches', [
+    ('C0123-20240101-120000-a1b2c3.jsonl', True),
+    ('my-channel-20240101-120000-a1b2c3.csv.gz', True),
+    ('C1-20240101-120000-a1b2c3.jsonl.zst.part', True),
+    ('C1-20240101-120000-a1b2c3.txt', False),
+    ('C1-20240101-120000-A1B2C3.jsonl', False),
+    ('C1-2024011-120000-a1b2c3.jsonl', False),
+    ('C1-20240101-120000-a1b2c3.jsonl.bz2', False),
+    ('-20240101-120000-a1b2c3.jsonl', False),
+])
+def test_export_name_pattern(name, matches):
+    assert bool(export_name_pattern().match(name)) is matches
+
+
+def test_compression_available_and_format_size():
+    assert compression_available('gzip') and compression_available('none')
+    assert not compression_available('bz2')
+    assert format_size(512) == '512 B'
+    assert format_size(1536) == '1.5 KB'
+    assert format_size(5 * 1024 ** 4) == '5120.0 GB'
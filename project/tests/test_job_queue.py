@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+import job_queue
+from command_args import parse_command_args
+from job_queue import JobQueue
+from shared_state import MemoryState
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(max_workers=2, max_pending=2)
+    yield queue
+    queue.shutdown()
+
+
+# release될 때까지 끝나지 않는 작업
+def blocking_job(release, result='done'):
+    release.wait(5)
+    return result
+
+
+def test_same_key_coalesces_while_running(queue):
+    release = threading.Event()
+    first, coalesced = queue.submit(('botchatlog', 'C1'), blocking_job, release, 'first')
+    assert not coalesced
+    second, coalesced = queue.submit(('botchatlog', 'C1'), blocking_job, release, 'second')
+    assert coalesced and second is first
+
+    release.set()
+    assert second.result(5) == 'first'
+    stats = queue.stats()
+    assert (stats['submitted'], stats['coalesced'], stats['completed']) == (1, 1, 1)
+
+    # 끝난 작업의 key는 다시 실행됨
+    third, coalesced = queue.submit(('botchatlog', 'C1'), blocking_job, release, 'third')
+    assert not coalesced and third.result(5) == 'third'
+
+
+def test_different_keys_do_not_coalesce(queue):
+    release = threading.Event()
+    first, _ = queue.submit(('botchatlog', 'C1'), blocking_job, release, 'C1')
+    second, coalesced = queue.submit(('botchatlog', 'C2'), blocking_job, release, 'C2')
+    assert not coalesced and second is not first
+
+    release.set()
+    assert (first.result(5), second.result(5)) == ('C1', 'C2')
+
+
+def test_full_queue_rejects(queue):
+    release = threading.Event()
+    # 워커 2개가 작업을 잡은 뒤에 대기열(2개)을 채움 (대기 수는 워커가 작업을 꺼낼 때 줄어듦)
+    futures = [queue.submit(('job', i), blocking_job, release)[0] for i in range(2)]
+    for _ in range(500):
+        if queue.stats()['running'] == 2:
+            break
+        time.sleep(0.01)
+    futures += [queue.submit(('job', i), blocking_job, release)[0] for i in range(2, 4)]
+    assert None not in futures and queue.stats()['queue_depth'] == 2
+
+    assert queue.submit(('job', 4), blocking_job, release) == (None, False)
+    assert queue.stats()['rejected'] == 1
+    release.set()
+    assert [future.result(5) for future in futures] == ['done'] * 4
+
+
+def test_failed_job_is_counted_and_key_released(queue):
+    def broken():
+        raise RuntimeError('boom')
+
+    future, _ = queue.submit(('broken',), broken)
+    with pytest.raises(RuntimeError):
+        future.result(5)
+    assert queue.stats()['failed'] == 1
+    again, coalesced = queue.submit(('broken',), broken)
+    assert not coalesced
+    with pytest.raises(RuntimeError):
+        again.result(5)
+
+
+def test_shared_claim_coalesces_across_processes(monkeypatch):
+    owner = ['host:1']
+    monkeypatch.setattr(job_queue, 'process_owner', lambda: owner[0])
+    shared = MemoryState()
+    local, remote = JobQueue(max_workers=1, shared=shared), JobQueue(max_workers=1, shared=shared)
+    release = threading.Event()
+    key = ('speechreport', 'C1', None, None, None)
+
+    try:
+        first, coalesced = local.submit(key, blocking_job, release)
+        assert not coalesced
+
+        # 다른 워커 프로세스에서 같은 작업을 요청하면 실행하지 않고 바로 끝난 future를 받음
+        owner[0] = 'host:2'
+        second, coalesced = remote.submit(key, blocking_job, release)
+        assert coalesced and second.done() and second.result() is None
+        assert remote.stats()['coalesced_remote'] == 1
+        assert remote.stats()['submitted'] == 0
+
+        # 작업이 끝나면 claim이 풀려서 다른 프로세스도 실행할 수 있음
+        owner[0] = 'host:1'
+        release.set()
+        assert first.result(5) == 'done'
+        assert shared.stats()['claims'] == 0
+        owner[0] = 'host:2'
+        third, coalesced = remote.submit(key, blocking_job, release)
+        assert not coalesced and third.result(5) == 'done'
+    finally:
+        release.set()
+        local.shutdown()
+        remote.shutdown()
+
+
+def test_claim_key_is_stable_for_nested_keys():
+    assert JobQueue._claim_key(('channelreport', 'C1', ('C2', 'C3'), None)) == \
+        JobQueue._claim_key(('channelreport', 'C1', ('C2', 'C3'), None))
+    assert JobQueue._claim_key(('a', None)) != JobQueue._claim_key(('a', 'None'))
+
+
+def test_relative_range_keys_coalesce_across_requests(queue):
+    # 같은 '/speechreport since=7d'를 몇 초 간격으로 보내도 같은 작업으로 합쳐져야 함
+    earlier = parse_command_args('since=7d', now=1717243200)
+    later = parse_command_args('since=7d', now=1717243203)
+    release = threading.Event()
+
+    first, _ = queue.submit(('speechreport', 'C1', earlier['since'], earlier['until'], None), blocking_job, release)
+    second, coalesced = queue.submit(('speechreport', 'C1', later['since'], later['until'], None), blocking_job, release)
+    assert coalesced and second is first
+
+    # 날짜로 준 범위는 그 날짜의 ts로 바뀌어 key가 됨
+    dated = parse_command_args('since=2024-05-01')
+    other, coalesced = queue.submit(('speechreport', 'C1', dated['since'], dated['until'], None), blocking_job, release)
+    assert not coalesced
+    release.set()
+    other.result(5)
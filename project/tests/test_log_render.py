@@ -0,0 +1,44 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from log_render import LogRenderer, parse_ts_seconds, renderer_for
+
+
+def expected(seconds, tz_name):
+    return datetime.fromtimestamp(seconds, ZoneInfo(tz_name)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+# 서머타임 시작/끝 전후 몇 시간을 분 단위로 (오프셋이 정시가 아닌 시각에 바뀌는 Lord_Howe 포함)
+@pytest.mark.parametrize('tz_name, transition', [
+    ('America/New_York', 1710054000),  # 2024-03-10 07:00 UTC, 서머타임 시작
+    ('America/New_York', 1730613600),  # 2024-11-03 06:00 UTC, 서머타임 끝
+    ('Europe/Berlin', 1711846800),  # 2024-03-31 01:00 UTC
+    ('Australia/Lord_Howe', 1712415600),  # 2024-04-06 15:00 UTC (+11 -> +10:30)
+    ('Australia/Lord_Howe', 1728142200),  # 2024-10-05 15:30 UTC (+10:30 -> +11, 정시가 아닌 시각)
+    ('Asia/Kolkata', 1700000000),
+])
+def test_format_ts_matches_zoneinfo_around_transitions(tz_name, transition):
+    renderer = LogRenderer(tz_name)
+    for seconds in range(transition - 3 * 3600, transition + 3 * 3600, 59):
+        assert renderer.format_ts(f"{seconds}.000100") == expected(seconds, tz_name), seconds
+
+
+def test_render_lines_matches_render_line():
+    renderer = LogRenderer('America/New_York')
+    logs = [
+        {"user_id": 'U1', "username": 'alice', "timestamp": f"{1710054000 + offset}.000001", "text": f"msg {offset}"}
+        for offset in range(-7200, 7200, 600)
+    ]
+    logs.append({"user_id": None, "username": None, "timestamp": 1710054000.5, "text": 'no user'})
+    assert list(renderer.render_lines(logs)) == [renderer.render_line(log) for log in logs]
+    assert renderer.render_line(logs[0]) == "ID: U1, Username: alice, Time: 2024-03-10 00:00:00, Message: msg -7200"
+    assert renderer.render_line(logs[12]) == "ID: U1, Username: alice, Time: 2024-03-10 03:00:00, Message: msg 0"
+
+
+def test_parse_ts_seconds_and_shared_renderers():
+    assert parse_ts_seconds('1700000000.999999') == 1700000000
+    assert parse_ts_seconds(1700000000.9) == 1700000000
+    assert renderer_for('Asia/Seoul') is renderer_for('Asia/Seoul')
+    assert renderer_for('Asia/Seoul').format_ts('1700000000.000000') == '2023-11-15 07:13:20'
@@ -0,0 +1,193 @@
+import pytest
+
+from message_store import HISTORY_PAGE_LIMIT, MessageStore, split_search_terms
+
+
+# conversations.history만 흉내내는 클라이언트 (최신순, oldest < ts <= latest, cursor는 위치)
+class FakeHistoryClient:
+    def __init__(self, messages, page_size=2):
+        self.messages = sorted(messages, key=lambda message: message['ts'], reverse=True)
+        self.page_size = page_size
+        self.calls = []
+
+    def conversations_history(self, channel, oldest=None, latest=None, limit=None, cursor=None):
+        self.calls.append({'channel': channel, 'oldest': oldest, 'latest': latest, 'limit': limit, 'cursor': cursor})
+        matched = [
+            message for message in self.messages
+            if (oldest is None or message['ts'] > oldest) and (latest is None or message['ts'] <= latest)
+        ]
+        start = int(cursor or 0)
+        page = matched[start:start + self.page_size]
+        more = start + self.page_size < len(matched)
+        return {
+            "messages": page,
+            "has_more": more,
+            "response_metadata": {"next_cursor": str(start + self.page_size) if more else ""},
+        }
+
+
+def message(ts, user='U1', text='hello'):
+    return {"ts": ts, "user": user, "text": text}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MessageStore(str(tmp_path / 'thegull.db'))
+
+
+def test_sync_channel_fetches_all_pages_and_sets_high_water(store):
+    client = FakeHistoryClient([message(f"1700000000.00000{i}") for i in range(5)])
+
+    assert store.sync_channel(client, 'C1') == 5
+    assert store.high_water('C1') == '1700000000.000004'
+    assert len(client.calls) == 3
+    assert all(call['limit'] == HISTORY_PAGE_LIMIT for call in client.calls)
+    assert [m['timestamp'] for m in store.iter_messages('C1')] == [f"1700000000.00000{i}" for i in range(4, -1, -1)]
+
+
+def test_sync_channel_only_fetches_after_high_water(store):
+    client = FakeHistoryClient([message('1700000000.000001'), message('1700000000.000002')])
+    store.sync_channel(client, 'C1')
+
+    client.messages.insert(0, message('1700000000.000003'))
+    client.calls.clear()
+    assert store.sync_channel(client, 'C1') == 1
+    assert client.calls[0]['oldest'] == '1700000000.000002'
+    assert store.high_water('C1') == '1700000000.000003'
+
+    # 새 메시지가 없으면 저장하지 않음 (이미 있는 ts는 무시)
+    assert store.sync_channel(client, 'C1') == 0
+
+
+def test_sync_range_on_new_channel_fetches_only_the_range(store):
+    client = FakeHistoryClient([message(f"170000000{i}.000000") for i in range(6)])
+
+    assert store.sync_range(client, 'C1', oldest='1700000001.000000', latest='1700000003.000000') == 2
+    assert store.high_water('C1') is None  # 그 이전 기록이 없으므로 high-water mark는 두지 않음
+    assert client.calls[0]['oldest'] == '1700000001.000000'
+    assert client.calls[0]['latest'] == '1700000003.000000'
+
+
+def test_sync_range_before_high_water_does_not_call_api(store):
+    client = FakeHistoryClient([message(f"170000000{i}.000000") for i in range(3)])
+    store.sync_channel(client, 'C1')
+    client.calls.clear()
+
+    assert store.sync_range(client, 'C1', latest='1700000001.000000') == 0
+    assert client.calls == []
+
+
+def test_iter_messages_range_and_paging(store):
+    store.add_messages('C1', [message(f"170000000{i}.000000") for i in range(6)])
+
+    in_range = [m['timestamp'] for m in store.iter_messages('C1', oldest='1700000001.000000', latest='1700000004.000000')]
+    assert in_range == ['1700000004.000000', '1700000003.000000', '1700000002.000000']
+
+    page = [m['timestamp'] for m in store.iter_messages('C1', before='1700000004.000000', limit=2)]
+    assert page == ['1700000003.000000', '1700000002.000000']
+
+
+def test_speech_counts_follow_add_edit_and_delete(store):
+    store.add_messages('C1', [message('1.000001', 'U1'), message('1.000002', 'U1'), message('1.000003', 'U2')])
+    store.add_messages('C1', [{"ts": '1.000004', "text": 'bot message'}])  # user 없음
+    assert store.speech_counts('C1') == {'U1': 2, 'U2': 1}
+
+    store.apply_message_event('C1', {'subtype': 'message_deleted', 'deleted_ts': '1.000001'})
+    store.apply_message_event('C1', {'subtype': 'message_changed', 'message': {'ts': '1.000002', 'text': 'edited'}})
+    assert store.speech_counts('C1') == {'U1': 1, 'U2': 1}
+    assert [m['text'] for m in store.iter_messages('C1') if m['timestamp'] == '1.000002'] == ['edited']
+
+
+def test_load_batch_skips_bot_and_userless_messages(store):
+    store.add_messages('C1', [message('1.000001', 'U1'), message('1.000002', 'UBOT'), {"ts": '1.000003', "text": 'x'}])
+    batch = store.load_batch('C1', exclude_user_id='UBOT')
+    assert batch.user_ids == ['U1']
+    assert len(batch) == 1
+
+
+@pytest.fixture(params=['fts', 'scan'])
+def search_store(request, store):
+    store.add_messages('C1', [
+        message('1700000001.000000', 'U1', '오늘 배포 일정 공유합니다'),
+        message('1700000002.000000', 'U2', '배포 끝났어요, 모니터링 중'),
+        message('1700000003.000000', 'U1', 'deploy checklist 100% done'),
+        message('1700000004.000000', 'U2', 'snake_case vs camelCase'),
+    ])
+    store.add_messages('C2', [message('1700000005.000000', 'U3', '다른 채널 배포 소식')])
+    if request.param == 'scan':
+        # FTS5 trigram이 없는 SQLite 빌드처럼 전부 LIKE로 찾는 경로
+        store._conn()
+        store.search_enabled = False
+    return store
+
+
+def found(results):
+    return [(result['channel_id'], result['ts']) for result in results]
+
+
+def test_split_search_terms_keeps_quoted_phrases():
+    assert split_search_terms('배포 "deploy checklist"  done') == ['배포', 'deploy checklist', 'done']
+    assert split_search_terms('"unterminated phrase') == ['unterminated phrase']
+    assert split_search_terms('  ') == []
+
+
+def test_search_long_terms(search_store):
+    assert found(search_store.search(['checklist'])) == [('C1', '1700000003.000000')]
+    assert found(search_store.search(['deploy checklist'])) == [('C1', '1700000003.000000')]
+    assert search_store.search(['checklist'])[0]['text'] == 'deploy checklist 100% done'
+
+
+def test_search_short_terms_use_like_fallback(search_store):
+    # 2글자 한국어 단어는 trigram으로 찾을 수 없음
+    assert found(search_store.search(['배포'])) == [
+        ('C2', '1700000005.000000'), ('C1', '1700000002.000000'), ('C1', '1700000001.000000'),
+    ]
+
+
+def test_search_mixed_long_and_short_terms(search_store):
+    assert found(search_store.search(['배포', '모니터링'])) == [('C1', '1700000002.000000')]
+    assert found(search_store.search(['일정', '모니터링'])) == []
+
+
+def test_search_filters(search_store):
+    assert found(search_store.search(['배포'], channel_ids=['C1'])) == [
+        ('C1', '1700000002.000000'), ('C1', '1700000001.000000'),
+    ]
+    assert found(search_store.search(['배포'], user_id='U1')) == [('C1', '1700000001.000000')]
+    assert found(search_store.search(['배포'], oldest='1700000001.000000', latest='1700000002.000000')) == [
+        ('C1', '1700000002.000000'),
+    ]
+    assert len(search_store.search(['배포'], limit=1)) == 1
+
+
+def test_search_escapes_like_wildcards(search_store):
+    assert found(search_store.search(['0%'])) == [('C1', '1700000003.000000')]
+    assert found(search_store.search(['%'])) == [('C1', '1700000003.000000')]
+    assert found(search_store.search(['e_'])) == [('C1', '1700000004.000000')]
+    assert found(search_store.search(['"'])) == []
+
+
+def test_search_follows_edits_and_deletes(search_store):
+    search_store.apply_message_event('C1', {
+        'subtype': 'message_changed', 'message': {'ts': '1700000003.000000', 'text': 'rollback checklist'},
+    })
+    assert found(search_store.search(['rollback'])) == [('C1', '1700000003.000000')]
+    assert found(search_store.search(['deploy'])) == []
+
+    search_store.apply_message_event('C1', {'subtype': 'message_deleted', 'deleted_ts': '1700000003.000000'})
+    assert found(search_store.search(['checklist'])) == []
+
+
+def test_message_events_without_content_are_not_stored(store):
+    store.apply_message_event('C1', message('1.000001', 'U1'))
+    store.apply_message_event('C1', {'subtype': 'me_message', 'ts': '1.000002', 'user': 'U1', 'text': 'waves'})
+    # 스레드에 답글이 달렸다는 알림 (최상위에 user/text가 없음)
+    store.apply_message_event('C1', {
+        'type': 'message', 'subtype': 'message_replied', 'hidden': True, 'ts': '1.000003',
+        'message': {'ts': '1.000001', 'user': 'U1', 'text': 'hello', 'thread_ts': '1.000001', 'reply_count': 1},
+    })
+    store.apply_message_event('C1', {'subtype': 'channel_join', 'ts': '1.000004', 'user': 'U2', 'text': '<@U2> has joined'})
+    store.apply_message_event('C1', {'ts': '1.000005', 'user': 'U2', 'text': 'reply', 'thread_ts': '1.000001'})
+
+    assert [m['timestamp'] for m in store.iter_messages('C1')] == ['1.000002', '1.000001']
+    assert store.speech_counts('C1') == {'U1': 2}
@@ -0,0 +1,83 @@
+import os
+
+from outbound import (
+    MAX_BLOCKS, SECTION_TEXT_LIMIT, OutboundSender, buffer_until, pack_blocks, pack_messages, split_long_line,
+    to_blocks,
+)
+
+
+# chat_postMessage/files_upload_v2 호출을 기록하는 클라이언트 (올린 파일 내용도 보관)
+class RecordingClient:
+    def __init__(self):
+        self.posts = []
+        self.uploads = []
+
+    def chat_postMessage(self, **kwargs):
+        self.posts.append(kwargs)
+
+    def files_upload_v2(self, **kwargs):
+        with open(kwargs['file'], encoding='utf-8') as f:
+            self.uploads.append(dict(kwargs, content=f.read()))
+
+
+def test_split_long_line():
+    assert list(split_long_line('abc', 3)) == ['abc']
+    assert list(split_long_line('abcdefg', 3)) == ['abc', 'def', 'g']
+
+
+def test_pack_blocks_fills_blocks_without_splitting_lines():
+    lines = ['a' * 4, 'b' * 4, 'c' * 4]
+    # 줄바꿈 포함 9자까지: 'aaaa\nbbbb'
+    assert list(pack_blocks(lines, block_limit=9)) == ['aaaa\nbbbb', 'cccc']
+    assert list(pack_blocks(lines, block_limit=8)) == ['aaaa', 'bbbb', 'cccc']
+    assert list(pack_blocks(['x' * 7, 'y'], block_limit=3)) == ['xxx', 'xxx', 'x\ny']
+    assert list(pack_blocks([])) == []
+
+
+def test_pack_messages_respects_character_limit():
+    lines = ['x' * 100] * 10
+    messages = list(pack_messages(lines, message_limit=250, block_limit=250))
+    # 블록 하나에 두 줄(201자)씩 들어가고, 메시지 하나에 블록 하나만 들어감
+    assert [[len(block) for block in message] for message in messages] == [[201]] * 5
+    assert all(sum(len(block) for block in message) <= 250 for message in messages)
+    assert "\n".join(block for message in messages for block in message) == "\n".join(lines)
+
+
+def test_pack_messages_respects_block_limits():
+    lines = ['x' * SECTION_TEXT_LIMIT] * (MAX_BLOCKS + 5)
+    messages = list(pack_messages(lines, message_limit=10 ** 9))
+    assert [len(message) for message in messages] == [MAX_BLOCKS, 5]
+    assert all(len(block) <= SECTION_TEXT_LIMIT for message in messages for block in message)
+
+    # message_limit이 블록 크기보다 작으면 블록도 그 크기로 자름
+    assert list(pack_messages(['y' * 25], message_limit=10)) == [['y' * 10], ['y' * 10], ['y' * 5]]
+
+
+def test_buffer_until():
+    buffered, rest = buffer_until(iter(['aa', 'bb', 'cc']), threshold=10)
+    assert buffered == ['aa', 'bb', 'cc'] and rest is None
+
+    buffered, rest = buffer_until(iter(['aa', 'bb', 'cc', 'dd']), threshold=5)
+    assert buffered == ['aa', 'bb'] and list(rest) == ['cc', 'dd']
+
+
+def test_sender_posts_messages_below_threshold():
+    client = RecordingClient()
+    sender = OutboundSender(client, message_limit=10, upload_threshold=100)
+    assert sender.send_lines('C1', ['line one', 'line two'], header='Log') == ('messages', 2)
+    assert client.posts[0] == {'channel': 'C1', 'text': 'Log', 'blocks': to_blocks(['line one'])}
+    assert client.uploads == []
+
+
+def test_sender_uploads_file_above_threshold():
+    client = RecordingClient()
+    sender = OutboundSender(client, upload_threshold=10)
+    lines = (f"line {i}" for i in range(5))
+    assert sender.send_lines('C1', lines, header='Log') == ('file', 1)
+
+    upload = client.uploads[0]
+    assert upload['content'] == "".join(f"line {i}\n" for i in range(5))
+    assert upload['initial_comment'] == 'Log'
+    assert not os.path.exists(upload['file'])  # 올린 뒤 임시 파일은 지움
+    assert client.posts == []
+    assert sender.stats() == {"messages_posted": 0, "files_uploaded": 1}
@@ -0,0 +1,57 @@
+import pytest
+
+from message_store import MessageStore
+from report_scheduler import ReportScheduler, format_age, parse_offpeak_hours
+
+HOUR = 3600
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MessageStore(str(tmp_path / 'thegull.db'))
+
+
+def scheduler_for(store, **kwargs):
+    return ReportScheduler(lambda channel_id: None, lambda: ['C1'], store.snapshot_time, interval=HOUR, **kwargs)
+
+
+def test_snapshots_are_replaced_together(store):
+    store.save_snapshots('C1', {'speechquantity': 'old', '7d': 'old'}, 1000.0)
+    store.save_snapshots('C1', {'speechquantity': 'new', '7d': 'new'}, 2000.0)
+    assert store.snapshot('C1', '7d') == ('new', 2000.0)
+    assert store.snapshot_time('C1') == 2000.0
+    assert store.snapshot_time('C2') is None
+
+
+def test_removed_window_does_not_keep_channel_due(store):
+    now = 1_700_000_000.0
+    scheduler = scheduler_for(store)
+    store.save_snapshots('C1', {'speechquantity': 'a', '7d': 'b', '30d': 'c'}, now - 2 * HOUR)
+    assert scheduler.is_due('C1', now=now)
+
+    # REPORT_WINDOWS에서 30d를 뺀 뒤 한 번 다시 만들면 더 이상 바로 다시 만들지 않음
+    store.save_snapshots('C1', {'speechquantity': 'a', '7d': 'b'}, now)
+    assert store.snapshot('C1', '30d') is None
+    assert not scheduler.is_due('C1', now=now + 60)
+    assert scheduler.is_due('C1', now=now + HOUR)
+
+
+def test_is_due_defers_until_offpeak(store):
+    # 2023-11-14 22:13:20 UTC - 한가한 시간대(0-6시) 밖
+    now = 1_700_000_000.0
+    store.save_snapshots('C1', {'speechquantity': 'a'}, now - 2 * HOUR)
+    scheduler = scheduler_for(store, offpeak_hours=(0, 6), max_delay=3 * HOUR)
+    assert not scheduler.is_due('C1', now=now)
+    assert scheduler.deferred == 1
+    assert scheduler.is_due('C1', now=now + 2 * HOUR)  # 00:13 UTC
+    store.save_snapshots('C1', {'speechquantity': 'a'}, now - 5 * HOUR)
+    assert scheduler.is_due('C1', now=now)  # max_delay를 넘김
+
+
+def test_offpeak_hours_and_age_format():
+    assert parse_offpeak_hours('') is None
+    assert parse_offpeak_hours('22-7') == (22, 7)
+    assert parse_offpeak_hours('24-6') == (0, 6)
+    assert format_age(59) == '0m'
+    assert format_age(2 * HOUR + 5 * 60) == '2h 5m'
+    assert format_age(3 * 86400 + 4 * HOUR) == '3d 4h'
@@ -0,0 +1,108 @@
+import types
+
+import pytest
+
+import shared_state
+from shared_state import MemoryState, SQLiteState, open_shared_state
+
+
+# time.time() 대신 쓰는 시계 (만료/토큰 충전을 기다리지 않고 확인)
+@pytest.fixture
+def clock(monkeypatch):
+    fake = types.SimpleNamespace(now=1_700_000_000.0)
+    fake.time = lambda: fake.now
+    monkeypatch.setattr(shared_state, 'time', fake)
+    return fake
+
+
+# 두 백엔드가 같은 동작을 하는지 같은 테스트로 확인
+@pytest.fixture(params=['memory', 'sqlite'])
+def state(request, tmp_path, clock):
+    if request.param == 'memory':
+        return MemoryState()
+    return SQLiteState(str(tmp_path / 'thegull-state.db'))
+
+
+def test_values_round_trip_and_expire(state, clock):
+    state.set_many('users', {'U1': {'name': 'alice'}, 'U2': ['x', 1]}, ttl=60)
+    assert state.get_many('users', ['U1', 'U2', 'U3']) == {'U1': {'name': 'alice'}, 'U2': ['x', 1]}
+    assert state.get_many('other', ['U1']) == {}
+
+    clock.now += 61
+    assert state.get_many('users', ['U1', 'U2']) == {}
+
+
+def test_get_many_with_many_keys(state):
+    values = {f"U{i}": i for i in range(1200)}
+    state.set_many('users', values, ttl=60)
+    assert state.get_many('users', list(values)) == values
+
+
+def test_claim_and_release(state, clock):
+    assert state.claim('job:x', 'host:1', ttl=30)
+    assert state.claim('job:x', 'host:1', ttl=30)  # 같은 소유자는 다시 잡을 수 있음
+    assert not state.claim('job:x', 'host:2', ttl=30)
+
+    state.release('job:x', 'host:2')  # 소유자가 아니면 풀리지 않음
+    assert not state.claim('job:x', 'host:2', ttl=30)
+
+    state.release('job:x', 'host:1')
+    assert state.claim('job:x', 'host:2', ttl=30)
+
+
+def test_claim_expires(state, clock):
+    assert state.claim('job:x', 'host:1', ttl=30)
+    clock.now += 31
+    assert state.claim('job:x', 'host:2', ttl=30)
+
+
+def test_take_token_and_refill(state, clock):
+    # 초당 1개, 최대 2개
+    assert state.take_token('chat.postMessage', rate=1.0, capacity=2, needed=1) == 0
+    assert state.take_token('chat.postMessage', rate=1.0, capacity=2, needed=1) == 0
+    assert state.take_token('chat.postMessage', rate=1.0, capacity=2, needed=1) == pytest.approx(1.0)
+
+    clock.now += 1
+    assert state.take_token('chat.postMessage', rate=1.0, capacity=2, needed=1) == 0
+    # 다른 key는 따로 셈
+    assert state.take_token('users.list', rate=1.0, capacity=2, needed=1) == 0
+
+
+def test_block_bucket(state, clock):
+    state.block_bucket('users.list', 10)
+    assert state.take_token('users.list', rate=1.0, capacity=5, needed=1) == pytest.approx(10)
+
+    state.block_bucket('users.list', 3)  # 더 짧은 정지는 기존 정지를 줄이지 않음
+    assert state.take_token('users.list', rate=1.0, capacity=5, needed=1) == pytest.approx(10)
+
+    clock.now += 10
+    assert state.take_token('users.list', rate=1.0, capacity=5, needed=1) == pytest.approx(1.0)  # 정지 후 빈 버킷에서 시작
+    clock.now += 1
+    assert state.take_token('users.list', rate=1.0, capacity=5, needed=1) == 0
+
+
+def test_sqlite_state_is_shared_between_instances(tmp_path, clock):
+    path = str(tmp_path / 'thegull-state.db')
+    first, second = SQLiteState(path), SQLiteState(path)
+
+    first.set_many('users', {'U1': 'alice'}, ttl=60)
+    assert second.get_many('users', ['U1']) == {'U1': 'alice'}
+    assert first.claim('job:x', 'host:1', ttl=30)
+    assert not second.claim('job:x', 'host:2', ttl=30)
+    assert second.stats()['claims'] == 1
+
+
+def test_open_shared_state(tmp_path, monkeypatch):
+    assert open_shared_state('') is None
+    assert open_shared_state(None) is None
+    assert isinstance(open_shared_state('memory'), MemoryState)
+
+    state = open_shared_state(f"sqlite:///{tmp_path / 'state.db'}")
+    assert isinstance(state, SQLiteState)
+    assert state.path == str(tmp_path / 'state.db')
+
+    monkeypatch.chdir(tmp_path)
+    assert open_shared_state('sqlite').path == shared_state.default_state_path()
+
+    with pytest.raises(ValueError):
+        open_shared_state('redis://localhost')
@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import types
+
+import pytest
+from slack_sdk.errors import SlackApiError
+
+import slack_scheduler
+from shared_state import MemoryState
+from slack_scheduler import BACKGROUND, INTERACTIVE, SharedTokenBucket, SlackScheduler, TokenBucket
+
+
+# time.monotonic/perf_counter/sleep 대신 쓰는 시계 (sleep하면 시간만 흐름)
+@pytest.fixture
+def clock(monkeypatch):
+    fake = types.SimpleNamespace(now=1000.0, slept=[])
+    fake.monotonic = fake.perf_counter = lambda: fake.now
+
+    def sleep(seconds):
+        fake.slept.append(seconds)
+        fake.now += seconds
+    fake.sleep = sleep
+    monkeypatch.setattr(slack_scheduler, 'time', fake)
+    monkeypatch.setattr(slack_scheduler.random, 'uniform', lambda low, high: 0.0)
+    return fake
+
+
+class FakeResponse(dict):
+    def __init__(self, status_code, error, headers=None):
+        super().__init__(ok=False, error=error)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def rate_limited(retry_after=None):
+    headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+    return SlackApiError('ratelimited', FakeResponse(429, 'ratelimited', headers))
+
+
+# 처음 failures개 호출은 에러를 내고 그 다음부터 성공하는 API 메서드
+def flaky(*failures):
+    failures = list(failures)
+    calls = []
+
+    def method(**kwargs):
+        calls.append(kwargs)
+        if failures:
+            raise failures.pop(0)
+        return {'ok': True}
+    method.calls = calls
+    return method
+
+
+def test_bucket_refills_over_time(clock):
+    bucket = TokenBucket(60)  # 초당 1개, 최대 6개
+    assert [bucket.try_acquire(INTERACTIVE) for _ in range(6)] == [0.0] * 6
+    assert bucket.try_acquire(INTERACTIVE) == pytest.approx(1.0)
+
+    clock.now += 2.5
+    assert bucket.try_acquire(INTERACTIVE) == 0.0
+    assert bucket.try_acquire(INTERACTIVE) == 0.0
+    assert bucket.try_acquire(INTERACTIVE) == pytest.approx(0.5)
+
+
+def test_background_calls_leave_reserve_for_interactive(clock):
+    bucket = TokenBucket(60)
+    assert bucket.reserve == 1
+    assert [bucket.try_acquire(BACKGROUND) for _ in range(5)] == [0.0] * 5
+    assert bucket.try_acquire(BACKGROUND) == pytest.approx(1.0)  # 마지막 토큰은 남겨 둠
+    assert bucket.try_acquire(INTERACTIVE) == 0.0
+
+
+def test_block_stops_bucket_until_retry_after(clock):
+    bucket = TokenBucket(60)
+    bucket.block(5)
+    assert bucket.try_acquire(INTERACTIVE) == pytest.approx(5.0)
+    bucket.block(2)  # 더 짧은 정지가 기존 정지를 줄이지 않음
+    assert bucket.try_acquire(INTERACTIVE) == pytest.approx(5.0)
+
+    clock.now += 5
+    assert bucket.try_acquire(INTERACTIVE) == pytest.approx(1.0)  # 정지가 끝나면 빈 버킷에서 다시 채움
+
+
+def test_call_waits_for_rate_limit(clock):
+    scheduler = SlackScheduler(limits={'users.info': 60})
+    method = flaky()
+    for _ in range(7):
+        scheduler.call('users.info', method, user='U1')
+    assert clock.slept == [pytest.approx(1.0)]
+    assert scheduler.stats()['users.info'] == {"calls": 7, "rate_limited": 0, "wait_time": 1.0}
+
+
+def test_call_backs_off_for_retry_after(clock):
+    scheduler = SlackScheduler(limits={'users.info': 60})
+    method = flaky(rate_limited(retry_after=7))
+
+    assert scheduler.call('users.info', method, user='U1') == {'ok': True}
+    assert len(method.calls) == 2
+    # Retry-After만큼 멈춘 뒤 빈 버킷에 토큰 하나가 찰 때까지 기다림
+    assert clock.slept == [pytest.approx(7.0), pytest.approx(1.0)]
+    assert scheduler.stats()['users.info']['rate_limited'] == 1
+
+
+def test_call_without_retry_after_waits_one_second(clock):
+    scheduler = SlackScheduler(limits={'users.info': 60})
+    scheduler.call('users.info', flaky(rate_limited()), user='U1')
+    assert clock.slept == [pytest.approx(1.0), pytest.approx(1.0)]
+
+
+def test_call_gives_up_after_max_retries(clock):
+    scheduler = SlackScheduler(limits={'users.info': 60}, max_retries=2)
+    method = flaky(*(rate_limited(retry_after=1) for _ in range(3)))
+    with pytest.raises(SlackApiError):
+        scheduler.call('users.info', method, user='U1')
+    assert len(method.calls) == 3
+
+
+def test_other_errors_are_not_retried_and_auth_errors_notify(clock):
+    scheduler = SlackScheduler()
+    invalidated = []
+    scheduler.on_auth_error(lambda: invalidated.append(True))
+
+    method = flaky(SlackApiError('bad', FakeResponse(200, 'channel_not_found')))
+    with pytest.raises(SlackApiError):
+        scheduler.call('conversations.history', method, channel='C1')
+    assert len(method.calls) == 1 and invalidated == []
+
+    with pytest.raises(SlackApiError):
+        scheduler.call('auth.test', flaky(SlackApiError('bad', FakeResponse(200, 'token_revoked'))))
+    assert invalidated == [True]
+
+
+def test_post_message_bucket_is_per_channel(clock):
+    scheduler = SlackScheduler()
+    method = flaky()
+    scheduler.call('chat.postMessage', method, channel='C1')
+    scheduler.call('chat.postMessage', method, channel='C2')
+    assert clock.slept == []
+    scheduler.call('chat.postMessage', method, channel='C1')
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+def test_priority_defaults_and_override():
+    scheduler = SlackScheduler()
+    assert scheduler._priority('conversations.history') == BACKGROUND
+    assert scheduler._priority('chat.postMessage') == INTERACTIVE
+    with scheduler.priority(INTERACTIVE):
+        assert scheduler._priority('conversations.history') == INTERACTIVE
+    assert scheduler._priority('conversations.history') == BACKGROUND
+
+
+def test_parse_limits():
+    assert SlackScheduler.parse_limits('conversations.history=50, users.info=100,bad') == {
+        'conversations.history': 50, 'users.info': 100,
+    }
+    assert SlackScheduler.parse_limits(None) == {}
+
+
+def test_acall_takes_shared_tokens_off_the_event_loop():
+    threads = []
+
+    class RecordingState(MemoryState):
+        def take_token(self, *args):
+            threads.append(threading.get_ident())
+            return super().take_token(*args)
+
+    scheduler = SlackScheduler(shared=RecordingState())
+    assert isinstance(scheduler._bucket('users.info', {}), SharedTokenBucket)
+
+    async def users_info(**kwargs):
+        return {'ok': True, 'loop_thread': threading.get_ident()}
+
+    result = asyncio.run(scheduler.acall('users.info', users_info, user='U1'))
+    assert result['ok'] and threads and result['loop_thread'] not in threads
@@ -0,0 +1,83 @@
+import hashlib
+import hmac
+import time
+import types
+
+import pytest
+
+import slack_security
+from slack_security import ExpiringSet, RequestVerifier
+
+SECRET = '8f742231b10e8888abcd99yyyzzz85a5'
+BODY = b'token=xyzz0WbapA4vBCDEFasx0q6G&team_id=T1DC2JH3J&command=%2Fbotchatlog&text='
+
+
+def sign(body, timestamp, secret=SECRET):
+    return "v0=" + hmac.new(secret.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256).hexdigest()
+
+
+@pytest.fixture
+def verifier():
+    return RequestVerifier(SECRET, max_age=300)
+
+
+def test_valid_signature_is_accepted(verifier):
+    timestamp = str(int(time.time()))
+    assert verifier.verify(BODY, timestamp, sign(BODY, timestamp)) == (True, None)
+    assert verifier.stats()['accepted'] == 1
+
+
+@pytest.mark.parametrize('timestamp, signature, reason', [
+    (None, 'v0=abc', "missing signature headers"),
+    ('1700000000', '', "missing signature headers"),
+    ('not-a-number', 'v0=abc', "invalid timestamp"),
+])
+def test_malformed_headers_are_rejected(verifier, timestamp, signature, reason):
+    assert verifier.verify(BODY, timestamp, signature) == (False, reason)
+    assert verifier.stats()['rejected'] == 1
+
+
+def test_stale_timestamp_is_rejected(verifier):
+    for timestamp in (str(int(time.time()) - 301), str(int(time.time()) + 301)):
+        assert verifier.verify(BODY, timestamp, sign(BODY, timestamp)) == (False, "stale timestamp")
+
+
+def test_bad_signature_is_rejected(verifier):
+    timestamp = str(int(time.time()))
+    assert verifier.verify(BODY, timestamp, sign(BODY, timestamp, secret='other')) == (False, "invalid signature")
+    assert verifier.verify(BODY + b'&x=1', timestamp, sign(BODY, timestamp)) == (False, "invalid signature")
+    # 서명은 다른 타임스탬프에 옮겨 쓸 수 없음
+    assert verifier.verify(BODY, str(int(timestamp) + 1), sign(BODY, timestamp)) == (False, "invalid signature")
+
+
+def test_replayed_request_is_rejected(verifier):
+    timestamp = str(int(time.time()))
+    signature = sign(BODY, timestamp)
+    assert verifier.verify(BODY, timestamp, signature) == (True, None)
+    assert verifier.verify(BODY, timestamp, signature) == (False, "replayed request")
+    assert verifier.stats() == {"accepted": 1, "rejected": 1, "replay_cache_size": 1}
+
+
+def test_expiring_set_forgets_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(slack_security, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    seen = ExpiringSet(ttl=10)
+
+    assert seen.add('a')
+    assert not seen.add('a')
+    now[0] += 5
+    assert seen.add('b')
+    now[0] += 6  # 'a'만 만료됨
+    assert seen.add('a')
+    assert not seen.add('b')
+    seen.discard('b')
+    assert seen.add('b')
+
+
+def test_expiring_set_is_size_limited():
+    seen = ExpiringSet(ttl=60, maxsize=2)
+    for key in ('a', 'b', 'c'):
+        assert seen.add(key)
+    assert len(seen) == 2
+    assert seen.add('a')  # 가장 오래된 항목부터 밀려남
+    assert not seen.add('c')
@@ -0,0 +1,115 @@
+import types
+
+import pytest
+
+import user_cache as user_cache_module
+from shared_state import MemoryState
+from user_cache import UserCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = types.SimpleNamespace(now=1000.0)
+    fake.monotonic = fake.time = lambda: fake.now
+    monkeypatch.setattr(user_cache_module, 'time', fake)
+    return fake
+
+
+def user(user_id, name=None, real_name=None):
+    return {'id': user_id, 'name': name or user_id.lower(), 'real_name': real_name, 'tz': 'Asia/Seoul'}
+
+
+# users.list(페이지 크기 2)와 users.info만 흉내내는 클라이언트
+class FakeUsersClient:
+    def __init__(self, directory, extra=()):
+        self.directory = list(directory)
+        self.extra = {member['id']: member for member in extra}  # users.list에는 없고 users.info로만 찾을 수 있는 사용자
+        self.calls = []
+
+    def users_list(self, limit=None, cursor=None):
+        self.calls.append('users.list')
+        start = int(cursor or 0)
+        more = start + 2 < len(self.directory)
+        return {'members': self.directory[start:start + 2],
+                'response_metadata': {'next_cursor': str(start + 2) if more else ''}}
+
+    def users_info(self, user):
+        self.calls.append('users.info')
+        return {'user': self.extra[user]}
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = UserCache(ttl=60)
+    cache.put('U1', user('U1'))
+    assert cache.peek(['U1'])[0]['U1']['name'] == 'u1'
+
+    clock.now += 61
+    assert cache.peek(['U1']) == ({}, ['U1'])
+    assert cache.stats()['size'] == 0
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = UserCache(maxsize=2)
+    cache.put('U1', user('U1'))
+    cache.put('U2', user('U2'))
+    cache.peek(['U1'])  # U1을 최근에 쓴 것으로
+    cache.put('U3', user('U3'))
+
+    profiles, missing = cache.peek(['U1', 'U2', 'U3'], count=False)
+    assert sorted(profiles) == ['U1', 'U3'] and missing == ['U2']
+    assert cache.stats()['evictions'] == 1
+
+
+def test_get_users_warms_directory_once_then_looks_up_missing(clock):
+    client = FakeUsersClient([user(f"U{i}") for i in range(5)], extra=[user('UX', 'guest')])
+    cache = UserCache()
+
+    assert cache.get_usernames(client, ['U0', 'U4', 'UX', None]) == {'U0': 'u0', 'U4': 'u4', 'UX': 'guest'}
+    assert client.calls == ['users.list'] * 3 + ['users.info']
+
+    assert cache.get_username(client, 'U2') == 'u2'
+    assert len(client.calls) == 4  # 캐시에서 바로 찾음
+
+    clock.now += cache.ttl + 1  # 디렉터리가 오래되면 다시 채움
+    assert cache.needs_warm()
+    cache.get_usernames(client, ['U1'])
+    assert client.calls.count('users.list') == 6
+
+
+def test_find_user_id_by_name_or_real_name(clock):
+    client = FakeUsersClient([user('U1', 'alice', 'Alice Kim'), user('U2', 'bob')])
+    cache = UserCache()
+    assert cache.peek_user_id('alice') is None  # API를 호출하지 않음
+    assert cache.find_user_id(client, 'Alice Kim') == 'U1'
+    assert cache.peek_user_id('BOB') == 'U2'
+    assert cache.find_user_id(client, 'carol') is None
+    assert client.calls == ['users.list']
+
+
+def test_shared_state_is_a_second_level_cache(clock):
+    shared = MemoryState()
+    client = FakeUsersClient([user(f"U{i}") for i in range(3)])
+    first, second = UserCache(shared=shared), UserCache(shared=shared)
+
+    first.warm(client, force=False)
+    assert client.calls == ['users.list'] * 2
+
+    # 다른 프로세스의 캐시는 users.list 없이 공유 저장소에서 찾고, 디렉터리도 그대로 가져옴
+    assert second.get_usernames(client, ['U0', 'U2']) == {'U0': 'u0', 'U2': 'u2'}
+    assert second.find_user_id(client, 'u1') == 'U1'
+    assert client.calls == ['users.list'] * 2
+    assert not second.needs_warm()
+
+    third = UserCache(shared=shared)
+    profiles, missing = third.peek(['U1'])
+    assert profiles['U1']['name'] == 'u1' and missing == []
+    assert third.stats()['shared_hits'] == 1
+
+
+def test_clear(clock):
+    cache = UserCache()
+    cache.put('U1', user('U1'))
+    cache.mark_warmed()
+    cache.clear()
+    assert cache.stats()['size'] == 0 and cache.needs_warm()
@@ -0,0 +1,260 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from shared_state import process_owner
+
+logger = logging.getLogger(__name__)
+
+
+# Slack 사용자 정보를 보관하는 캐시 (TTL + LRU 방출, 여러 스레드에서 공유)
+# users.list 한 번(페이지네이션)으로 전체 디렉터리를 채우고,
+# 그래도 없는 사용자만 users.info로 개별 조회함.
+# shared(공유 상태 저장소)를 주면 프로필을 다른 프로세스와 함께 쓰는 2차 캐시로 사용함.
+# 한 프로세스가 users.list로 채운 디렉터리를 다른 프로세스는 API 호출 없이 가져감.
+class UserCache:
+    def __init__(self, ttl=3600, maxsize=10000, shared=None):
+        self.ttl = ttl  # 항목 유효 시간(초)
+        self.maxsize = maxsize  # 최대 항목 수 (넘으면 가장 오래 안 쓴 항목부터 제거)
+        self.shared = shared
+        self._entries = OrderedDict()  # user_id -> (만료 시각, 프로필)
+        self._lock = threading.Lock()
+        self._warm_lock = threading.Lock()
+        self.warmed_at = None
+
+        # 캐시 효율 확인용 카운터
+        self.hits = 0
+        self.shared_hits = 0  # 공유 저장소에서 찾은 수 (hits에 포함)
+        self.misses = 0
+        self.evictions = 0
+        self.api_calls = 0
+
+    # users.list / users.info 응답의 사용자 객체에서 필요한 필드만 남김
+    @staticmethod
+    def _profile(user):
+        return {
+            "name": user.get('name'),
+            "real_name": user.get('real_name') or user.get('profile', {}).get('real_name'),
+            "tz": user.get('tz'),
+            "is_bot": user.get('is_bot', False),
+        }
+
+    def _put(self, user_id, profile, now):
+        # 락을 잡은 상태에서 호출해야 함
+        self._entries[user_id] = (now + self.ttl, profile)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, user_id, now):
+        # 락을 잡은 상태에서 호출해야 함. 만료된 항목은 지우고 None 리턴
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, profile = entry
+        if expires_at < now:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return profile
+
+    def put(self, user_id, user):
+        profile = self._profile(user)
+        with self._lock:
+            self._put(user_id, profile, time.monotonic())
+        self._publish({user_id: profile})
+
+    # 공유 저장소에도 저장 (실패해도 이 프로세스의 캐시는 그대로 사용)
+    def _publish(self, profiles):
+        if self.shared is None:
+            return
+        try:
+            self.shared.set_many('user', profiles, self.ttl)
+        except Exception as e:
+            logger.warning("Could not publish user profiles to shared state: %s", e)
+
+    # users.list를 끝까지 페이지네이션하여 캐시를 채움
+    # force=False면 다른 스레드가 방금 채운 경우 다시 호출하지 않음
+    # 공유 저장소가 있으면 다른 프로세스가 채운 디렉터리를 먼저 가져오고,
+    # 여러 프로세스가 동시에 users.list를 부르지 않도록 한 프로세스만 호출함
+    def warm(self, client, force=True):
+        with self._warm_lock:
+            if not force and not self.needs_warm():
+                return
+            claimed = False
+            if not force:
+                claimed = self.begin_warm()
+                if claimed is None:
+                    return
+            try:
+                next_cursor = None
+                while True:
+                    result = client.users_list(limit=200, cursor=next_cursor)
+                    self.put_many(result.get('members', []))
+
+                    next_cursor = result.get('response_metadata', {}).get('next_cursor')
+                    if not next_cursor:
+                        break
+                self.mark_warmed()
+            finally:
+                self.end_warm(claimed)
+
+    # 공유 저장소를 쓰면 users.list로 디렉터리를 채우는 프로세스를 하나로 정함 (동기/비동기 워밍업 공통)
+    # 다른 프로세스가 채워 둔 디렉터리를 가져왔으면 None, 직접 채워야 하면 claim을 잡았는지(True/False) 리턴
+    # 다른 프로세스가 채우는 중이면 끝날 때까지 잠시 기다림 (기다리는 동안 블록되므로 비동기 코드에서는 스레드로 호출)
+    def begin_warm(self):
+        if self.shared is None:
+            return False
+        if self.load_shared():
+            return None
+        claimed = self.shared.claim('user_cache:warm', process_owner(), 300)
+        if not claimed:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                time.sleep(0.5)
+                if self.load_shared():
+                    return None
+        return claimed
+
+    # begin_warm에서 잡은 claim을 놓음
+    def end_warm(self, claimed):
+        if claimed:
+            self.shared.release('user_cache:warm', process_owner())
+
+    # users.list / users.info 응답으로 받은 사용자들을 저장 (API 호출 1회로 집계)
+    def put_many(self, users):
+        now = time.monotonic()
+        profiles = {user['id']: self._profile(user) for user in users}
+        with self._lock:
+            self.api_calls += 1
+            for user_id, profile in profiles.items():
+                self._put(user_id, profile, now)
+        self._publish(profiles)
+
+    def mark_warmed(self):
+        self.warmed_at = time.monotonic()
+        if self.shared is not None:
+            # 다른 프로세스가 가져갈 수 있도록 디렉터리(user_id 목록)와 채운 시각을 남김
+            with self._lock:
+                user_ids = list(self._entries)
+            try:
+                self.shared.set_many('user_meta', {'directory': {'warmed_at': time.time(), 'user_ids': user_ids}}, self.ttl)
+            except Exception as e:
+                logger.warning("Could not publish user directory to shared state: %s", e)
+
+    # 다른 프로세스가 채운 디렉터리를 공유 저장소에서 가져옴. 가져왔으면 True
+    def load_shared(self):
+        if self.shared is None:
+            return False
+        directory = self.shared.get_many('user_meta', ['directory']).get('directory')
+        if directory is None:
+            return False
+        profiles = self.shared.get_many('user', directory['user_ids'])
+        now = time.monotonic()
+        with self._lock:
+            for user_id, profile in profiles.items():
+                self._put(user_id, profile, now)
+        # 디렉터리를 채운 프로세스와 같은 시각에 만료되도록 맞춤
+        self.warmed_at = now - max(0.0, time.time() - directory['warmed_at'])
+        return True
+
+    def needs_warm(self):
+        return self.warmed_at is None or time.monotonic() - self.warmed_at > self.ttl
+
+    # API 호출 없이 캐시(와 공유 저장소)에서만 조회. ({user_id: 프로필}, 캐시에 없는 user_id 목록) 리턴
+    # count=False면 적중/미스 카운터를 올리지 않음 (같은 요청 안에서 다시 확인할 때)
+    def peek(self, user_ids, count=True):
+        profiles = {}
+        missing = []
+
+        now = time.monotonic()
+        with self._lock:
+            for user_id in set(user_ids):
+                if user_id is None:
+                    continue
+                profile = self._lookup(user_id, now)
+                if profile is None:
+                    missing.append(user_id)
+                else:
+                    profiles[user_id] = profile
+
+        shared_found = {}
+        if missing and self.shared is not None:
+            shared_found = self.shared.get_many('user', missing)
+            if shared_found:
+                with self._lock:
+                    for user_id, profile in shared_found.items():
+                        self._put(user_id, profile, now)
+                profiles.update(shared_found)
+                missing = [user_id for user_id in missing if user_id not in shared_found]
+
+        if count:
+            with self._lock:
+                self.hits += len(profiles)
+                self.shared_hits += len(shared_found)
+                self.misses += len(missing)
+
+        return profiles, missing
+
+    # 여러 user_id를 한 번에 조회. {user_id: 프로필} 리턴 (None user_id는 건너뜀)
+    def get_users(self, client, user_ids):
+        profiles, missing = self.peek(user_ids)
+        if not missing:
+            return profiles
+
+        # 디렉터리를 아직 채우지 않았거나 오래됐으면 users.list로 한 번에 가져옴
+        if self.needs_warm():
+            self.warm(client, force=False)
+            found, missing = self.peek(missing, count=False)
+            profiles.update(found)
+
+        # users.list에 없는 사용자(다른 워크스페이스, 새로 들어온 사용자 등)만 개별 조회
+        for user_id in missing:
+            user_info = client.users_info(user=user_id)
+            self.put_many([user_info['user']])
+            profiles[user_id] = self._profile(user_info['user'])
+
+        return profiles
+
+    # username(또는 실명)으로 user_id를 찾음. 없으면 None
+    # 디렉터리를 아직 채우지 않았거나 오래됐으면 users.list로 먼저 채움
+    def find_user_id(self, client, name):
+        if self.needs_warm():
+            self.warm(client, force=False)
+        return self.peek_user_id(name)
+
+    # find_user_id와 같지만 API를 호출하지 않고 지금 캐시에 있는 사용자에서만 찾음 (라우트에서 바로 응답할 때)
+    def peek_user_id(self, name):
+        name = name.lower()
+        now = time.monotonic()
+        with self._lock:
+            for user_id, (expires_at, profile) in self._entries.items():
+                if expires_at >= now and name in ((profile['name'] or '').lower(), (profile['real_name'] or '').lower()):
+                    return user_id
+        return None
+
+    # {user_id: username} 형태로 리턴
+    def get_usernames(self, client, user_ids):
+        return {user_id: profile['name'] for user_id, profile in self.get_users(client, user_ids).items()}
+
+    def get_username(self, client, user_id):
+        return self.get_usernames(client, [user_id]).get(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.warmed_at = None
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "api_calls": self.api_calls,
+        }
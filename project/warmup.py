@@ -0,0 +1,70 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# 워커 프로세스가 요청을 받기 전에 미리 해 두는 준비 작업 (봇 정보 조회, 사용자 디렉터리, 커넥션)
+# 백그라운드 스레드에서 단계별로 실행하고, 다 끝나야 ready()가 True가 되어 /ready(readinessProbe)가 성공함.
+# 단계 하나가 실패해도 (Slack 장애 등) 나머지는 계속 진행하고, 그 작업은 처음 요청 때 다시 하게 됨.
+class Warmup:
+    def __init__(self, steps, enabled=True):
+        self.steps = steps  # [(이름, 함수)] - 순서대로 실행
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._started = False
+        self._done = threading.Event()
+
+        # 메트릭
+        self.started_at = None
+        self.seconds = None  # 전체 걸린 시간
+        self.durations = {}  # 단계별 걸린 시간(초)
+        self.errors = {}  # 단계별 에러 메시지
+
+    # 워밍업 스레드를 시작 (이미 시작했으면 아무것도 하지 않음)
+    # gunicorn은 fork한 워커마다 불러야 함 (마스터에서 시작한 스레드와 커넥션은 워커로 넘어가지 않음)
+    def start(self):
+        with self._lock:
+            if self._started:
+                return False
+            self._started = True
+        if not self.enabled:
+            self._done.set()
+            return False
+        self.started_at = time.monotonic()
+        threading.Thread(target=self.run, name='thegull-warmup', daemon=True).start()
+        return True
+
+    def run(self):
+        started = time.monotonic()
+        for name, step in self.steps:
+            step_started = time.monotonic()
+            try:
+                step()
+            except Exception as e:
+                logger.warning("Warm-up step %s failed: %s", name, e)
+                self.errors[name] = str(e)
+            self.durations[name] = round(time.monotonic() - step_started, 3)
+        self.seconds = round(time.monotonic() - started, 3)
+        logger.info("Warm-up finished in %.2fs (%s)", self.seconds, self.durations)
+        self._done.set()
+
+    @property
+    def started(self):
+        return self._started
+
+    def ready(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready(),
+            "seconds": self.seconds,
+            "steps": self.durations,
+            "errors": self.errors,
+        }
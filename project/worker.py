@@ -0,0 +1,31 @@
+import logging
+import signal
+
+from slack_test import report_scheduler, token, REPORT_CHANNELS
+
+logger = logging.getLogger('thegull.worker')
+
+
+# 리포트 미리 만들기 워커 (웹 서버와 별도 프로세스로 실행)
+# 웹 서버와 같은 저장소(MESSAGE_STORE_PATH)를 사용하므로, 여기서 만든 스냅샷을 슬래시 명령이 바로 읽어서 응답함.
+# 실행: python worker.py
+
+
+def main():
+    if not token:
+        logger.error("SLACK_BOT_TOKEN is not set!")
+        return
+    if not REPORT_CHANNELS:
+        logger.error("REPORT_CHANNELS is not set! Nothing to precompute")
+        return
+
+    # docker stop(SIGTERM) / Ctrl+C 시 진행 중인 채널까지만 마치고 종료
+    signal.signal(signal.SIGTERM, lambda signum, frame: report_scheduler.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: report_scheduler.stop())
+
+    logger.info("Report worker started (channels: %s, interval: %ss)", REPORT_CHANNELS, report_scheduler.interval)
+    report_scheduler.run_forever()
+
+
+if __name__ == '__main__':
+    main()